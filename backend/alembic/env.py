@@ -40,6 +40,14 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
+    # app.db.migrate runs migrations on startup over a connection it already holds
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -21,6 +21,9 @@ depends_on: str | Sequence[str] | None = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    # Startup's create_all may already have created it
+    if "users" in sa.inspect(op.get_bind()).get_table_names():
+        return
     op.create_table(
         "users",
         sa.Column("id", sa.UUID(), nullable=False),
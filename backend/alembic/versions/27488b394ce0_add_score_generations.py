@@ -0,0 +1,85 @@
+"""add score generations
+
+wallet_scores gains a generation column and readers follow the newest published
+score_generations row. Scores are derived and rewritten on every scorer run, so an
+old-shape table is rebuilt empty rather than migrated.
+
+Revision ID: 27488b394ce0
+Revises: a02c5857e2f9
+Create Date: 2026-10-17 16:02:47.913554
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "27488b394ce0"
+down_revision: str | Sequence[str] | None = "a02c5857e2f9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _score_columns() -> list[sa.Column]:
+    return [
+        sa.Column("wallet", sa.String(length=42), nullable=False),
+        sa.Column("category", sa.String(length=64), nullable=False),
+        sa.Column("timeframe", sa.String(length=8), nullable=False),
+        sa.Column("volume", sa.Float(), nullable=False),
+        sa.Column("pnl", sa.Float(), nullable=False),
+        sa.Column("win_rate", sa.Float(), nullable=False),
+        sa.Column("trade_count", sa.Integer(), nullable=False),
+        sa.Column("rank_volume", sa.Integer(), nullable=False),
+        sa.Column("rank_pnl", sa.Integer(), nullable=False),
+        sa.Column("rank_win_rate", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    # Startup's create_all may already have created either table in its new shape
+    if "score_generations" not in tables:
+        op.create_table(
+            "score_generations",
+            sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.Column("published_at", sa.DateTime(), nullable=True),
+            sa.Column("scores", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "wallet_scores" in tables:
+        columns = {c["name"] for c in inspector.get_columns("wallet_scores")}
+        if "generation" in columns:
+            return
+        op.drop_table("wallet_scores")
+
+    op.create_table(
+        "wallet_scores",
+        *_score_columns(),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("wallet", "category", "timeframe", "generation"),
+    )
+    op.create_index(
+        "ix_ws_generation_slice",
+        "wallet_scores",
+        ["generation", "category", "timeframe", "rank_volume"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("wallet_scores")
+    op.create_table(
+        "wallet_scores",
+        *_score_columns(),
+        sa.PrimaryKeyConstraint("wallet", "category", "timeframe"),
+    )
+    op.create_index("ix_ws_timeframe_rank_vol", "wallet_scores", ["timeframe", "rank_volume"])
+    op.drop_table("score_generations")
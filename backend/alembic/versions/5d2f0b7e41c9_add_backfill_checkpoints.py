@@ -0,0 +1,43 @@
+"""add backfill checkpoints
+
+Revision ID: 5d2f0b7e41c9
+Revises: 86e9b6ca998e
+Create Date: 2026-10-17 13:40:05.226871
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f0b7e41c9"
+down_revision: str | Sequence[str] | None = "86e9b6ca998e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Startup's create_all may already have created it
+    if "backfill_checkpoints" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "backfill_checkpoints",
+        sa.Column("condition_id", sa.String(length=128), nullable=False),
+        sa.Column("from_ts", sa.BigInteger(), nullable=False),
+        sa.Column("to_ts", sa.BigInteger(), nullable=False),
+        sa.Column("page_offset", sa.Integer(), nullable=False),
+        sa.Column("oldest_ts", sa.BigInteger(), nullable=True),
+        sa.Column("trades", sa.Integer(), nullable=False),
+        sa.Column("done", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("condition_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("backfill_checkpoints")
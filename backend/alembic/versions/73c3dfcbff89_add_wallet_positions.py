@@ -0,0 +1,63 @@
+"""add wallet positions
+
+Creates the wallet_positions ledger and adds realized_pnl to trades, trades_staging
+and wallet_daily_rollups. Existing trades start at 0 realized PnL; the next startup
+(``app.db.migrate.upgrade_schema``) finds the ledger empty and replays them into it.
+
+Revision ID: 73c3dfcbff89
+Revises: 27488b394ce0
+Create Date: 2026-10-17 19:41:08.204117
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "73c3dfcbff89"
+down_revision: str | Sequence[str] | None = "27488b394ce0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_REALIZED_TABLES = ("trades", "trades_staging", "wallet_daily_rollups")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    # Startup's create_all may already have created the ledger in its new shape
+    if "wallet_positions" not in tables:
+        op.create_table(
+            "wallet_positions",
+            sa.Column("wallet", sa.String(length=42), nullable=False),
+            sa.Column("asset_id", sa.String(length=128), nullable=False),
+            sa.Column("condition_id", sa.String(length=128), nullable=False),
+            sa.Column("shares", sa.Float(), nullable=False),
+            sa.Column("avg_cost", sa.Float(), nullable=False),
+            sa.Column("realized_pnl", sa.Float(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.PrimaryKeyConstraint("wallet", "asset_id"),
+        )
+
+    for table in _REALIZED_TABLES:
+        # trades is created by Base.metadata.create_all on startup, not by a migration
+        if table not in tables:
+            continue
+        if "realized_pnl" in {c["name"] for c in inspector.get_columns(table)}:
+            continue
+        op.add_column(
+            table, sa.Column("realized_pnl", sa.Float(), server_default="0", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    for table in _REALIZED_TABLES:
+        if table in tables:
+            op.drop_column(table, "realized_pnl")
+    op.drop_table("wallet_positions")
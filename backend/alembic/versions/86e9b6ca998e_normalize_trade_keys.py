@@ -0,0 +1,54 @@
+"""normalize trade keys
+
+Lowercase transaction hashes and wallets, and convert millisecond timestamps
+written by the CLOB listener to seconds, so rows from both ingestion paths
+compare equal. Rows whose normalized key already exists are dropped.
+
+Revision ID: 86e9b6ca998e
+Revises: c63cb4113f82
+Create Date: 2026-10-17 11:02:17.904133
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "86e9b6ca998e"
+down_revision: str | Sequence[str] | None = "c63cb4113f82"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # trades is created by Base.metadata.create_all on startup, not by a migration
+    if "trades" not in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.execute(
+        """
+        DELETE FROM trades t
+        USING trades o
+        WHERE t.transaction_hash <> lower(t.transaction_hash)
+          AND o.transaction_hash = lower(t.transaction_hash)
+          AND o.asset_id = t.asset_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE trades
+        SET transaction_hash = lower(transaction_hash), wallet = lower(wallet)
+        WHERE transaction_hash <> lower(transaction_hash) OR wallet <> lower(wallet)
+        """
+    )
+    op.execute("UPDATE trades SET timestamp = timestamp / 1000 WHERE timestamp > 1000000000000")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data-only normalization; the original casing and units are not recoverable.
+    pass
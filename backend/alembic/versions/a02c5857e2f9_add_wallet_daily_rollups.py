@@ -0,0 +1,65 @@
+"""add wallet daily rollups
+
+Creates wallet_daily_rollups and fills it from the existing trades, which remain
+the source of truth: any rows written by ingest before this ran are rebuilt.
+
+Revision ID: a02c5857e2f9
+Revises: 5d2f0b7e41c9
+Create Date: 2026-10-17 03:36:22.365371
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a02c5857e2f9"
+down_revision: str | Sequence[str] | None = "5d2f0b7e41c9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    # Startup's create_all may already have created the (empty or partial) table
+    if "wallet_daily_rollups" not in tables:
+        op.create_table(
+            "wallet_daily_rollups",
+            sa.Column("wallet", sa.String(length=42), nullable=False),
+            sa.Column("condition_id", sa.String(length=128), nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("buy_notional", sa.Float(), nullable=False),
+            sa.Column("sell_notional", sa.Float(), nullable=False),
+            sa.Column("trade_count", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("wallet", "condition_id", "day"),
+        )
+        op.create_index("ix_rollups_day", "wallet_daily_rollups", ["day"])
+
+    # trades is created by Base.metadata.create_all on startup, not by a migration
+    if "trades" not in tables:
+        return
+    op.execute("TRUNCATE wallet_daily_rollups")
+    op.execute(
+        """
+        INSERT INTO wallet_daily_rollups
+            (wallet, condition_id, day, buy_notional, sell_notional, trade_count)
+        SELECT wallet,
+               condition_id,
+               (to_timestamp(timestamp) AT TIME ZONE 'UTC')::date,
+               coalesce(sum(size * price) FILTER (WHERE side <> 'SELL'), 0),
+               coalesce(sum(size * price) FILTER (WHERE side = 'SELL'), 0),
+               count(*)
+        FROM trades
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rollups_day", table_name="wallet_daily_rollups")
+    op.drop_table("wallet_daily_rollups")
@@ -0,0 +1,50 @@
+"""add trades staging table
+
+Revision ID: c63cb4113f82
+Revises: 092c9ceebb96
+Create Date: 2026-10-17 09:12:41.518204
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c63cb4113f82"
+down_revision: str | Sequence[str] | None = "092c9ceebb96"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Startup's create_all may already have created it
+    if "trades_staging" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "trades_staging",
+        sa.Column("batch_id", sa.UUID(), nullable=False),
+        sa.Column("transaction_hash", sa.String(length=128), nullable=False),
+        sa.Column("asset_id", sa.String(length=128), nullable=False),
+        sa.Column("condition_id", sa.String(length=128), nullable=False),
+        sa.Column("wallet", sa.String(length=42), nullable=False),
+        sa.Column("side", sa.String(length=4), nullable=False),
+        sa.Column("size", sa.Float(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("outcome", sa.String(length=32), nullable=False),
+        sa.Column("title", sa.Text(), nullable=False),
+        sa.Column("timestamp", sa.BigInteger(), nullable=False),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(
+        op.f("ix_trades_staging_batch_id"), "trades_staging", ["batch_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_trades_staging_batch_id"), table_name="trades_staging")
+    op.drop_table("trades_staging")
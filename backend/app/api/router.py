@@ -3,6 +3,7 @@
 from fastapi import APIRouter
 
 from app.api.routes import (
+    admin,
     builder,
     copytrade,
     health,
@@ -29,3 +30,4 @@ api_router.include_router(wallets.router)
 api_router.include_router(live.router)
 api_router.include_router(copytrade.router)
 api_router.include_router(signup.router)
+api_router.include_router(admin.router)
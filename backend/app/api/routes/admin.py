@@ -0,0 +1,58 @@
+"""Admin endpoints — operational jobs guarded by a shared token."""
+
+import logging
+import secrets
+import time
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.workers import backfill
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+logger = logging.getLogger(__name__)
+
+
+def require_admin(x_admin_token: str = Header(default="")) -> None:
+    """Reject requests without the configured admin token (all requests if unset)."""
+    if not settings.ADMIN_API_TOKEN or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_API_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+class BackfillRequest(BaseModel):
+    condition_ids: list[str] = Field(min_length=1, max_length=1000)
+    from_ts: int = Field(default=0, ge=0)
+    to_ts: int | None = None
+
+
+@router.post("/backfill", status_code=202, dependencies=[Depends(require_admin)])
+async def start_backfill(req: BackfillRequest):
+    """Start a resumable historical backfill for the given markets."""
+    to_ts = req.to_ts if req.to_ts is not None else int(time.time())
+    if to_ts < req.from_ts:
+        raise HTTPException(status_code=422, detail="to_ts must be >= from_ts")
+    try:
+        progress = backfill.start_job(req.condition_ids, req.from_ts, to_ts)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    logger.info("admin started backfill for %d markets", len(req.condition_ids))
+    return progress.as_dict()
+
+
+@router.get("/backfill", dependencies=[Depends(require_admin)])
+async def backfill_status():
+    """Throughput and progress of the current (or last) backfill job."""
+    status = backfill.job_status()
+    if status is None:
+        raise HTTPException(status_code=404, detail="No backfill has been started")
+    return status
+
+
+@router.delete("/backfill", dependencies=[Depends(require_admin)])
+async def cancel_backfill():
+    """Cancel the running backfill; checkpoints let a later run resume it."""
+    await backfill.stop_job()
+    return backfill.job_status() or {}
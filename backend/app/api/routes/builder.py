@@ -7,6 +7,7 @@ import httpx
 from fastapi import APIRouter, HTTPException, Query
 
 from app.api.routes.signing import _build_hmac_signature
+from app.core import json_codec
 from app.core.config import settings
 from app.schemas.polymarket import BuilderTrade, BuilderTradesResponse
 
@@ -62,7 +63,7 @@ async def get_builder_trades(
         logger.warning("builder_trades clob_status=%d body=%s", resp.status_code, resp.text[:200])
         raise HTTPException(status_code=resp.status_code, detail="CLOB request failed")
 
-    data = resp.json()
+    data = json_codec.loads(resp.content)
 
     # The CLOB may return the trades directly as a list or as an object
     if isinstance(data, list):
@@ -1,10 +1,31 @@
-"""Health check endpoint."""
+"""Health check endpoints."""
 
 from fastapi import APIRouter
 
+from app.services import journal, live_window, rank_index
+from app.services.dedup import trade_dedup
+from app.services.pipeline import pipeline
+from app.workers import leader, trade_listener, trade_poller
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 async def health_check():
     return {"status": "ok", "service": "polyscoop"}
+
+
+@router.get("/health/ingest")
+async def ingest_stats():
+    """Pipeline, socket and scheduler counters for tuning ingestion."""
+    return {
+        "leader": leader.leadership(),
+        "pipeline": pipeline.stats(),
+        "trade_listener_sockets": trade_listener.pool_stats(),
+        "trade_listener": trade_listener.parse_stats(),
+        "trade_poller": trade_poller.scheduler_stats(),
+        "dedup": trade_dedup.stats(),
+        "journal": journal.journal_stats(),
+        "live_window": live_window.window.stats(),
+        "rank_index": rank_index.index.stats(),
+    }
@@ -1,11 +1,12 @@
 """WebSocket live feed — pushes trades to connected clients via Redis pub/sub."""
 
 import asyncio
-import json
 import logging
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.core import json_codec
+
 router = APIRouter(tags=["live"])
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,7 @@ _clients: set[WebSocket] = set()
 async def broadcast_trade(trade_data: dict) -> None:
     """Broadcast a trade to all connected WebSocket clients."""
     global _clients
-    message = json.dumps({"type": "trade", "data": trade_data})
+    message = json_codec.dumps_str({"type": "trade", "data": trade_data})
     disconnected = set()
     for ws in _clients:
         try:
@@ -29,7 +30,7 @@ async def broadcast_trade(trade_data: dict) -> None:
 async def broadcast_copytrade_signal(signal_data: dict, target_user: str) -> None:
     """Send a copy-trade signal to a specific user's WebSocket connections."""
     global _clients
-    message = json.dumps({"type": "copytrade_signal", "data": signal_data})
+    message = json_codec.dumps_str({"type": "copytrade_signal", "data": signal_data})
     disconnected = set()
     for ws in _clients:
         try:
@@ -77,16 +78,16 @@ async def ws_feed(websocket: WebSocket):
         while True:
             data = await websocket.receive_text()
             try:
-                msg = json.loads(data)
+                msg = json_codec.loads(data)
                 if msg.get("type") == "subscribe":
                     channels = msg.get("channels", [])
                     websocket._subscriptions = set(channels)  # type: ignore[attr-defined]
                     await websocket.send_text(
-                        json.dumps({"type": "subscribed", "channels": channels})
+                        json_codec.dumps_str({"type": "subscribed", "channels": channels})
                     )
                 elif msg.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
-            except json.JSONDecodeError:
+                    await websocket.send_text(json_codec.dumps_str({"type": "pong"}))
+            except json_codec.DecodeError:
                 pass
 
     except WebSocketDisconnect:
@@ -7,6 +7,7 @@ import re
 import httpx
 from fastapi import APIRouter, HTTPException, Path, Query
 
+from app.core import json_codec
 from app.core.config import settings
 from app.schemas.polymarket import (
     EventsResponse,
@@ -136,7 +137,7 @@ async def list_tags():
         async with httpx.AsyncClient(timeout=15) as client:
             resp = await client.get(f"{GAMMA_URL}/tags")
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("gamma_timeout GET /tags")
         raise HTTPException(status_code=504, detail="Upstream service timed out")
@@ -190,7 +191,7 @@ async def list_events(
         async with httpx.AsyncClient(timeout=15) as client:
             resp = await client.get(f"{GAMMA_URL}/events", params=params)
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("gamma_timeout GET /events params=%s", params)
         raise HTTPException(status_code=504, detail="Upstream service timed out")
@@ -249,7 +250,7 @@ async def list_markets(
         async with httpx.AsyncClient(timeout=15) as client:
             resp = await client.get(f"{GAMMA_URL}/markets", params=params)
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("gamma_timeout GET /markets params=%s", params)
         raise HTTPException(status_code=504, detail="Upstream service timed out")
@@ -294,7 +295,7 @@ async def get_market(
                 params={"conditionId": condition_id, "limit": 1},
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("gamma_timeout GET /markets?condition_id=%s", condition_id)
         raise HTTPException(status_code=504, detail="Upstream service timed out")
@@ -346,7 +347,7 @@ async def get_orderbook(
         async with httpx.AsyncClient(timeout=15) as client:
             resp = await client.get(f"{CLOB_URL}/book", params={"token_id": token_id})
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("clob_timeout GET /book token_id=%s", token_id)
         raise HTTPException(status_code=504, detail="Upstream service timed out")
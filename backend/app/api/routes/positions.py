@@ -6,6 +6,7 @@ import re
 import httpx
 from fastapi import APIRouter, HTTPException, Query
 
+from app.core import json_codec
 from app.core.config import settings
 from app.schemas.polymarket import PositionSummary
 
@@ -35,7 +36,7 @@ async def list_positions(
         async with httpx.AsyncClient(timeout=15) as client:
             resp = await client.get(f"{DATA_API_URL}/positions", params=params)
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("data_api_timeout GET /positions user=%s", user)
         raise HTTPException(status_code=504, detail="Upstream service timed out")
@@ -6,6 +6,7 @@ import re
 import httpx
 from fastapi import APIRouter, HTTPException, Query
 
+from app.core import json_codec
 from app.core.config import settings
 from app.schemas.polymarket import PriceHistoryResponse, PricePoint
 
@@ -33,7 +34,7 @@ async def get_price_history(
         async with httpx.AsyncClient(timeout=15) as client:
             resp = await client.get(f"{CLOB_URL}/prices-history", params=params)
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("clob_timeout GET /prices-history market=%s", market)
         raise HTTPException(status_code=504, detail="Upstream service timed out")
@@ -5,6 +5,7 @@ import logging
 import httpx
 from fastapi import APIRouter, HTTPException, Query
 
+from app.core import json_codec
 from app.core.config import settings
 from app.schemas.polymarket import TradeRecord, TradesResponse
 
@@ -26,7 +27,7 @@ async def list_trades(
         async with httpx.AsyncClient(timeout=15) as client:
             resp = await client.get(f"{DATA_API_URL}/trades", params=params)
             resp.raise_for_status()
-            data = resp.json()
+            data = json_codec.loads(resp.content)
     except httpx.TimeoutException:
         logger.error("data_api_timeout GET /trades market=%s", market)
         raise HTTPException(status_code=504, detail="Upstream service timed out")
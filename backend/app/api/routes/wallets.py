@@ -2,14 +2,18 @@
 
 import logging
 from datetime import UTC, datetime, timedelta
+from typing import Annotated
 
 from fastapi import APIRouter, Depends, Path, Query
+from pydantic import BaseModel, Field
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.engine import get_session
 from app.db.models import TrackedMarket, Trade, Wallet, WalletScore, WalletSnapshot
+from app.services import live_window, rank_index
 from app.services.leaderboard import compute_live_leaderboard
+from app.services.scoring import TIMEFRAMES, current_generation
 
 router = APIRouter(prefix="/wallets", tags=["wallets"])
 logger = logging.getLogger(__name__)
@@ -17,24 +21,62 @@ logger = logging.getLogger(__name__)
 _ADDR_RE = r"^0x[a-fA-F0-9]{40}$"
 
 _TIMEFRAME_DELTAS = {
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
     "24h": timedelta(hours=24),
     "7d": timedelta(days=7),
     "30d": timedelta(days=30),
     "all": None,
 }
 
+_LEADERBOARD_KEYS = (
+    "address",
+    "volume",
+    "pnl",
+    "win_rate",
+    "trade_count",
+    "rank_volume",
+    "rank_pnl",
+)
+
+
+class RankRequest(BaseModel):
+    addresses: list[Annotated[str, Field(pattern=_ADDR_RE)]] = Field(min_length=1, max_length=1000)
+    category: str = Field(default="all", min_length=1, max_length=64)
+    timeframe: str = Field(default="7d", pattern=r"^(24h|7d|30d|all)$")
+
+
+def _score_entry(s: WalletScore, total: int) -> dict:
+    """A wallet_scores row in the shape the rank index serves."""
+    entry = {"volume": s.volume, "pnl": s.pnl, "win_rate": s.win_rate, "trade_count": s.trade_count}
+    for metric in rank_index.METRICS:
+        rank = getattr(s, f"rank_{metric}")
+        entry[f"rank_{metric}"] = rank
+        entry[f"percentile_{metric}"] = rank_index.percentile(rank, total)
+    return entry
+
+
+async def _slice_totals(session: AsyncSession, generation: int | None, category: str) -> dict:
+    """Wallets ranked per timeframe in ``category``: the percentile denominators."""
+    q = (
+        select(WalletScore.timeframe, func.count())
+        .where(WalletScore.generation == generation, WalletScore.category == category)
+        .group_by(WalletScore.timeframe)
+    )
+    return dict((await session.execute(q)).tuples().all())
+
 
 # ── Static routes MUST come before /{address} wildcard ────
 
 
 @router.get("/leaderboard")
 async def leaderboard(
-    timeframe: str = Query(default="7d", pattern=r"^(24h|7d|30d|all)$"),
+    timeframe: str = Query(default="7d", pattern=r"^(1h|6h|24h|7d|30d|all)$"),
     sort_by: str = Query(default="volume", pattern=r"^(volume|pnl|win_rate|trade_count)$"),
     sort_dir: str = Query(default="desc", pattern=r"^(asc|desc)$"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-    category: str = Query(default="mentions", pattern=r"^(all|mentions)$"),
+    category: str = Query(default="mentions", min_length=1, max_length=64),
     # Threshold filters
     min_trades: int | None = Query(default=None, ge=1),
     min_volume: float | None = Query(default=None, ge=0),
@@ -50,10 +92,40 @@ async def leaderboard(
 ):
     """Ranked wallets by volume/pnl/win_rate, filterable by timeframe and category.
 
+    ``category`` is "all" or any tracked market category; unknown ones rank nobody.
+
     When scoping filters (market, event_id, from_ts, to_ts) are provided, rankings
     are computed on-the-fly from the Trade table instead of pre-computed WalletScore.
+    Unscoped timeframes up to 24h are ranked from the in-memory live window.
     """
-    use_live = market or event_id or from_ts is not None or to_ts is not None
+    scoped = market or event_id or from_ts is not None or to_ts is not None
+    minutes = live_window.WINDOWS.get(timeframe)
+    if minutes and not scoped and live_window.window.ready:
+        markets = None
+        if category != "all":
+            cids_q = select(TrackedMarket.condition_id).where(TrackedMarket.category == category)
+            markets = set((await session.scalars(cids_q)).all())
+        addresses = None
+        if label:
+            label_q = select(Wallet.address).where(Wallet.labels.contains([label]))
+            addresses = set((await session.scalars(label_q)).all())
+        rows, total = live_window.window.leaderboard(
+            minutes,
+            markets=markets,
+            addresses=addresses,
+            min_trades=min_trades,
+            min_volume=min_volume,
+            min_win_rate=min_win_rate,
+            pnl_positive=pnl_positive,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            limit=limit,
+            offset=offset,
+        )
+        return {"wallets": rows, "total": total, "timeframe": timeframe}
+
+    # Windows shorter than the scorer's fall back to SQL until the live window is ready
+    use_live = scoped or timeframe not in TIMEFRAMES
 
     if use_live:
         # Compute custom time range from timeframe when no explicit range given
@@ -89,7 +161,42 @@ async def leaderboard(
         "trade_count": WalletScore.trade_count,
     }[sort_by]
 
-    where = [WalletScore.timeframe == timeframe, WalletScore.category == category]
+    # Pin one generation for both queries; None (nothing published yet) matches no rows
+    generation = await current_generation(session)
+
+    index = rank_index.index
+    filtered = (
+        min_trades is not None
+        or min_volume is not None
+        or min_win_rate is not None
+        or pnl_positive
+        or label
+    )
+    if (
+        generation is not None
+        and index.generation == generation
+        and not filtered
+        and sort_by in rank_index.METRICS
+    ):
+        entries, total = index.page(
+            category,
+            timeframe,
+            sort_by,
+            descending=sort_dir == "desc",
+            limit=limit,
+            offset=offset,
+        )
+        return {
+            "wallets": [{key: e[key] for key in _LEADERBOARD_KEYS} for e in entries],
+            "total": total,
+            "timeframe": timeframe,
+        }
+
+    where = [
+        WalletScore.generation == generation,
+        WalletScore.timeframe == timeframe,
+        WalletScore.category == category,
+    ]
     if min_trades is not None:
         where.append(WalletScore.trade_count >= min_trades)
     if min_volume is not None:
@@ -180,20 +287,62 @@ async def feed_trades(
     }
 
 
+@router.post("/ranks")
+async def wallet_ranks(req: RankRequest, session: AsyncSession = Depends(get_session)):
+    """Scores, ranks and percentiles for a batch of wallets in one category and timeframe.
+
+    Served from the in-memory rank index; wallets without scores map to null.
+    """
+    addresses = [a.lower() for a in req.addresses]
+    index = rank_index.index
+    if index.ready:
+        entries = index.lookup(addresses, req.category, req.timeframe)
+        total = index.total(req.category, req.timeframe)
+    else:
+        generation = await current_generation(session)
+        q = select(WalletScore).where(
+            WalletScore.generation == generation,
+            WalletScore.category == req.category,
+            WalletScore.timeframe == req.timeframe,
+            WalletScore.wallet.in_(addresses),
+        )
+        rows = {s.wallet: s for s in (await session.scalars(q)).all()}
+        total = (await _slice_totals(session, generation, req.category)).get(req.timeframe, 0)
+        entries = [_score_entry(rows[a], total) if a in rows else None for a in addresses]
+
+    return {
+        "category": req.category,
+        "timeframe": req.timeframe,
+        "total": total,
+        "ranks": dict(zip(addresses, entries, strict=True)),
+    }
+
+
 # ── Parameterized routes ─────────────────────────────────
 
 
 @router.get("/{address}")
 async def wallet_profile(
     address: str = Path(pattern=_ADDR_RE),
+    category: str = Query(default="all", min_length=1, max_length=64),
     session: AsyncSession = Depends(get_session),
 ):
-    """Full wallet profile — stats, recent trades, scores."""
+    """Full wallet profile — stats, recent trades, and scores with ranks in ``category``."""
     wallet = await session.get(Wallet, address.lower())
 
-    scores_q = select(WalletScore).where(WalletScore.wallet == address.lower())
-    scores_result = await session.execute(scores_q)
-    scores = scores_result.scalars().all()
+    index = rank_index.index
+    if index.ready:
+        scores = index.profile(address, category)
+    else:
+        generation = await current_generation(session)
+        scores_q = select(WalletScore).where(
+            WalletScore.wallet == address.lower(),
+            WalletScore.generation == generation,
+            WalletScore.category == category,
+        )
+        rows = (await session.scalars(scores_q)).all()
+        totals = await _slice_totals(session, generation, category) if rows else {}
+        scores = {s.timeframe: _score_entry(s, totals[s.timeframe]) for s in rows}
 
     trades_q = (
         select(Trade)
@@ -211,16 +360,8 @@ async def wallet_profile(
         "total_trades": wallet.total_trades if wallet else 0,
         "total_volume": wallet.total_volume if wallet else 0,
         "labels": wallet.labels if wallet else [],
-        "scores": {
-            s.timeframe: {
-                "volume": s.volume,
-                "pnl": s.pnl,
-                "win_rate": s.win_rate,
-                "trade_count": s.trade_count,
-                "rank_volume": s.rank_volume,
-            }
-            for s in scores
-        },
+        "category": category,
+        "scores": scores,
         "recent_trades": [
             {
                 "transaction_hash": t.transaction_hash,
@@ -37,5 +37,24 @@ class Settings:
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     MENTIONS_TAG_SLUG = os.getenv("MENTIONS_TAG_SLUG", "mention-markets")
 
+    # ── Serialization ────────────────────────────────────
+    # Force a JSON backend (orjson, msgspec or json); empty picks the fastest installed
+    JSON_CODEC = os.getenv("JSON_CODEC", "")
+
+    # ── Workers ──────────────────────────────────────────
+    # Start background workers inside the API process (off when using `python -m app.workers`)
+    RUN_WORKERS = os.getenv("RUN_WORKERS", "true").lower() == "true"
+    # Run each background worker in only one process (Postgres advisory lock per worker)
+    WORKER_LEADER_ELECTION = os.getenv("WORKER_LEADER_ELECTION", "true").lower() == "true"
+
+    # Append raw CLOB frames and Data API trade pages here for replay; empty disables
+    JOURNAL_DIR = os.getenv("JOURNAL_DIR", "")
+    # Oldest journal segments are deleted once the directory exceeds this size
+    JOURNAL_MAX_MB = int(os.getenv("JOURNAL_MAX_MB", "10240"))
+
+    # ── Admin ────────────────────────────────────────────
+    # Shared secret for /admin endpoints (sent as X-Admin-Token); empty disables them
+    ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+
 
 settings = Settings()
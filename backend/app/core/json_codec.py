@@ -0,0 +1,108 @@
+"""JSON codec for hot serialization paths — orjson (a dependency), msgspec or stdlib.
+
+Every CLOB WebSocket frame, Redis publish, live-feed send and proxied Polymarket
+response goes through here. ``dumps`` returns bytes (what sockets, Redis and HTTP
+bodies want); ``dumps_str`` is for APIs that need text frames.
+
+All backends produce compact UTF-8 output, raise :class:`DecodeError` (a
+``ValueError``) on malformed input and ``TypeError`` on values JSON can't represent.
+The fastest importable backend is picked at import; set ``JSON_CODEC`` to force one.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+DecodeError = ValueError  # orjson/msgspec/stdlib decode errors all subclass it
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[str | bytes], Any]
+
+
+def _default(obj: Any) -> str:
+    """Encode dates as ISO 8601 like orjson and msgspec do; anything else is an error."""
+    if isinstance(obj, datetime | date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib() -> Codec:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+        ).encode()
+
+    return Codec("json", dumps, json.loads)
+
+
+def _orjson() -> Codec:
+    import orjson
+
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=option)
+
+    return Codec("orjson", dumps, orjson.loads)
+
+
+def _msgspec() -> Codec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return Codec("msgspec", encoder.encode, decoder.decode)
+
+
+_FACTORIES: dict[str, Callable[[], Codec]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": _stdlib,
+}
+
+
+def available() -> dict[str, Codec]:
+    """Every codec whose library is importable, fastest first."""
+    codecs = {}
+    for name, factory in _FACTORIES.items():
+        try:
+            codecs[name] = factory()
+        except ImportError:
+            continue
+    return codecs
+
+
+def _select() -> Codec:
+    codecs = available()
+    forced = settings.JSON_CODEC
+    if forced:
+        if forced not in codecs:
+            raise RuntimeError(f"JSON_CODEC={forced!r} is not installed")
+        return codecs[forced]
+    return next(iter(codecs.values()))
+
+
+codec = _select()
+dumps = codec.dumps
+loads = codec.loads
+
+
+def dumps_str(obj: Any) -> str:
+    return dumps(obj).decode()
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with the selected codec; the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
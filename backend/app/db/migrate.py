@@ -0,0 +1,59 @@
+"""Bring the database schema up to date on startup.
+
+Alembic migrations run first, so tables that already exist pick up new columns
+(``create_all`` never alters a table), then ``create_all`` adds the tables no
+migration creates. Every API and worker process calls this on startup; a
+session-level advisory lock makes them take turns, so only the first one finds
+anything to migrate.
+
+A ledger that is empty while trades exist was just added by a migration (ingest
+books every trade it writes), so the first process also replays those trades into
+it before anyone else starts booking against it.
+"""
+
+import logging
+from pathlib import Path
+
+from alembic.config import Config
+from sqlalchemy import Connection, exists, select, text
+
+from alembic import command
+from app.db.engine import engine
+from app.db.models import Base, Trade, WalletPosition
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+MIGRATION_LOCK = 0x706F6C79  # pg advisory lock key shared by every process ("poly")
+
+
+def _upgrade(connection: Connection) -> None:
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    config.attributes["connection"] = connection  # picked up by alembic/env.py
+    command.upgrade(config, "head")
+    Base.metadata.create_all(connection)
+
+
+async def upgrade_schema() -> None:
+    """Run pending migrations and create any missing tables, then fill an empty ledger."""
+    lock = {"key": MIGRATION_LOCK}
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), lock)
+        await conn.commit()
+        try:
+            async with conn.begin():
+                await conn.run_sync(_upgrade)
+                needs_replay = await conn.scalar(
+                    select(exists(select(Trade.id)) & ~exists(select(WalletPosition.wallet)))
+                )
+            logger.info("database schema up to date")
+            if needs_replay:
+                # Its own transaction: it must see the committed migration
+                from app.workers.rebuild_positions import rebuild_positions
+
+                logger.info("wallet_positions is empty: replaying existing trades into it")
+                await rebuild_positions()
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), lock)
+            await conn.commit()
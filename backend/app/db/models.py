@@ -1,11 +1,12 @@
 """ORM models for polyscoop data layer."""
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    Date,
     DateTime,
     Float,
     Index,
@@ -57,6 +58,8 @@ class Trade(Base):
     outcome: Mapped[str] = mapped_column(String(32), default="")
     title: Mapped[str] = mapped_column(Text, default="")
     timestamp: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    # PnL this trade realized against the wallet's average cost (see wallet_positions)
+    realized_pnl: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     __table_args__ = (
@@ -65,6 +68,92 @@ class Trade(Base):
     )
 
 
+class TradeStaging(Base):
+    """Unlogged landing table for COPY-based bulk trade ingestion.
+
+    Rows are COPYed in under a per-batch ``batch_id`` and moved into ``trades`` by a
+    single DELETE ... RETURNING / INSERT ... ON CONFLICT statement in the same
+    transaction, so the table is empty outside of an in-flight batch.
+    """
+
+    __tablename__ = "trades_staging"
+
+    batch_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    transaction_hash: Mapped[str] = mapped_column(String(128), nullable=False)
+    asset_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    condition_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    wallet: Mapped[str] = mapped_column(String(42), nullable=False)
+    side: Mapped[str] = mapped_column(String(4), nullable=False)
+    size: Mapped[float] = mapped_column(Float, nullable=False)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    outcome: Mapped[str] = mapped_column(String(32), default="")
+    title: Mapped[str] = mapped_column(Text, default="")
+    timestamp: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    realized_pnl: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+    # No DB primary key (duplicates within a batch are legal); the ORM just needs one
+    __mapper_args__ = {"primary_key": [batch_id, transaction_hash, asset_id]}
+
+
+class BackfillCheckpoint(Base):
+    """Per-market progress of a historical trade backfill, so a crashed run can resume."""
+
+    __tablename__ = "backfill_checkpoints"
+
+    condition_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    from_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    to_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    page_offset: Mapped[int] = mapped_column(Integer, default=0)  # Data API rows already paged
+    oldest_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    trades: Mapped[int] = mapped_column(Integer, default=0)  # rows inserted so far
+    done: Mapped[bool] = mapped_column(Boolean, default=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
+
+
+class WalletDailyRollup(Base):
+    """Per-wallet, per-market, per-UTC-day trade totals, maintained at ingest time.
+
+    Scoring reads these instead of rescanning ``trades``; only the partial day at the
+    start of a rolling window still comes from raw trades.
+    """
+
+    __tablename__ = "wallet_daily_rollups"
+
+    wallet: Mapped[str] = mapped_column(String(42), primary_key=True)
+    condition_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    buy_notional: Mapped[float] = mapped_column(Float, default=0.0)
+    sell_notional: Mapped[float] = mapped_column(Float, default=0.0)
+    trade_count: Mapped[int] = mapped_column(Integer, default=0)
+    realized_pnl: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+
+    __table_args__ = (Index("ix_rollups_day", "day"),)
+
+
+class WalletPosition(Base):
+    """Running per-wallet, per-outcome-token position, booked as trades are ingested.
+
+    Buys move the average cost; sells realize ``(price - avg_cost) * shares`` on the
+    shares the wallet is known to hold. ``python -m app.workers.rebuild_positions``
+    replays ``trades`` in timestamp order to rebuild it.
+    """
+
+    __tablename__ = "wallet_positions"
+
+    wallet: Mapped[str] = mapped_column(String(42), primary_key=True)
+    asset_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    condition_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    shares: Mapped[float] = mapped_column(Float, default=0.0)
+    avg_cost: Mapped[float] = mapped_column(Float, default=0.0)
+    realized_pnl: Mapped[float] = mapped_column(Float, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
+
+
 class Wallet(Base):
     """Discovered trader profiles."""
 
@@ -78,14 +167,26 @@ class Wallet(Base):
     labels: Mapped[list[str]] = mapped_column(ARRAY(String), default=list)
 
 
+class ScoreGeneration(Base):
+    """One run of the wallet scorer. Readers use the newest published generation."""
+
+    __tablename__ = "score_generations"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    published_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    scores: Mapped[int] = mapped_column(Integer, default=0)
+
+
 class WalletScore(Base):
-    """Pre-computed rankings per timeframe."""
+    """Pre-computed rankings per timeframe, one full set per scorer generation."""
 
     __tablename__ = "wallet_scores"
 
     wallet: Mapped[str] = mapped_column(String(42), primary_key=True)
     category: Mapped[str] = mapped_column(String(64), primary_key=True, default="all")
     timeframe: Mapped[str] = mapped_column(String(8), primary_key=True)  # 24h, 7d, 30d, all
+    generation: Mapped[int] = mapped_column(BigInteger, primary_key=True)  # score_generations.id
     volume: Mapped[float] = mapped_column(Float, default=0.0)
     pnl: Mapped[float] = mapped_column(Float, default=0.0)
     win_rate: Mapped[float] = mapped_column(Float, default=0.0)
@@ -97,7 +198,9 @@ class WalletScore(Base):
         DateTime, server_default=func.now(), onupdate=func.now()
     )
 
-    __table_args__ = (Index("ix_ws_timeframe_rank_vol", "timeframe", "rank_volume"),)
+    __table_args__ = (
+        Index("ix_ws_generation_slice", "generation", "category", "timeframe", "rank_volume"),
+    )
 
 
 class WalletSnapshot(Base):
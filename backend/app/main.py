@@ -12,6 +12,7 @@ from fastapi.staticfiles import StaticFiles
 from app.api.router import api_router
 from app.core.config import settings
 from app.core.exceptions import register_exception_handlers
+from app.core.json_codec import FastJSONResponse
 from app.core.logging import setup_logging
 from app.core.middleware import CorrelationIdMiddleware
 
@@ -25,12 +26,11 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logger.info("polyscoop starting up")
 
-    # Initialize database tables
+    # Apply pending migrations, then create any missing tables
     from app.db.engine import engine
-    from app.db.models import Base
+    from app.db.migrate import upgrade_schema
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await upgrade_schema()
     logger.info("database tables ready")
 
     # Initialize Redis
@@ -46,10 +46,23 @@ async def lifespan(app: FastAPI):
         logger.warning("redis not available — live features disabled")
         app.state.redis = None
 
-    # Start background workers
+    # Start background workers (unless they run in a separate `python -m app.workers`)
     from app.workers.manager import start_workers, stop_workers
 
-    await start_workers()
+    if cfg.RUN_WORKERS:
+        await start_workers(redis=app.state.redis)
+    else:
+        logger.info("RUN_WORKERS=false — background workers run in a separate process")
+
+    # Sliding 24h window behind the short-timeframe leaderboards
+    from app.services import live_window
+
+    live_window.start(redis=app.state.redis)
+
+    # Sorted per-slice rank index over the published scores, for rank lookups
+    from app.services import rank_index
+
+    rank_index.start()
 
     # Initialize shared httpx client
     from app.services.polymarket import get_client
@@ -67,7 +80,10 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("polyscoop shutting down")
-    await stop_workers()
+    await live_window.stop()
+    await rank_index.stop()
+    if cfg.RUN_WORKERS:
+        await stop_workers()
 
     from app.services.polymarket import close_client
 
@@ -82,6 +98,7 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan,
 )
 
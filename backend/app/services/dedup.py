@@ -0,0 +1,76 @@
+"""In-process dedup of recently ingested trades, shared by the poller and listener.
+
+The same trade usually arrives twice — once over the CLOB WebSocket and once from
+the Data API poll — and each duplicate would otherwise cost a DB round trip just to
+be rejected by ``uq_trade_tx_asset``. Keys are claimed before a write and released
+if the write fails, so a trade is never dropped because a failed batch saw it first.
+"""
+
+import time
+from collections import OrderedDict
+
+
+def trade_key(transaction_hash: str, asset_id: str) -> str:
+    """Normalized dedup key; matches the ``uq_trade_tx_asset`` constraint columns."""
+    return f"{transaction_hash.lower()}:{asset_id}"
+
+
+class TradeDeduper:
+    """Bounded, time-windowed set of trade keys (insertion-ordered, oldest evicted first)."""
+
+    def __init__(self, *, max_entries: int = 200_000, ttl: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.ttl
+        while self._seen:
+            key, added = next(iter(self._seen.items()))
+            if added >= cutoff and len(self._seen) <= self.max_entries:
+                break
+            del self._seen[key]
+            self.evictions += 1
+
+    def claim(self, rows: list[dict], now: float | None = None) -> list[dict]:
+        """Return the rows not seen within the window, and mark them as seen.
+
+        Duplicates within ``rows`` are collapsed to their first occurrence.
+        """
+        now = time.monotonic() if now is None else now
+        fresh = []
+        for row in rows:
+            key = trade_key(row["transaction_hash"], row["asset_id"])
+            if key in self._seen:
+                self.hits += 1
+                continue
+            self.misses += 1
+            self._seen[key] = now
+            fresh.append(row)
+        self._expire(now)
+        return fresh
+
+    def release(self, rows: list[dict]) -> None:
+        """Forget rows whose write failed so a later arrival can retry them."""
+        for row in rows:
+            self._seen.pop(trade_key(row["transaction_hash"], row["asset_id"]), None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._seen),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# Shared by every ingestion path in this process
+trade_dedup = TradeDeduper()
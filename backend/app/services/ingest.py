@@ -0,0 +1,128 @@
+"""Trade ingestion writes — row normalization, multi-row inserts and the COPY path."""
+
+import logging
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Trade, TradeStaging
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 2900  # 11 cols per row → stays under asyncpg's 32767 param limit
+COPY_THRESHOLD = 1000  # batches at least this large go through COPY instead of INSERT
+
+_TRADE_COLUMNS = (
+    Trade.transaction_hash,
+    Trade.asset_id,
+    Trade.condition_id,
+    Trade.wallet,
+    Trade.side,
+    Trade.size,
+    Trade.price,
+    Trade.outcome,
+    Trade.title,
+    Trade.timestamp,
+    Trade.realized_pnl,
+)
+
+
+def normalize_trade(row: dict) -> dict:
+    """Canonicalize identifiers so the same trade looks identical from every source.
+
+    Hashes and addresses are lowercased, and millisecond timestamps (CLOB) are
+    converted to seconds (Data API).
+    """
+    row["transaction_hash"] = row["transaction_hash"].lower()
+    row["wallet"] = row["wallet"].lower()
+    if row["timestamp"] > 10**12:
+        row["timestamp"] //= 1000
+    return row
+
+
+def parse_data_api_trade(t: dict, condition_id: str) -> dict | None:
+    """Convert a Data API ``/trades`` item into a ``trades`` row, or None if it lacks ids."""
+    tx_hash = t.get("transactionHash", "")
+    asset_id = t.get("asset", "")
+    if not tx_hash or not asset_id:
+        return None
+
+    return normalize_trade(
+        {
+            "transaction_hash": tx_hash,
+            "asset_id": asset_id,
+            "condition_id": condition_id,
+            "wallet": t.get("proxyWallet", ""),
+            "side": t.get("side", ""),
+            "size": float(t.get("size", 0)),
+            "price": float(t.get("price", 0)),
+            "outcome": t.get("outcome", ""),
+            "title": t.get("title", ""),
+            "timestamp": int(t.get("timestamp", 0)),
+        }
+    )
+
+
+async def insert_trades(session: AsyncSession, rows: list[dict]) -> list[dict]:
+    """Insert trade rows, skipping duplicates. Returns the rows that were actually inserted."""
+    inserted: list[dict] = []
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        stmt = pg_insert(Trade).values(rows[i : i + INSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_nothing(constraint="uq_trade_tx_asset").returning(
+            *_TRADE_COLUMNS
+        )
+        result = await session.execute(stmt)
+        inserted.extend(dict(r._mapping) for r in result.all())
+    return inserted
+
+
+_COLUMN_NAMES = [c.key for c in _TRADE_COLUMNS]
+_COLUMN_LIST = ", ".join(_COLUMN_NAMES)
+
+# Move one staged batch into ``trades`` in a single statement: the CTE empties the
+# batch from staging, duplicates are dropped by the unique constraint, and the rows
+# that made it in come back for wallet accounting.
+_MERGE_STAGED = text(
+    f"""
+    WITH batch AS (
+        DELETE FROM {TradeStaging.__tablename__}
+        WHERE batch_id = :batch_id
+        RETURNING {_COLUMN_LIST}
+    )
+    INSERT INTO {Trade.__tablename__} ({_COLUMN_LIST})
+    SELECT {_COLUMN_LIST} FROM batch
+    ON CONFLICT ON CONSTRAINT uq_trade_tx_asset DO NOTHING
+    RETURNING {_COLUMN_LIST}
+    """
+)
+
+
+async def copy_trades(session: AsyncSession, rows: list[dict]) -> list[dict]:
+    """Bulk-load trade rows via COPY into ``trades_staging`` and merge into ``trades``.
+
+    Not bound by the bind-parameter limit, so any number of rows goes in one round
+    trip. Runs inside the session's transaction; a rollback discards the staged batch
+    too. Returns the rows that were actually inserted.
+    """
+    if not rows:
+        return []
+
+    batch_id = uuid.uuid4()
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+        TradeStaging.__tablename__,
+        records=[(batch_id, *(r[name] for name in _COLUMN_NAMES)) for r in rows],
+        columns=["batch_id", *_COLUMN_NAMES],
+    )
+    result = await session.execute(_MERGE_STAGED, {"batch_id": batch_id})
+    return [dict(r._mapping) for r in result.all()]
+
+
+async def write_trades(session: AsyncSession, rows: list[dict]) -> list[dict]:
+    """Insert trade rows using COPY for large batches and INSERT for small ones."""
+    if len(rows) >= COPY_THRESHOLD:
+        return await copy_trades(session, rows)
+    return await insert_trades(session, rows)
@@ -0,0 +1,305 @@
+"""Append-only journal of raw upstream payloads (CLOB frames, Data API trade pages).
+
+Payloads are recorded before they are parsed, so a parsing or ingestion bug never
+loses the original data: fix the bug, then replay the affected window with
+``python -m app.workers.replay``.
+
+Layout: ``<dir>/<start_ns>-<pid>.seg`` segments, rotated by size and age and
+pruned oldest-first past a total size cap. Each segment is ``MAGIC`` followed by
+records of::
+
+    u32 length | u32 crc32 | u64 time_ns | u8 source | zlib(payload)[length]
+
+with zlib using the preset dictionary ``_ZDICT``.
+
+Segments are read through ``mmap``. A torn final record (crash mid-write) fails
+its length or CRC check and ends that segment's iteration.
+"""
+
+import heapq
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PSJ1"
+_HEADER = struct.Struct("<IIQB")
+SEGMENT_BYTES = 64 * 1024 * 1024  # rotate after this many bytes...
+SEGMENT_SECONDS = 3600  # ...or this many seconds, whichever comes first
+FLUSH_INTERVAL = 1.0  # max seconds a written record waits in the file buffer
+QUEUE_SIZE = 100_000  # payloads waiting for the writer thread before appends drop
+COMPRESS_LEVEL = 1  # frames are small; favour speed over ratio
+
+# Preset zlib dictionary of the field names and values common to CLOB frames and Data
+# API trades. Records are compressed one at a time, and frames of a few hundred bytes
+# barely compress without shared context. Changing it requires a new MAGIC.
+_ZDICT = (
+    b'"proxyWallet":"0x","side":"SELL","side":"BUY","asset":"","conditionId":"0x",'
+    b'"size":,"price":,"timestamp":,"title":"","slug":"","icon":"https://polymarket-upload'
+    b'.s3.us-east-2.amazonaws.com/","eventSlug":"","outcome":"Yes","outcome":"No",'
+    b'"outcomeIndex":0,"name":"","pseudonym":"","bio":"","profileImage":"",'
+    b'"profileImageOptimized":"","transactionHash":"0x"}, {"market":"0x","trades":[{'
+    b'{"event_type":"last_trade_price","asset_id":"","market":"0x","price":"0.","size":"",'
+    b'"fee_rate_bps":"0","side":"BUY","side":"SELL","timestamp":"17","transaction_hash":"0x'
+)
+
+SOURCES = ("trade_listener", "trade_poller")
+_SOURCE_CODES = {name: i + 1 for i, name in enumerate(SOURCES)}
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    time_ns: int
+    source: str
+    payload: bytes
+
+
+class EventJournal:
+    """Writer for one process; segment names carry the pid so processes can share a dir.
+
+    ``append`` only enqueues the payload. A writer thread compresses and writes
+    records, rotates segments, and flushes whenever it has been idle for
+    ``FLUSH_INTERVAL`` or that long has passed since the last flush, so neither zlib
+    nor disk I/O runs on the event loop and a quiet period still reaches the disk.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        segment_bytes: int = SEGMENT_BYTES,
+        segment_seconds: float = SEGMENT_SECONDS,
+        max_bytes: int | None = None,
+        queue_size: int = QUEUE_SIZE,
+    ) -> None:
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_bytes = max_bytes
+        self.records = 0
+        self.bytes_raw = 0
+        self.bytes_written = 0
+        self.segments_rotated = 0
+        self.dropped = 0
+        self._file = None
+        self._segment: Path | None = None
+        self._segment_size = 0
+        self._opened = 0.0
+        self._queue: queue.Queue[tuple[str, bytes, int] | None] = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._write_loop, name="journal", daemon=True)
+        self._thread.start()
+
+    def _open_segment(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._segment = self.directory / f"{time.time_ns()}-{os.getpid()}.seg"
+        self._file = open(self._segment, "ab")
+        self._file.write(MAGIC)
+        self._segment_size = len(MAGIC)
+        self._opened = time.monotonic()
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self) -> None:
+        self._close_segment()
+        self.segments_rotated += 1
+        if self.max_bytes is not None:
+            self._prune()
+        self._open_segment()
+
+    def _prune(self) -> None:
+        """Delete the oldest segments until the journal fits in ``max_bytes``."""
+        segments = sorted(self.directory.glob("*.seg"), key=_segment_start)
+        total = sum(p.stat().st_size for p in segments)
+        for path in segments:
+            if total <= (self.max_bytes or 0):
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            logger.info("journal pruned %s", path.name)
+
+    def append(self, source: str, payload: bytes | str, time_ns: int | None = None) -> None:
+        """Queue one raw payload for the writer thread; dropped (and counted) when full."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        try:
+            self._queue.put_nowait((source, payload, time_ns or time.time_ns()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, source: str, payload: bytes, time_ns: int) -> None:
+        if self._file is None:
+            self._open_segment()
+        elif (
+            self._segment_size >= self.segment_bytes
+            or time.monotonic() - self._opened >= self.segment_seconds
+        ):
+            self._rotate()
+
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zdict=_ZDICT)
+        data = compressor.compress(payload) + compressor.flush()
+        header = _HEADER.pack(len(data), zlib.crc32(data), time_ns, _SOURCE_CODES[source])
+        assert self._file is not None
+        self._file.write(header)
+        self._file.write(data)
+        self._segment_size += len(header) + len(data)
+        self.records += 1
+        self.bytes_raw += len(payload)
+        self.bytes_written += len(header) + len(data)
+
+    def _write_loop(self) -> None:
+        unflushed = False
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                item = ()  # idle: flush below
+            if item is None:
+                break
+            if item:
+                try:
+                    self._write(*item)
+                    unflushed = True
+                except Exception:
+                    logger.exception("journal write failed")
+            now = time.monotonic()
+            if unflushed and (not item or now - last_flush >= FLUSH_INTERVAL):
+                try:
+                    self._file.flush()  # type: ignore[union-attr]
+                except Exception:
+                    logger.exception("journal flush failed")
+                unflushed = False
+                last_flush = now
+        self._close_segment()
+
+    def close(self) -> None:
+        """Write everything queued so far, then close the segment and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "segment": self._segment.name if self._segment else None,
+            "records": self.records,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "bytes_raw": self.bytes_raw,
+            "bytes_written": self.bytes_written,
+            "compression_ratio": self.bytes_raw / self.bytes_written if self.bytes_written else 0.0,
+            "segments_rotated": self.segments_rotated,
+        }
+
+
+def _segment_start(path: Path) -> int:
+    return int(path.stem.split("-", 1)[0])
+
+
+def read_segment(path: str | Path, since_ns: int = 0) -> Iterator[JournalRecord]:
+    """Yield a segment's records in write order, stopping at the first torn record.
+
+    Records older than ``since_ns`` are skipped without being decompressed.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= len(MAGIC):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a journal segment")
+            pos, end = len(MAGIC), len(mm)
+            while pos + _HEADER.size <= end:
+                length, crc, time_ns, code = _HEADER.unpack_from(mm, pos)
+                start = pos + _HEADER.size
+                data = mm[start : start + length]
+                if len(data) < length or zlib.crc32(data) != crc or not 0 < code <= len(SOURCES):
+                    logger.warning("journal %s: torn record at byte %d", Path(path).name, pos)
+                    return
+                if time_ns >= since_ns:
+                    payload = zlib.decompressobj(zdict=_ZDICT).decompress(data)
+                    yield JournalRecord(time_ns, SOURCES[code - 1], payload)
+                pos = start + length
+
+
+def read_journal(
+    directory: str | Path,
+    *,
+    since_ns: int = 0,
+    until_ns: int | None = None,
+    sources: set[str] | None = None,
+) -> Iterator[JournalRecord]:
+    """Yield records from every segment in ``directory`` merged into timestamp order."""
+    segments = sorted(Path(directory).glob("*.seg"), key=_segment_start)
+    if until_ns is not None:
+        segments = [p for p in segments if _segment_start(p) <= until_ns]
+    merged = heapq.merge(*(read_segment(p, since_ns) for p in segments), key=lambda r: r.time_ns)
+    for record in merged:
+        if sources is not None and record.source not in sources:
+            continue
+        if until_ns is not None and record.time_ns > until_ns:
+            break
+        yield record
+
+
+# Process-wide journal, open while a journaling worker (listener, poller) runs here.
+# With leader election that is only the process leading one of them.
+_journal: EventJournal | None = None
+_users = 0
+
+
+def open_journal() -> EventJournal | None:
+    """Open the journal for one more worker if JOURNAL_DIR is set; pair with close."""
+    global _journal, _users
+    if not settings.JOURNAL_DIR:
+        return None
+    _users += 1
+    if _journal is None:
+        _journal = EventJournal(
+            settings.JOURNAL_DIR, max_bytes=settings.JOURNAL_MAX_MB * 1024 * 1024
+        )
+        logger.info("journaling raw upstream payloads to %s", settings.JOURNAL_DIR)
+    return _journal
+
+
+def close_journal() -> None:
+    """Release one worker's use; the last one flushes and closes the journal."""
+    global _journal, _users
+    if _journal is None:
+        return
+    _users -= 1
+    if _users <= 0:
+        _journal.close()
+        _journal = None
+        _users = 0
+
+
+def enabled() -> bool:
+    return _journal is not None
+
+
+def record(source: str, payload: bytes | str) -> None:
+    """Journal a raw payload if journaling is enabled; never raises into ingestion."""
+    if _journal is None:
+        return
+    try:
+        _journal.append(source, payload)
+    except Exception:
+        logger.exception("journal append failed")
+
+
+def journal_stats() -> dict | None:
+    return _journal.stats() if _journal else None
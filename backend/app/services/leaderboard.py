@@ -4,7 +4,7 @@ Used when scoping filters (market, event_id, custom date range) are provided
 and pre-computed WalletScore rows don't apply.
 """
 
-from sqlalchemy import case, func, select
+from sqlalchemy import Float, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import TrackedMarket, Trade, Wallet
@@ -30,6 +30,10 @@ async def compute_live_leaderboard(
 ) -> tuple[list[dict], int]:
     """Aggregate rankings on-the-fly from the Trade table.
 
+    Thresholds, ranks, the total count and the page are all computed by one SQL
+    statement, so only ``limit`` rows come back however many wallets traded.
+    ``rank_volume`` and ``rank_pnl`` rank the wallets that passed the filters.
+
     Returns (rows, total_count).
     """
     # ── Build condition_id filter set ────────────────────────
@@ -41,126 +45,98 @@ async def compute_live_leaderboard(
         cids = select(TrackedMarket.condition_id).where(TrackedMarket.event_id == event_id)
         trade_filters.append(Trade.condition_id.in_(cids))
 
-    if category == "mentions" and not market:
-        mentions_cids = select(TrackedMarket.condition_id).where(
-            TrackedMarket.category == "mentions"
-        )
-        trade_filters.append(Trade.condition_id.in_(mentions_cids))
+    if category != "all" and not market:
+        category_cids = select(TrackedMarket.condition_id).where(TrackedMarket.category == category)
+        trade_filters.append(Trade.condition_id.in_(category_cids))
 
     if from_ts is not None:
         trade_filters.append(Trade.timestamp >= from_ts)
     if to_ts is not None:
         trade_filters.append(Trade.timestamp <= to_ts)
+    if label:
+        labelled = select(Wallet.address).where(Wallet.labels.contains([label]))
+        trade_filters.append(Trade.wallet.in_(labelled))
 
-    # ── Volume & trade count per wallet ──────────────────────
-    vol_q = (
+    # ── Volume, trades and realized PnL per wallet+market ────
+    per_market = (
         select(
             Trade.wallet,
-            func.count().label("trade_count"),
+            func.count().label("trades"),
             func.sum(Trade.size * Trade.price).label("volume"),
+            func.sum(Trade.realized_pnl).label("pnl"),
         )
         .where(*trade_filters)
-        .group_by(Trade.wallet)
+        .group_by(Trade.wallet, Trade.condition_id)
+        .subquery("per_market")
     )
-
-    # ── PnL per wallet+market ────────────────────────────────
-    pnl_sub = (
+    m = per_market.c
+
+    # ── Per wallet, with threshold filters ───────────────────
+    trade_count = func.sum(m.trades)
+    volume = func.sum(m.volume)
+    pnl = func.sum(m.pnl)
+    win_rate = cast(func.count().filter(m.pnl > 0), Float) / func.count()
+    having: list = []
+    if min_trades is not None:
+        having.append(trade_count >= min_trades)
+    if min_volume is not None:
+        having.append(volume >= min_volume)
+    if min_win_rate is not None:
+        having.append(win_rate >= min_win_rate)
+    if pnl_positive:
+        having.append(pnl > 0)
+    per_wallet = (
         select(
-            Trade.wallet,
-            Trade.condition_id,
-            func.sum(
-                case(
-                    (Trade.side == "SELL", Trade.size * Trade.price),
-                    else_=-Trade.size * Trade.price,
-                )
-            ).label("market_pnl"),
+            m.wallet,
+            volume.label("volume"),
+            pnl.label("pnl"),
+            win_rate.label("win_rate"),
+            trade_count.label("trade_count"),
         )
-        .where(*trade_filters)
-        .group_by(Trade.wallet, Trade.condition_id)
-        .subquery()
+        .group_by(m.wallet)
+        .having(*having)
+        .subquery("per_wallet")
     )
-
-    pnl_q = select(
-        pnl_sub.c.wallet,
-        func.sum(pnl_sub.c.market_pnl).label("pnl"),
-        func.count().label("market_count"),
-        func.sum(case((pnl_sub.c.market_pnl > 0, 1), else_=0)).label("wins"),
-    ).group_by(pnl_sub.c.wallet)
-
-    # Execute both
-    vol_rows = {r.wallet: r for r in (await session.execute(vol_q)).all()}
-    pnl_rows = {r.wallet: r for r in (await session.execute(pnl_q)).all()}
-
-    if not vol_rows:
-        return [], 0
-
-    # ── Label filter: pre-fetch matching wallets ─────────────
-    label_addrs: set[str] | None = None
-    if label:
-        label_q = select(Wallet.address).where(Wallet.labels.contains([label]))
-        label_result = await session.execute(label_q)
-        label_addrs = {r[0] for r in label_result.all()}
-
-    # ── Merge into result list ───────────────────────────────
-    rows: list[dict] = []
-    for wallet_addr, vr in vol_rows.items():
-        pr = pnl_rows.get(wallet_addr)
-        pnl = float(pr.pnl or 0) if pr else 0.0
-        market_count = int(pr.market_count or 0) if pr else 0
-        wins = int(pr.wins or 0) if pr else 0
-        win_rate = wins / market_count if market_count > 0 else 0.0
-        volume = float(vr.volume or 0)
-        trade_count = int(vr.trade_count or 0)
-
-        # Threshold filters
-        if min_trades is not None and trade_count < min_trades:
-            continue
-        if min_volume is not None and volume < min_volume:
-            continue
-        if min_win_rate is not None and win_rate < min_win_rate:
-            continue
-        if pnl_positive and pnl <= 0:
-            continue
-        if label_addrs is not None and wallet_addr not in label_addrs:
-            continue
-
-        rows.append(
-            {
-                "address": wallet_addr,
-                "volume": volume,
-                "pnl": pnl,
-                "win_rate": win_rate,
-                "trade_count": trade_count,
-                "rank_volume": 0,
-                "rank_pnl": 0,
-            }
-        )
-
-    # ── Sort ─────────────────────────────────────────────────
-    sort_key = {
-        "volume": lambda r: r["volume"],
-        "pnl": lambda r: r["pnl"],
-        "win_rate": lambda r: r["win_rate"],
-        "trade_count": lambda r: r["trade_count"],
-    }.get(sort_by, lambda r: r["volume"])
-
-    rows.sort(key=sort_key, reverse=(sort_dir == "desc"))
-
-    # Assign ranks
-    for i, row in enumerate(rows, 1):
-        row["rank_volume"] = i  # rank in current sort order
-
-    total = len(rows)
-    page = rows[offset : offset + limit]
-
-    # Re-rank the full list by volume and pnl for the response
-    by_vol = sorted(rows, key=lambda r: r["volume"], reverse=True)
-    by_pnl = sorted(rows, key=lambda r: r["pnl"], reverse=True)
-    rank_vol = {r["address"]: i for i, r in enumerate(by_vol, 1)}
-    rank_pnl = {r["address"]: i for i, r in enumerate(by_pnl, 1)}
-
-    for row in page:
-        row["rank_volume"] = rank_vol[row["address"]]
-        row["rank_pnl"] = rank_pnl[row["address"]]
-
-    return page, total
+    w = per_wallet.c
+
+    # ── Ranks and total over every wallet that passed ────────
+    ranked = select(
+        per_wallet,
+        func.row_number().over(order_by=(w.volume.desc(), w.wallet)).label("rank_volume"),
+        func.row_number().over(order_by=(w.pnl.desc(), w.wallet)).label("rank_pnl"),
+        func.count().over().label("total"),
+    ).subquery("ranked")
+    r = ranked.c
+
+    # ── Sort and page ────────────────────────────────────────
+    sort_col = {
+        "volume": r.volume,
+        "pnl": r.pnl,
+        "win_rate": r.win_rate,
+        "trade_count": r.trade_count,
+    }.get(sort_by, r.volume)
+    order = sort_col.desc() if sort_dir == "desc" else sort_col.asc()
+    q = select(ranked).order_by(order, r.wallet).offset(offset).limit(limit)
+    page = (await session.execute(q)).all()
+
+    if page:
+        total = page[0].total
+    elif offset:
+        # Paged past the end: no row carries the window count
+        total = (await session.execute(select(func.count()).select_from(per_wallet))).scalar()
+    else:
+        total = 0
+
+    rows = [
+        {
+            "address": p.wallet,
+            "volume": float(p.volume or 0),
+            "pnl": float(p.pnl or 0),
+            "win_rate": float(p.win_rate),
+            "trade_count": int(p.trade_count),
+            "rank_volume": p.rank_volume,
+            "rank_pnl": p.rank_pnl,
+        }
+        for p in page
+    ]
+    return rows, total or 0
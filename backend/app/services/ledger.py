@@ -0,0 +1,181 @@
+"""Per-wallet position ledger — net shares, average cost and realized PnL per token.
+
+Trades are booked as they are ingested: each batch locks and loads the positions it
+touches, applies its trades in timestamp order (O(1) each), and writes the positions
+back in the same transaction as the trades themselves. Every trade row carries the
+PnL it realized, so rollups, scoring and the live leaderboards sum realized PnL
+instead of treating every buy as a loss until it is sold.
+
+Trades are booked in arrival order. A backfill of history older than trades already
+booked leaves average costs that differ from a strict timestamp replay, so it ends
+by rebuilding the positions of the wallets it touched
+(:func:`app.workers.rebuild_positions.rebuild_positions`).
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+
+from sqlalchemy import bindparam, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Trade, WalletPosition
+from app.services.ingest import write_trades
+
+logger = logging.getLogger(__name__)
+
+POSITION_BATCH_SIZE = 5000  # up to 6 cols per row → stays under asyncpg's 32767 param limit
+DUST = 1e-9  # share balances below this are treated as a closed position
+
+PositionKey = tuple[str, str]  # (wallet, asset_id)
+
+
+@dataclass(slots=True)
+class Position:
+    condition_id: str
+    shares: float = 0.0
+    avg_cost: float = 0.0
+    realized_pnl: float = 0.0
+
+    def book(self, side: str, size: float, price: float) -> float:
+        """Apply one trade and return the PnL it realized.
+
+        Sells only realize against shares the ledger has seen bought; any excess (a
+        position opened before tracking started) has no known cost and realizes 0.
+        """
+        if side != "SELL":
+            shares = self.shares + size
+            if shares > 0:
+                self.avg_cost = (self.shares * self.avg_cost + size * price) / shares
+            self.shares = shares
+            return 0.0
+
+        closed = min(size, self.shares)
+        realized = (price - self.avg_cost) * closed
+        self.shares -= closed
+        if self.shares < DUST:
+            self.shares = self.avg_cost = 0.0
+        self.realized_pnl += realized
+        return realized
+
+
+def book_rows(positions: dict[PositionKey, Position], rows: list[dict]) -> None:
+    """Book ``rows`` in timestamp order, setting each row's ``realized_pnl``.
+
+    Positions missing from ``positions`` are opened empty.
+    """
+    for row in sorted(rows, key=lambda r: r["timestamp"]):
+        key = (row["wallet"], row["asset_id"])
+        position = positions.get(key)
+        if position is None:
+            position = positions[key] = Position(row["condition_id"])
+        row["realized_pnl"] = position.book(row["side"], row["size"], row["price"])
+
+
+async def lock_positions(session: AsyncSession, rows: list[dict]) -> dict[PositionKey, Position]:
+    """Lock and load the positions ``rows`` touch, creating empty ones as needed.
+
+    Creating missing rows first means concurrent writers booking the same new
+    position queue on its row lock instead of both starting from zero. Keys are
+    locked in sorted order so writers can't deadlock each other.
+    """
+    condition_ids = {(r["wallet"], r["asset_id"]): r["condition_id"] for r in rows}
+    keys = sorted(condition_ids)
+    p = WalletPosition
+    positions: dict[PositionKey, Position] = {}
+    for i in range(0, len(keys), POSITION_BATCH_SIZE):
+        chunk = keys[i : i + POSITION_BATCH_SIZE]
+        await session.execute(
+            pg_insert(p)
+            .values(
+                [
+                    {"wallet": w, "asset_id": a, "condition_id": condition_ids[w, a]}
+                    for w, a in chunk
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["wallet", "asset_id"])
+        )
+        result = await session.execute(
+            select(p.wallet, p.asset_id, p.condition_id, p.shares, p.avg_cost, p.realized_pnl)
+            .where(tuple_(p.wallet, p.asset_id).in_(chunk))
+            .order_by(p.wallet, p.asset_id)
+            .with_for_update()
+        )
+        for wallet, asset_id, *state in result.all():
+            positions[wallet, asset_id] = Position(*state)
+    return positions
+
+
+async def save_positions(session: AsyncSession, positions: dict[PositionKey, Position]) -> None:
+    """Write booked positions back. Their rows must already be locked by this transaction."""
+    rows = [
+        {
+            "wallet": wallet,
+            "asset_id": asset_id,
+            "condition_id": pos.condition_id,
+            "shares": pos.shares,
+            "avg_cost": pos.avg_cost,
+            "realized_pnl": pos.realized_pnl,
+        }
+        for (wallet, asset_id), pos in sorted(positions.items())
+    ]
+    for i in range(0, len(rows), POSITION_BATCH_SIZE):
+        stmt = pg_insert(WalletPosition).values(rows[i : i + POSITION_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["wallet", "asset_id"],
+            set_={
+                "shares": stmt.excluded.shares,
+                "avg_cost": stmt.excluded.avg_cost,
+                "realized_pnl": stmt.excluded.realized_pnl,
+                "updated_at": func.now(),
+            },
+        )
+        await session.execute(stmt)
+
+
+_SET_REALIZED = (
+    Trade.__table__.update()
+    .where(
+        Trade.transaction_hash == bindparam("tx_hash"),
+        Trade.asset_id == bindparam("asset"),
+    )
+    .values(realized_pnl=bindparam("pnl"))
+)
+
+
+async def book_trades(
+    session: AsyncSession,
+    rows: list[dict],
+    *,
+    write: Callable[[AsyncSession, list[dict]], Awaitable[list[dict]]] = write_trades,
+) -> list[dict]:
+    """Insert trade rows with ``write`` and book the new ones into ``wallet_positions``.
+
+    Rows are booked before they are written so each is inserted with its realized PnL
+    in a single pass. If any turn out to be duplicates, the batch is re-booked from the
+    locked starting positions with only the inserted rows, and the few rows whose
+    realized PnL changed are corrected. Returns the inserted rows.
+    """
+    if not rows:
+        return []
+    start = await lock_positions(session, rows)
+    positions = {key: replace(pos) for key, pos in start.items()}
+    book_rows(positions, rows)
+    inserted = await write(session, rows)
+
+    if len(inserted) < len(rows):
+        positions = {key: replace(pos) for key, pos in start.items()}
+        booked = {(r["transaction_hash"], r["asset_id"]): r["realized_pnl"] for r in inserted}
+        book_rows(positions, inserted)
+        fixes = [
+            {"tx_hash": r["transaction_hash"], "asset": r["asset_id"], "pnl": r["realized_pnl"]}
+            for r in inserted
+            if r["realized_pnl"] != booked[r["transaction_hash"], r["asset_id"]]
+        ]
+        if fixes:
+            await session.execute(_SET_REALIZED, fixes)
+            logger.debug("ledger re-booked %d trades after duplicates", len(fixes))
+
+    await save_positions(session, positions)
+    return inserted
@@ -0,0 +1,411 @@
+"""In-memory sliding 24h trade window for on-demand short-horizon leaderboards.
+
+``wallet_scorer`` refreshes the 24h scores every few minutes; this window is updated
+with every ingested trade instead. Trades are kept in minute buckets holding
+per-wallet, per-market buy/sell notional, trade counts and realized PnL, and every
+leaderboard timeframe keeps running per-wallet, per-market totals: a trade is added
+to them as it arrives and a minute is subtracted as it leaves each timeframe, so a
+request only folds the totals of the wallets in the window, never their buckets.
+
+Every API process keeps its own copy, rebuilt from ``trades`` on startup and then
+fed from the ``trades:live`` Redis channel that ingestion already publishes every
+new row to. Without Redis it is fed directly by the ingest pipeline, which only
+sees the trades this process ingests.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from collections.abc import Iterable
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from app.core import json_codec
+from app.db.engine import async_session
+from app.db.models import Trade
+from app.services.pipeline import pipeline
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "trades:live"
+WINDOW_MINUTES = 24 * 60
+EVICT_INTERVAL = 60  # seconds between sweeps of buckets that left the window
+REBUILD_BATCH = 10_000  # rows per fetch while rebuilding from trades
+OVERLAP = timedelta(minutes=2)  # rows committed this close to a rebuild may also be on the channel
+RETRY_DELAY = 5  # seconds before rebuilding after the feed fails
+
+# Leaderboard timeframes served from the window, in minutes
+WINDOWS = {"1h": 60, "6h": 6 * 60, "24h": 24 * 60}
+
+# Approximate CPython footprint of each structure, for the memory gauge
+_WALLET_BYTES = sys.getsizeof("0x" + "0" * 40) + sys.getsizeof({}) + 32  # + dict slot
+_BUCKET_BYTES = sys.getsizeof({}) + 32  # + dict slot
+_ENTRY_BYTES = sys.getsizeof([0.0, 0.0, 0, 0.0]) + 3 * sys.getsizeof(0.0) + 32  # + dict slot
+
+# {condition_id: [buy notional, sell notional, trades, realized PnL]}
+Markets = dict[str, list]
+
+
+class SlidingWindow:
+    """Minute buckets covering the last ``minutes`` minutes, plus running totals per timeframe.
+
+    ``spans`` are the timeframes (in minutes) kept as running totals; the whole
+    window always is. Other timeframes are summed from the buckets on demand.
+    """
+
+    def __init__(
+        self, minutes: int = WINDOW_MINUTES, spans: Iterable[int] = WINDOWS.values()
+    ) -> None:
+        self.minutes = minutes
+        # minute -> wallet -> markets traded in that minute
+        self._minutes: dict[int, dict[str, Markets]] = {}
+        # span -> wallet -> markets over the span's current minutes
+        self._running: dict[int, dict[str, Markets]] = {
+            span: {} for span in {min(s, minutes) for s in spans} | {minutes}
+        }
+        self._since: dict[int, int] = {}  # span -> first minute its running totals cover
+        self.buckets = 0
+        self.entries = 0
+        self.running_entries = 0
+        self.trades = 0
+        self.dropped = 0  # trades already outside the window when they arrived
+        self.duplicates = 0  # channel rows the startup rebuild already counted
+        self.ready = False
+        self._overlap: set[tuple[str, str]] = set()
+        self._overlap_until = 0.0
+
+    def __len__(self) -> int:
+        return len(self._running[self.minutes])
+
+    def _slide(self, now: float | None) -> int:
+        """Subtract minutes that left each span from its running totals; returns now's minute."""
+        minute = int(now or time.time()) // 60
+        for span, running in self._running.items():
+            since = minute - span + 1
+            old = self._since.get(span)
+            if old is None or since <= old:
+                self._since.setdefault(span, since)
+                continue
+            self._since[span] = since
+            if since - old <= span:
+                gone: Iterable[int] = range(old, since)
+            else:  # idle for longer than the span: only visit minutes that exist
+                gone = sorted(m for m in self._minutes if old <= m < since)
+            for m in gone:
+                for wallet, markets in self._minutes.get(m, {}).items():
+                    self._subtract(running, wallet, markets)
+        return minute
+
+    def _subtract(self, running: dict[str, Markets], wallet: str, markets: Markets) -> None:
+        totals = running[wallet]
+        for cid, (buy, sell, count, realized) in markets.items():
+            acc = totals[cid]
+            if acc[2] == count:  # the last of its trades in this span
+                del totals[cid]
+                self.running_entries -= 1
+                continue
+            acc[0] -= buy
+            acc[1] -= sell
+            acc[2] -= count
+            acc[3] -= realized
+        if not totals:
+            del running[wallet]
+
+    def add(self, row: dict, now: float | None = None) -> None:
+        """Count one ``trades`` row into its minute bucket and every span it falls in."""
+        now_minute = self._slide(now)
+        minute = row["timestamp"] // 60
+        if minute <= now_minute - self.minutes:
+            self.dropped += 1
+            return
+        if self._overlap:
+            if time.monotonic() > self._overlap_until:
+                self._overlap.clear()
+            elif (row["transaction_hash"], row["asset_id"]) in self._overlap:
+                self.duplicates += 1
+                return
+
+        wallet, cid = row["wallet"], sys.intern(row["condition_id"])
+        notional = row["size"] * row["price"]
+        side = 1 if row["side"] == "SELL" else 0
+        realized = row.get("realized_pnl", 0.0)
+
+        wallets = self._minutes.get(minute)
+        if wallets is None:
+            wallets = self._minutes[minute] = {}
+        bucket = wallets.get(wallet)
+        if bucket is None:
+            bucket = wallets[wallet] = {}
+            self.buckets += 1
+        if cid not in bucket:
+            self.entries += 1
+        targets = [bucket]
+        for span, running in self._running.items():
+            if minute >= self._since[span]:  # late trades skip spans they already left
+                markets = running.setdefault(wallet, {})
+                if cid not in markets:
+                    self.running_entries += 1
+                targets.append(markets)
+        for markets in targets:
+            entry = _entry(markets, cid)
+            entry[side] += notional
+            entry[2] += 1
+            entry[3] += realized
+        self.trades += 1
+
+    def evict(self, now: float | None = None) -> int:
+        """Drop buckets that slid out of the window. Returns the number removed."""
+        cutoff = self._slide(now) - self.minutes
+        removed = 0
+        for minute in [m for m in self._minutes if m <= cutoff]:
+            wallets = self._minutes.pop(minute)
+            self.entries -= sum(len(markets) for markets in wallets.values())
+            removed += len(wallets)
+        self.buckets -= removed
+        return removed
+
+    def _rows(self, minutes: int, markets: set[str] | None, now: float | None) -> list[dict]:
+        """Unranked per-wallet totals over the last ``minutes``, in ``markets`` (all when None)."""
+        now_minute = self._slide(now)
+        span = min(minutes, self.minutes)
+        totals = self._running.get(span)
+        if totals is None:
+            totals = {}
+            for minute in range(now_minute - span + 1, now_minute + 1):
+                for wallet, bucket in self._minutes.get(minute, {}).items():
+                    acc = totals.setdefault(wallet, {})
+                    for cid, values in bucket.items():
+                        entry = _entry(acc, cid)
+                        for i in range(4):
+                            entry[i] += values[i]
+
+        rows = []
+        for wallet, per_market in totals.items():
+            volume = pnl = 0.0
+            wins = trades = traded = 0
+            for cid, (buy, sell, count, realized) in per_market.items():
+                if markets is not None and cid not in markets:
+                    continue
+                volume += buy + sell
+                pnl += realized
+                wins += realized > 0
+                trades += count
+                traded += 1
+            if traded:
+                rows.append(
+                    {
+                        "address": wallet,
+                        "volume": volume,
+                        "pnl": pnl,
+                        "win_rate": wins / traded,
+                        "trade_count": trades,
+                    }
+                )
+        return rows
+
+    def totals(
+        self, minutes: int, *, markets: set[str] | None = None, now: float | None = None
+    ) -> list[dict]:
+        """Per-wallet volume, realized PnL, win rate and trade count over the last ``minutes``.
+
+        Rows carry ``rank_volume`` and ``rank_pnl`` across all wallets with trades in
+        ``markets`` (every market when None); see :func:`_rank`.
+        """
+        return _rank(self._rows(minutes, markets, now))
+
+    async def rebuild(self) -> None:
+        """Reload the window from ``trades``, streaming in batches."""
+        cutoff = (int(time.time()) // 60 - self.minutes + 1) * 60
+        recent = Trade.created_at >= func.now() - OVERLAP
+        q = select(
+            Trade.transaction_hash,
+            Trade.asset_id,
+            Trade.condition_id,
+            Trade.wallet,
+            Trade.side,
+            Trade.size,
+            Trade.price,
+            Trade.timestamp,
+            Trade.realized_pnl,
+            recent.label("recent"),
+        ).where(Trade.timestamp >= cutoff)
+
+        self._minutes.clear()
+        for running in self._running.values():
+            running.clear()
+        self._since.clear()
+        self._overlap.clear()
+        self.ready = False
+        self.buckets = self.entries = self.running_entries = self.trades = 0
+        overlap: set[tuple[str, str]] = set()
+        started = time.monotonic()
+        async with async_session() as session:
+            result = await session.stream(q.execution_options(yield_per=REBUILD_BATCH))
+            async for partition in result.mappings().partitions():
+                for row in partition:
+                    self.add(row)
+                    if row["recent"]:
+                        overlap.add((row["transaction_hash"], row["asset_id"]))
+                await asyncio.sleep(0)  # let requests run between batches
+        self._overlap = overlap
+        self._overlap_until = time.monotonic() + OVERLAP.total_seconds()
+        self.ready = True
+        logger.info(
+            "live window rebuilt: %d trades, %d wallets in %.1fs",
+            self.trades,
+            len(self),
+            time.monotonic() - started,
+        )
+
+    def leaderboard(
+        self,
+        minutes: int,
+        *,
+        markets: set[str] | None = None,
+        addresses: set[str] | None = None,
+        min_trades: int | None = None,
+        min_volume: float | None = None,
+        min_win_rate: float | None = None,
+        pnl_positive: bool = False,
+        sort_by: str = "volume",
+        sort_dir: str = "desc",
+        limit: int = 50,
+        offset: int = 0,
+        now: float | None = None,
+    ) -> tuple[list[dict], int]:
+        """Filtered, ranked and sorted page of :meth:`totals`. Returns (rows, total_count).
+
+        Wallets are ranked after the filters, like
+        :func:`app.services.leaderboard.compute_live_leaderboard`; ties sort by address.
+        """
+        rows = _rank(
+            [
+                r
+                for r in self._rows(minutes, markets, now)
+                if (min_trades is None or r["trade_count"] >= min_trades)
+                and (min_volume is None or r["volume"] >= min_volume)
+                and (min_win_rate is None or r["win_rate"] >= min_win_rate)
+                and (not pnl_positive or r["pnl"] > 0)
+                and (addresses is None or r["address"] in addresses)
+            ]
+        )
+        rows.sort(
+            key=lambda r: r[sort_by], reverse=sort_dir == "desc"
+        )  # stable: keeps address order
+        return rows[offset : offset + limit], len(rows)
+
+    def approx_bytes(self) -> int:
+        return (
+            sum(len(running) for running in self._running.values()) * _WALLET_BYTES
+            + self.buckets * _BUCKET_BYTES
+            + (self.entries + self.running_entries) * _ENTRY_BYTES
+        )
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "wallets": len(self),
+            "buckets": self.buckets,
+            "market_entries": self.entries,
+            "running_entries": self.running_entries,
+            "trades": self.trades,
+            "dropped": self.dropped,
+            "duplicates": self.duplicates,
+            "approx_mb": self.approx_bytes() / 1e6,
+        }
+
+
+def _entry(markets: Markets, cid: str) -> list:
+    entry = markets.get(cid)
+    if entry is None:
+        entry = markets[cid] = [0.0, 0.0, 0, 0.0]
+    return entry
+
+
+def _rank(rows: list[dict]) -> list[dict]:
+    """Set ``rank_volume`` and ``rank_pnl`` (1 = highest, ties by address), sorting by address."""
+    rows.sort(key=lambda r: r["address"])
+    for i, row in enumerate(sorted(rows, key=lambda r: r["volume"], reverse=True), 1):
+        row["rank_volume"] = i
+    for i, row in enumerate(sorted(rows, key=lambda r: r["pnl"], reverse=True), 1):
+        row["rank_pnl"] = i
+    return rows
+
+
+window = SlidingWindow()
+_task: asyncio.Task | None = None  # type: ignore[type-arg]
+_pending: list[dict] = []  # pipeline rows that arrived while rebuilding
+
+
+async def _observe(rows: list[dict]) -> None:
+    if not window.ready:
+        _pending.extend(rows)
+        return
+    for row in rows:
+        window.add(row)
+
+
+async def _follow(redis) -> None:
+    """Rebuild, then apply every row published on ``CHANNEL``."""
+    pubsub = redis.pubsub()
+    # Subscribe first so rows published while rebuilding queue up instead of being lost
+    await pubsub.subscribe(CHANNEL)
+    try:
+        await window.rebuild()
+        last_evict = time.monotonic()
+        while True:
+            msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if msg is not None:
+                try:
+                    payload = json_codec.loads(msg["data"])
+                    if payload.get("type") == "trade":
+                        window.add(payload["data"])
+                except (json_codec.DecodeError, KeyError, TypeError):
+                    logger.debug("live window: bad message on %s", CHANNEL)
+            if time.monotonic() - last_evict >= EVICT_INTERVAL:
+                window.evict()
+                last_evict = time.monotonic()
+    finally:
+        await pubsub.aclose()
+
+
+async def _rebuild_and_evict() -> None:
+    await window.rebuild()
+    for row in _pending:
+        window.add(row)
+    _pending.clear()
+    while True:
+        await asyncio.sleep(EVICT_INTERVAL)
+        window.evict()
+
+
+async def _run(redis) -> None:
+    while True:
+        try:
+            await (_follow(redis) if redis is not None else _rebuild_and_evict())
+        except Exception:
+            window.ready = False
+            logger.exception("live window feed failed, rebuilding in %ds", RETRY_DELAY)
+            await asyncio.sleep(RETRY_DELAY)
+
+
+def start(redis=None) -> None:
+    """Start keeping the window current in this process."""
+    global _task
+    if _task is not None:
+        return
+    if redis is None:
+        pipeline.add_publisher(_observe)
+    _task = asyncio.create_task(_run(redis), name="live_window")
+
+
+async def stop() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+    window.ready = False
@@ -0,0 +1,374 @@
+"""Staged trade ingestion pipeline shared by the poller and the CLOB listener.
+
+    source ─▶ normalize ─▶ dedup ─▶ batch writer ─▶ publish
+
+Each arrow is a bounded ``asyncio.Queue`` and each stage is one consumer task, so a
+slow stage fills its input queue and then blocks the stage before it, all the way
+back to the source. When the DB is slow the WebSocket read loop and the poller
+simply wait on ``submit`` instead of memory growing without bound.
+
+Sources submit a payload plus a parser (raw WebSocket frame → rows) or already
+normalized rows. A submitter may ``wait`` for its rows to be committed, which the
+poller uses to advance its watermarks only after a durable write. Rows dropped as
+duplicates of another submission's still-uncommitted rows count as committed only
+once that submission commits; if its write fails, the waiter's call fails too.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.db.engine import async_session
+from app.services.dedup import TradeDeduper, trade_dedup, trade_key
+from app.services.ledger import book_trades
+from app.services.scoring import record_trade_aggregates
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 1000  # items per stage queue
+BATCH_MAX_ROWS = 500  # write a batch once this many rows are collected...
+BATCH_MAX_DELAY = 0.1  # ...or this many seconds after the first one arrived
+DRAIN_TIMEOUT = 15  # seconds to wait for queued trades on shutdown
+
+STAGES = ("normalize", "dedup", "write", "publish")
+
+Parser = Callable[[Any], list[dict]]
+Publisher = Callable[[list[dict]], Awaitable[None]]
+
+
+@dataclass
+class StageStats:
+    """Throughput and latency counters for one stage."""
+
+    processed: int = 0
+    wait_ms_total: float = 0.0  # time items sat in the stage's input queue
+    wait_ms_max: float = 0.0
+    service_ms_total: float = 0.0  # time the stage spent on them
+    service_ms_max: float = 0.0
+
+    def observe(self, wait_ms: float, service_ms: float, items: int = 1) -> None:
+        """Record ``items`` handled together in ``service_ms`` (the writer works in batches)."""
+        self.processed += items
+        self.wait_ms_total += wait_ms * items
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        self.service_ms_total += service_ms
+        self.service_ms_max = max(self.service_ms_max, service_ms)
+
+    def as_dict(self) -> dict:
+        n = self.processed
+        return {
+            "processed": n,
+            "avg_wait_ms": self.wait_ms_total / n if n else 0.0,
+            "max_wait_ms": self.wait_ms_max,
+            "avg_service_ms": self.service_ms_total / n if n else 0.0,
+            "max_service_ms": self.service_ms_max,
+        }
+
+
+@dataclass
+class WriterStats:
+    """Batch writer counters, for tuning batch size and delay."""
+
+    batches: int = 0
+    rows: int = 0
+    inserted: int = 0
+    failed_rows: int = 0
+    max_batch: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "failed_rows": self.failed_rows,
+            "avg_batch": self.rows / self.batches if self.batches else 0.0,
+            "max_batch": self.max_batch,
+        }
+
+
+@dataclass
+class _Item:
+    source: str
+    payload: Any
+    parse: Parser | None
+    future: asyncio.Future | None  # type: ignore[type-arg]
+    enqueued: float = field(default_factory=time.perf_counter)
+    rows: list[dict] = field(default_factory=list)
+    # Set once this item's claimed rows are written: True if committed, False if not
+    written: asyncio.Future | None = None  # type: ignore[type-arg]
+    # ``written`` of earlier items that claimed some of this item's rows first
+    owners: set[asyncio.Future] = field(default_factory=set)  # type: ignore[type-arg]
+
+    def resolve(self, inserted: int) -> None:
+        if self.future is not None and not self.future.done():
+            self.future.set_result(inserted)
+
+    def fail(self, exc: BaseException) -> None:
+        if self.future is not None and not self.future.done():
+            self.future.set_exception(exc)
+
+
+class IngestPipeline:
+    """Bounded-queue ingestion pipeline; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        queue_size: int = QUEUE_SIZE,
+        batch_max_rows: int = BATCH_MAX_ROWS,
+        batch_max_delay: float = BATCH_MAX_DELAY,
+        dedup: TradeDeduper | None = None,
+    ) -> None:
+        self.queue_size = queue_size
+        self.batch_max_rows = batch_max_rows
+        self.batch_max_delay = batch_max_delay
+        self.dedup = dedup
+        self.publishers: list[Publisher] = []
+        self.stage_stats = {name: StageStats() for name in STAGES}
+        self.writer_stats = WriterStats()
+        self.submitted: dict[str, int] = {}
+        self._queues: dict[str, asyncio.Queue[_Item]] = {}
+        self._tasks: list[asyncio.Task] = []  # type: ignore[type-arg]
+        self._in_flight: dict[str, asyncio.Future] = {}  # type: ignore[type-arg]
+        self._settling: set[asyncio.Task] = set()  # type: ignore[type-arg]
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_publisher(self, publisher: Publisher) -> None:
+        """Register a callback that receives each batch of newly inserted rows."""
+        if publisher not in self.publishers:
+            self.publishers.append(publisher)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        # Queues are created here so they bind to the running loop
+        self._queues = {name: asyncio.Queue(maxsize=self.queue_size) for name in STAGES}
+        loops = {
+            "normalize": self._normalize_loop,
+            "dedup": self._dedup_loop,
+            "write": self._write_loop,
+            "publish": self._publish_loop,
+        }
+        self._tasks = [
+            asyncio.create_task(fn(), name=f"ingest_{name}") for name, fn in loops.items()
+        ]
+
+    async def stop(self) -> None:
+        """Drain queued items through every stage, then stop the stage tasks."""
+        if not self._tasks:
+            return
+        try:
+            async with asyncio.timeout(DRAIN_TIMEOUT):
+                await self.drain()
+        except TimeoutError:
+            pending = sum(q.qsize() for q in self._queues.values())
+            logger.warning("ingest pipeline drain timed out, dropping %d queued items", pending)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        # Rows still in flight were never written; fail whoever waits on them
+        for written in self._in_flight.values():
+            if not written.done():
+                written.set_result(False)
+        self._in_flight.clear()
+        await asyncio.gather(*self._settling, return_exceptions=True)
+
+    async def drain(self) -> None:
+        """Wait until everything submitted so far has passed through every stage."""
+        for name in STAGES:
+            await self._queues[name].join()
+
+    async def submit(
+        self,
+        payload: Any,
+        *,
+        source: str,
+        parse: Parser | None = None,
+        wait: bool = False,
+    ) -> int | None:
+        """Enqueue a payload; blocks while the pipeline is full.
+
+        ``parse`` turns the payload into trade rows in the normalize stage; without
+        it the payload must already be a list of normalized rows. With ``wait`` the
+        call returns once the rows are committed, with the number actually inserted.
+        """
+        if not self._tasks:
+            raise RuntimeError("ingest pipeline is not running")
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self.submitted[source] = self.submitted.get(source, 0) + 1
+        await self._queues["normalize"].put(_Item(source, payload, parse, future))
+        return await future if future is not None else None
+
+    async def _forward(self, stage: str, item: _Item) -> None:
+        item.enqueued = time.perf_counter()
+        await self._queues[stage].put(item)
+
+    async def _normalize_loop(self) -> None:
+        queue = self._queues["normalize"]
+        stats = self.stage_stats["normalize"]
+        while True:
+            item = await queue.get()
+            start = time.perf_counter()
+            try:
+                item.rows = item.parse(item.payload) if item.parse else list(item.payload)
+            except Exception:
+                logger.exception("ingest normalize failed for %s payload", item.source)
+                item.rows = []
+            stats.observe((start - item.enqueued) * 1000, (time.perf_counter() - start) * 1000)
+            if item.rows:
+                await self._forward("dedup", item)
+            else:
+                self._settle(item, 0)
+            queue.task_done()
+
+    async def _dedup_loop(self) -> None:
+        queue = self._queues["dedup"]
+        stats = self.stage_stats["dedup"]
+        while True:
+            item = await queue.get()
+            start = time.perf_counter()
+            if self.dedup is not None:
+                self._claim(self.dedup, item)
+            stats.observe((start - item.enqueued) * 1000, (time.perf_counter() - start) * 1000)
+            if item.rows:
+                await self._forward("write", item)
+            else:
+                self._settle(item, 0)
+            queue.task_done()
+
+    def _claim(self, dedup: TradeDeduper, item: _Item) -> None:
+        """Keep the rows no other submission has claimed; track who owns the rest."""
+        keys = {trade_key(r["transaction_hash"], r["asset_id"]) for r in item.rows}
+        item.rows = dedup.claim(item.rows)
+        claimed = {trade_key(r["transaction_hash"], r["asset_id"]) for r in item.rows}
+        if item.future is not None:
+            item.owners = {self._in_flight[k] for k in keys - claimed if k in self._in_flight}
+        if claimed:
+            item.written = asyncio.get_running_loop().create_future()
+            self._in_flight.update(dict.fromkeys(claimed, item.written))
+
+    def _written(self, batch: list[_Item], ok: bool) -> None:
+        """Mark ``batch``'s claimed rows as no longer in flight."""
+        for item in batch:
+            for row in item.rows:
+                key = trade_key(row["transaction_hash"], row["asset_id"])
+                if self._in_flight.get(key) is item.written:
+                    del self._in_flight[key]
+            if item.written is not None:
+                item.written.set_result(ok)
+
+    def _settle(self, item: _Item, inserted: int) -> None:
+        """Resolve ``item`` with ``inserted``, once every owner of its dropped rows has."""
+        pending = [f for f in item.owners if not f.done()]
+        if not pending and all(f.result() for f in item.owners):
+            item.resolve(inserted)
+        elif not pending:
+            item.fail(RuntimeError("a concurrent write of some of these trades failed"))
+        else:
+            task = asyncio.create_task(self._settle_later(item, inserted, pending))
+            self._settling.add(task)
+            task.add_done_callback(self._settling.discard)
+
+    async def _settle_later(self, item: _Item, inserted: int, pending: list) -> None:
+        await asyncio.wait(pending)
+        self._settle(item, inserted)
+
+    async def _write_loop(self) -> None:
+        queue = self._queues["write"]
+        while True:
+            batch = [await queue.get()]
+            rows = len(batch[0].rows)
+            # Keep collecting until the batch is full or the first item has waited long enough
+            try:
+                async with asyncio.timeout(self.batch_max_delay):
+                    while rows < self.batch_max_rows:
+                        item = await queue.get()
+                        batch.append(item)
+                        rows += len(item.rows)
+            except TimeoutError:
+                pass
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write_batch(self, batch: list[_Item]) -> None:
+        start = time.perf_counter()
+        rows = [r for item in batch for r in item.rows]
+        try:
+            async with async_session() as session:
+                inserted = await book_trades(session, rows)
+                await record_trade_aggregates(session, inserted)
+                await session.commit()
+        except Exception as exc:
+            if self.dedup is not None:
+                self.dedup.release(rows)
+            self._written(batch, False)
+            self.writer_stats.failed_rows += len(rows)
+            logger.exception("ingest write failed, dropped %d rows", len(rows))
+            for item in batch:
+                item.fail(exc)
+            return
+        self._written(batch, True)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        wait_ms = sum(start - item.enqueued for item in batch) * 1000 / len(batch)
+        self.stage_stats["write"].observe(wait_ms, elapsed_ms, items=len(batch))
+        w = self.writer_stats
+        w.batches += 1
+        w.rows += len(rows)
+        w.inserted += len(inserted)
+        w.max_batch = max(w.max_batch, len(rows))
+        logger.debug(
+            "ingest wrote %d rows (%d new) in %.1fms", len(rows), len(inserted), elapsed_ms
+        )
+
+        new_keys = {trade_key(r["transaction_hash"], r["asset_id"]) for r in inserted}
+        for item in batch:
+            keys = (trade_key(r["transaction_hash"], r["asset_id"]) for r in item.rows)
+            self._settle(item, sum(1 for key in keys if key in new_keys))
+
+        if inserted and self.publishers:
+            await self._forward("publish", _Item("write", inserted, None, None))
+
+    async def _publish_loop(self) -> None:
+        queue = self._queues["publish"]
+        stats = self.stage_stats["publish"]
+        while True:
+            item = await queue.get()
+            start = time.perf_counter()
+            for publisher in self.publishers:
+                try:
+                    await publisher(item.payload)
+                except Exception:
+                    logger.exception("ingest publisher failed")
+            stats.observe((start - item.enqueued) * 1000, (time.perf_counter() - start) * 1000)
+            queue.task_done()
+
+    def stats(self) -> dict:
+        """Per-stage queue depth and latency, plus batch writer counters."""
+        return {
+            "running": self.running,
+            "submitted": dict(self.submitted),
+            "stages": {
+                name: {
+                    "depth": self._queues[name].qsize() if name in self._queues else 0,
+                    "capacity": self.queue_size,
+                    **self.stage_stats[name].as_dict(),
+                }
+                for name in STAGES
+            },
+            "writer": self.writer_stats.as_dict(),
+        }
+
+
+# Shared by every ingestion source in this process
+pipeline = IngestPipeline(dedup=trade_dedup)
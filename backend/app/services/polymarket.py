@@ -2,14 +2,57 @@
 
 import asyncio
 import logging
+import time
 
 import httpx
 
+from app.core import json_codec
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 # Rate limit: 200 requests per 10 seconds across all endpoints
+RATE_LIMIT_REQUESTS = 200
+RATE_LIMIT_PERIOD = 10.0
+RATE_LIMIT_BURST = 20
+
+
+class TokenBucket:
+    """Async token bucket — refills ``rate`` tokens per second up to ``capacity``.
+
+    Waiters are served in arrival order (the lock is held while sleeping), so a
+    burst of callers is smoothed out instead of stampeding once tokens return.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+# A full bucket plus one period of refill must stay within the upstream budget,
+# so the steady-state rate is (200 - burst) / 10s = 18 req/s.
+_rate_limiter = TokenBucket(
+    rate=(RATE_LIMIT_REQUESTS - RATE_LIMIT_BURST) / RATE_LIMIT_PERIOD,
+    capacity=RATE_LIMIT_BURST,
+)
+# Caps in-flight requests; the token bucket above caps the request rate.
 _semaphore = asyncio.Semaphore(20)
 _client: httpx.AsyncClient | None = None
 
@@ -33,25 +76,24 @@ async def close_client() -> None:
         _client = None
 
 
-async def gamma_get(path: str, params: dict | None = None) -> dict | list:
-    """GET request to Gamma API with rate limiting."""
+async def _get(url: str, params: dict | None) -> dict | list:
+    await _rate_limiter.acquire()
     async with _semaphore:
-        resp = await get_client().get(f"{settings.POLYMARKET_GAMMA_URL}{path}", params=params)
+        resp = await get_client().get(url, params=params)
         resp.raise_for_status()
-        return resp.json()
+        return json_codec.loads(resp.content)
+
+
+async def gamma_get(path: str, params: dict | None = None) -> dict | list:
+    """GET request to Gamma API with rate limiting."""
+    return await _get(f"{settings.POLYMARKET_GAMMA_URL}{path}", params)
 
 
 async def data_api_get(path: str, params: dict | None = None) -> dict | list:
     """GET request to Data API with rate limiting."""
-    async with _semaphore:
-        resp = await get_client().get(f"{settings.POLYMARKET_DATA_API_URL}{path}", params=params)
-        resp.raise_for_status()
-        return resp.json()
+    return await _get(f"{settings.POLYMARKET_DATA_API_URL}{path}", params)
 
 
 async def clob_get(path: str, params: dict | None = None) -> dict | list:
     """GET request to CLOB API with rate limiting."""
-    async with _semaphore:
-        resp = await get_client().get(f"{settings.POLYMARKET_CLOB_URL}{path}", params=params)
-        resp.raise_for_status()
-        return resp.json()
+    return await _get(f"{settings.POLYMARKET_CLOB_URL}{path}", params)
@@ -0,0 +1,295 @@
+"""In-memory rank index over the published ``wallet_scores`` generation.
+
+Each API process polls for newly published score generations and loads the new one
+into columnar NumPy arrays, one set per (category, timeframe) slice. Wallet
+addresses live once in a sorted array shared by every slice, and each slice keeps
+its rows sorted by wallet code, so looking up any wallet is two binary searches
+(O(log n)). Each metric also keeps its rows in rank order, so a leaderboard page
+is a slice of that order (O(k)).
+
+Ranks are the scorer's own (``rank_volume`` etc.), so the index agrees with the
+leaderboard. ``percentile`` is the share of the slice ranked at or below a wallet:
+100 for the top wallet.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app.db.engine import async_session
+from app.db.models import WalletScore
+from app.services.scoring import copy_out, current_generation
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 15  # seconds between checks for a newly published generation
+RETRY_DELAY = 30  # seconds before retrying a failed load
+
+METRICS = ("volume", "pnl", "win_rate")
+
+_ADDRESS = "S42"  # "0x" + 40 hex chars; shorter wallets are space-padded to match
+
+SliceKey = tuple[str, str]  # (category, timeframe)
+
+
+def percentile(rank: np.ndarray | int, total: int):
+    """Share of a slice's ``total`` wallets ranked at or below ``rank``, in percent."""
+    return 100.0 * (total - rank + 1) / total
+
+
+@dataclass
+class SliceIndex:
+    """One (category, timeframe) slice. Row-aligned arrays, sorted by wallet code."""
+
+    codes: np.ndarray  # int32 index into RankIndex.wallets, ascending
+    values: dict[str, np.ndarray]  # metric -> float64 value per row
+    trade_count: np.ndarray  # int64 per row
+    ranks: dict[str, np.ndarray]  # metric -> int32 rank per row (1 = best)
+    order: dict[str, np.ndarray]  # metric -> int32 rows, rank 1 first
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_columns(cls, codes: np.ndarray, columns: np.ndarray) -> "SliceIndex":
+        """Build from wallet codes and ``_SLICE_QUERY`` numeric columns, in any row order."""
+        by_wallet = np.argsort(codes, kind="stable")
+        columns = columns[by_wallet]
+        n = len(METRICS)
+        ranks = {m: columns[:, n + 1 + i].astype(np.int32) for i, m in enumerate(METRICS)}
+        return cls(
+            codes=codes[by_wallet].astype(np.int32),
+            values={m: np.ascontiguousarray(columns[:, i]) for i, m in enumerate(METRICS)},
+            trade_count=columns[:, n].astype(np.int64),
+            ranks=ranks,
+            order={m: np.argsort(r, kind="stable").astype(np.int32) for m, r in ranks.items()},
+        )
+
+    def entries(self, rows: np.ndarray) -> list[dict]:
+        """Scores, ranks and percentiles for ``rows``."""
+        total = len(self)
+        out = {m: self.values[m][rows].tolist() for m in METRICS}
+        out["trade_count"] = self.trade_count[rows].tolist()
+        for m in METRICS:
+            ranks = self.ranks[m][rows]
+            out[f"rank_{m}"] = ranks.tolist()
+            out[f"percentile_{m}"] = percentile(ranks, total).tolist()
+        return [dict(zip(out, row, strict=True)) for row in zip(*out.values(), strict=True)]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.codes, self.trade_count]
+        arrays += [*self.values.values(), *self.ranks.values(), *self.order.values()]
+        return sum(a.nbytes for a in arrays)
+
+
+@dataclass
+class RankIndex:
+    """Every slice of one score generation, plus the wallet addresses they share."""
+
+    generation: int | None = None
+    wallets: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=_ADDRESS))
+    slices: dict[SliceKey, SliceIndex] = field(default_factory=dict)
+    load_ms: float = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.generation is not None
+
+    @classmethod
+    def build(cls, generation: int, parsed: dict[SliceKey, tuple[np.ndarray, np.ndarray]]):
+        """Build from per-slice ``(addresses, numeric columns)`` from :func:`_parse_slice`."""
+        keys = list(parsed)
+        addresses = [parsed[k][0] for k in keys]
+        wallets, codes = np.unique(
+            np.concatenate(addresses) if addresses else np.empty(0, dtype=_ADDRESS),
+            return_inverse=True,
+        )
+        bounds = np.cumsum([0, *(len(a) for a in addresses)])
+        slices = {
+            key: SliceIndex.from_columns(codes[bounds[i] : bounds[i + 1]], parsed[key][1])
+            for i, key in enumerate(keys)
+        }
+        return cls(generation=generation, wallets=wallets, slices=slices)
+
+    def _codes(self, addresses: list[str]) -> np.ndarray:
+        """Wallet code per address, -1 where the generation has no scores for it."""
+        wanted = np.array([a.lower().ljust(42).encode() for a in addresses], dtype=_ADDRESS)
+        if not len(self.wallets):
+            return np.full(len(wanted), -1)
+        pos = np.searchsorted(self.wallets, wanted)
+        pos[pos >= len(self.wallets)] = 0
+        return np.where(self.wallets[pos] == wanted, pos, -1)
+
+    @staticmethod
+    def _rows(s: SliceIndex, codes: np.ndarray) -> np.ndarray:
+        """Row per wallet code in slice ``s``, -1 where the wallet isn't ranked in it."""
+        if not len(s):
+            return np.full(len(codes), -1)
+        pos = np.searchsorted(s.codes, codes)
+        pos[pos >= len(s)] = 0
+        return np.where((codes >= 0) & (s.codes[pos] == codes), pos, -1)
+
+    def lookup(self, addresses: list[str], category: str, timeframe: str) -> list[dict | None]:
+        """Scores, ranks and percentiles per address (None where unranked)."""
+        s = self.slices.get((category, timeframe))
+        if s is None or not addresses:
+            return [None] * len(addresses)
+        rows = self._rows(s, self._codes(addresses))
+        entries = iter(s.entries(rows[rows >= 0]))
+        return [next(entries) if row >= 0 else None for row in rows]
+
+    def profile(self, address: str, category: str) -> dict[str, dict]:
+        """Every timeframe a wallet is ranked in for ``category``."""
+        codes = self._codes([address])
+        out = {}
+        for (cat, timeframe), s in self.slices.items():
+            if cat == category:
+                row = self._rows(s, codes)
+                if row[0] >= 0:
+                    out[timeframe] = s.entries(row)[0]
+        return out
+
+    def total(self, category: str, timeframe: str) -> int:
+        s = self.slices.get((category, timeframe))
+        return len(s) if s is not None else 0
+
+    def page(
+        self,
+        category: str,
+        timeframe: str,
+        metric: str,
+        *,
+        descending: bool = True,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> tuple[list[dict], int]:
+        """One page of a slice ordered by ``metric``. Returns (rows, total_count)."""
+        s = self.slices.get((category, timeframe))
+        if s is None:
+            return [], 0
+        order = s.order[metric] if descending else s.order[metric][::-1]
+        rows = order[offset : offset + limit]
+        addresses = self.wallets[s.codes[rows]]
+        entries = s.entries(rows)
+        for entry, address in zip(entries, addresses.tolist(), strict=True):
+            entry["address"] = address.decode().rstrip()
+        return entries, len(s)
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "generation": self.generation,
+            "wallets": len(self.wallets),
+            "slices": len(self.slices),
+            "rows": sum(len(s) for s in self.slices.values()),
+            "approx_mb": (self.wallets.nbytes + sum(s.nbytes for s in self.slices.values())) / 1e6,
+            "load_ms": self.load_ms,
+        }
+
+
+# Every column is fixed-width and NOT NULL, so binary COPY output is an array of
+# identical tuples that NumPy decodes in place (no per-row Python, little GIL time).
+_SLICE_QUERY = select(
+    func.rpad(WalletScore.wallet, 42),
+    *(getattr(WalletScore, m) for m in METRICS),
+    WalletScore.trade_count,
+    *(getattr(WalletScore, f"rank_{m}") for m in METRICS),
+)
+_SLICE_ROW = np.dtype(
+    [
+        ("fields", ">i2"),
+        ("wallet_len", ">i4"),
+        ("wallet", _ADDRESS),
+        *((f, t) for m in METRICS for f, t in ((f"{m}_len", ">i4"), (m, ">f8"))),
+        ("trade_count_len", ">i4"),
+        ("trade_count", ">i4"),
+        *((f, t) for m in METRICS for f, t in ((f"rank_{m}_len", ">i4"), (f"rank_{m}", ">i4"))),
+    ]
+)
+_COPY_HEADER = 19  # signature, flags and (empty) header extension
+_COPY_TRAILER = 2
+
+
+def _parse_slice(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Split one slice's binary COPY output into addresses and a float64 column block."""
+    body = memoryview(data)[_COPY_HEADER : len(data) - _COPY_TRAILER]
+    if len(body) % _SLICE_ROW.itemsize:
+        raise ValueError("rank index: unexpected COPY row layout")
+    rows = np.frombuffer(body, dtype=_SLICE_ROW)
+    names = [*METRICS, "trade_count", *(f"rank_{m}" for m in METRICS)]
+    columns = np.empty((len(rows), len(names)))
+    for i, name in enumerate(names):
+        columns[:, i] = rows[name]
+    return rows["wallet"].copy(), columns
+
+
+async def load(generation: int) -> RankIndex:
+    """Load ``generation`` slice by slice; parsing and building run in a thread."""
+    started = time.perf_counter()
+    ws = WalletScore
+    parsed: dict[SliceKey, tuple[np.ndarray, np.ndarray]] = {}
+    async with async_session() as session:
+        keys = (
+            await session.execute(
+                select(ws.category, ws.timeframe).where(ws.generation == generation).distinct()
+            )
+        ).all()
+        for category, timeframe in keys:
+            data = await copy_out(
+                session,
+                _SLICE_QUERY.where(
+                    ws.generation == generation, ws.category == category, ws.timeframe == timeframe
+                ),
+                format="binary",
+            )
+            parsed[category, timeframe] = await asyncio.to_thread(_parse_slice, data)
+    built = await asyncio.to_thread(RankIndex.build, generation, parsed)
+    built.load_ms = (time.perf_counter() - started) * 1000
+    return built
+
+
+index = RankIndex()  # replaced whole once a newer generation has loaded
+_task: asyncio.Task | None = None  # type: ignore[type-arg]
+
+
+async def refresh() -> bool:
+    """Load the published generation if it is newer than the index. Returns True if it was."""
+    global index
+    async with async_session() as session:
+        generation = await current_generation(session)
+    if generation is None or generation == index.generation:
+        return False
+    index = await load(generation)
+    logger.info("rank index loaded generation %d: %s", generation, index.stats())
+    return True
+
+
+async def _run() -> None:
+    while True:
+        try:
+            await refresh()
+            await asyncio.sleep(POLL_INTERVAL)
+        except Exception:
+            logger.exception("rank index refresh failed, retrying in %ds", RETRY_DELAY)
+            await asyncio.sleep(RETRY_DELAY)
+
+
+def start() -> None:
+    """Start keeping the index on the newest published generation in this process."""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run(), name="rank_index")
+
+
+async def stop() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
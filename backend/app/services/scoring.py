@@ -1,13 +1,40 @@
 """Wallet scoring algorithms — aggregates trade data into wallet rankings."""
 
+import asyncio
 import logging
-from datetime import UTC, datetime, timedelta
-
-from sqlalchemy import case, delete, func, select
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from io import BytesIO
+from itertools import islice, repeat
+
+import numpy as np
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    and_,
+    case,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+)
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import TrackedMarket, Trade, Wallet, WalletScore
+from app.db.models import (
+    ScoreGeneration,
+    TrackedMarket,
+    Trade,
+    Wallet,
+    WalletDailyRollup,
+    WalletScore,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,256 +45,478 @@ TIMEFRAMES = {
     "all": None,
 }
 
+WALLET_BATCH_SIZE = 10000  # 3 cols per row → stays under asyncpg's 32767 param limit
+ROLLUP_BATCH_SIZE = 4000  # 7 cols per row
+KEEP_GENERATIONS = 2  # published generations kept: the current one and its predecessor
+STALE_GENERATION = timedelta(hours=1)  # unpublished generations older than this were abandoned
+SCAN_CHUNK = 65_536  # scan rows parsed per batch into MarketTotals' typed columns
 
-async def compute_scores(session: AsyncSession) -> int:
-    """Recompute wallet_scores for all timeframes. Returns number of scores written."""
-    total = 0
 
+def _day_start(day: date) -> int:
+    return int(datetime.combine(day, time(), UTC).timestamp())
+
+
+def scoring_scan_query(now_ts: int):
+    """Every timeframe's notional, trade count and realized PnL per (wallet, market), in one scan.
+
+    Whole days come from ``wallet_daily_rollups``; the partial day each rolling window
+    starts in is read from raw trades, so windows are exact without scanning history.
+    Each timeframe is a set of ``FILTER (WHERE ...)`` aggregates over the same rows,
+    exposed as ``buy_<tf>``, ``sell_<tf>``, ``trades_<tf>`` and ``pnl_<tf>`` columns after the
+    market's ``tracked_markets`` category ("" when untracked or untagged).
+    """
+    r, t = WalletDailyRollup, Trade
+    windows = {}  # timeframe -> (cutoff_ts, edge day, end of edge day)
     for tf_name, delta in TIMEFRAMES.items():
-        now = datetime.now(UTC)
-
-        # Time filter
-        time_filter = []
-        if delta:
-            cutoff = now - delta
-            cutoff_ts = int(cutoff.timestamp())
-            time_filter = [Trade.timestamp >= cutoff_ts]
-
-        # Volume & trade count per wallet
-        vol_q = (
-            select(
-                Trade.wallet,
-                func.count().label("trade_count"),
-                func.sum(Trade.size * Trade.price).label("volume"),
+        if delta is not None:
+            cutoff_ts = now_ts - int(delta.total_seconds())
+            edge_day = datetime.fromtimestamp(cutoff_ts, UTC).date()
+            windows[tf_name] = (cutoff_ts, edge_day, _day_start(edge_day + timedelta(days=1)))
+
+    notional = t.size * t.price
+    rollup_rows = select(
+        r.wallet,
+        r.condition_id,
+        r.day,
+        literal(None, BigInteger).label("ts"),
+        r.buy_notional.label("buy"),
+        r.sell_notional.label("sell"),
+        r.trade_count.label("trades"),
+        r.realized_pnl.label("pnl"),
+    )
+    edge_rows = select(
+        t.wallet,
+        t.condition_id,
+        literal(None, Date).label("day"),
+        t.timestamp.label("ts"),
+        case((t.side == "SELL", 0.0), else_=notional).label("buy"),
+        case((t.side == "SELL", notional), else_=0.0).label("sell"),
+        literal(1).label("trades"),
+        t.realized_pnl.label("pnl"),
+    ).where(or_(*(and_(t.timestamp >= cut, t.timestamp < end) for cut, _, end in windows.values())))
+    u = union_all(rollup_rows, edge_rows).subquery()
+
+    columns = []
+    for tf_name in TIMEFRAMES:
+        if tf_name in windows:
+            cutoff_ts, edge_day, edge_end = windows[tf_name]
+            # Rollup rows (ts NULL) for whole days, raw rows for the partial edge day
+            in_window = or_(u.c.day > edge_day, and_(u.c.ts >= cutoff_ts, u.c.ts < edge_end))
+        else:
+            in_window = u.c.ts.is_(None)
+        columns += [
+            func.coalesce(func.sum(agg).filter(in_window), 0).label(f"{name}_{tf_name}")
+            for name, agg in (
+                ("buy", u.c.buy),
+                ("sell", u.c.sell),
+                ("trades", u.c.trades),
+                ("pnl", u.c.pnl),
             )
-            .where(*time_filter)
-            .group_by(Trade.wallet)
+        ]
+    m = TrackedMarket
+    return (
+        select(u.c.wallet, u.c.condition_id, func.coalesce(m.category, "").label("category"))
+        .add_columns(*columns)
+        .select_from(u.outerjoin(m, m.condition_id == u.c.condition_id))
+        .group_by(u.c.wallet, u.c.condition_id, m.category)
+    )
+
+
+def _text(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+@dataclass
+class MarketTotals:
+    """Columnar form of :func:`scoring_scan_query` rows: one entry per (wallet, market)."""
+
+    wallets: np.ndarray  # unique wallet addresses (object)
+    wallet_idx: np.ndarray  # per row: int32 index into ``wallets``
+    categories: np.ndarray  # unique category names (object)
+    category_idx: np.ndarray  # per row: int32 index into ``categories``
+    volume: dict[str, np.ndarray]  # timeframe -> per-row buy + sell notional
+    trades: dict[str, np.ndarray]  # timeframe -> per-row int32 trade count
+    pnl: dict[str, np.ndarray]  # timeframe -> per-row realized PnL
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence], count: int) -> "MarketTotals":
+        """Fill typed columns from ``count`` scan rows, :data:`SCAN_CHUNK` rows at a time.
+
+        Fields may be str or bytes (as split from COPY text output). Only one chunk of
+        rows is held as Python objects at once; everything else goes straight into
+        preallocated arrays.
+        """
+        wallet_idx = np.empty(count, dtype=np.int32)
+        category_idx = np.empty(count, dtype=np.int32)
+        volume = {tf: np.empty(count) for tf in TIMEFRAMES}
+        trades = {tf: np.empty(count, dtype=np.int32) for tf in TIMEFRAMES}
+        pnl = {tf: np.empty(count) for tf in TIMEFRAMES}
+        block = np.empty((SCAN_CHUNK, 4 * len(TIMEFRAMES)))  # buy, sell, trades, pnl per tf
+
+        # Factorize wallets in first-seen order (much cheaper than np.unique on strings)
+        codes: dict = {}
+        category_codes: dict = {}
+        filled = 0
+        rows = iter(rows)
+        while chunk := list(islice(rows, SCAN_CHUNK)):
+            end = filled + len(chunk)
+            wallet_idx[filled:end] = [codes.setdefault(r[0], len(codes)) for r in chunk]
+            category_idx[filled:end] = [
+                category_codes.setdefault(r[2], len(category_codes)) for r in chunk
+            ]
+            values = block[: len(chunk)]
+            values[:] = [r[3:] for r in chunk]
+            for i, tf_name in enumerate(TIMEFRAMES):
+                np.add(values[:, 4 * i], values[:, 4 * i + 1], out=volume[tf_name][filled:end])
+                trades[tf_name][filled:end] = values[:, 4 * i + 2]
+                pnl[tf_name][filled:end] = values[:, 4 * i + 3]
+            filled = end
+        if filled != count:
+            raise ValueError(f"scoring scan: expected {count} rows, got {filled}")
+
+        return cls(
+            wallets=np.array([_text(w) for w in codes], dtype=object),
+            wallet_idx=wallet_idx,
+            categories=np.array([_text(c) for c in category_codes], dtype=object),
+            category_idx=category_idx,
+            volume=volume,
+            trades=trades,
+            pnl=pnl,
         )
-        vol_rows = {r.wallet: r for r in (await session.execute(vol_q)).all()}
-        if not vol_rows:
-            continue
-
-        # PnL per wallet+market: sells - buys
-        pnl_q = (
-            select(
-                Trade.wallet,
-                Trade.condition_id,
-                func.sum(
-                    case(
-                        (Trade.side == "SELL", Trade.size * Trade.price),
-                        else_=-Trade.size * Trade.price,
-                    )
-                ).label("market_pnl"),
-            )
-            .where(*time_filter)
-            .group_by(Trade.wallet, Trade.condition_id)
+
+    @classmethod
+    def from_copy(cls, scan: bytes) -> "MarketTotals":
+        """Parse :func:`scoring_scan_query` COPY text output without decoding it whole."""
+        lines = BytesIO(scan)
+        return cls.from_rows((line[:-1].split(b"\t") for line in lines), scan.count(b"\n"))
+
+    def category_rows(self) -> dict[str, np.ndarray]:
+        """Row indices per category, plus every row under "all".
+
+        Rows are grouped with one sort, so each category's slices only touch its own
+        rows and adding categories doesn't add passes over the whole scan.
+        """
+        order = np.argsort(self.category_idx, kind="stable")
+        bounds = np.searchsorted(self.category_idx[order], np.arange(len(self.categories) + 1))
+        groups = {"all": np.arange(len(self.wallet_idx))}
+        for code, name in enumerate(self.categories):
+            if name and name != "all":
+                groups[name] = order[bounds[code] : bounds[code + 1]]
+        return groups
+
+
+@dataclass
+class ScoreColumns:
+    """Ranked scores for one (category, timeframe) slice, one array entry per wallet."""
+
+    category: str
+    timeframe: str
+    wallets: np.ndarray
+    volume: np.ndarray
+    pnl: np.ndarray
+    win_rate: np.ndarray
+    trade_count: np.ndarray
+    rank_volume: np.ndarray
+    rank_pnl: np.ndarray
+    rank_win_rate: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.wallets)
+
+    def records(self, generation: int):
+        """Row tuples in ``SCORE_COLUMNS`` order, for COPY."""
+        n = len(self)
+        return zip(
+            self.wallets.tolist(),
+            repeat(self.category, n),
+            repeat(self.timeframe, n),
+            repeat(generation, n),
+            self.volume.tolist(),
+            self.pnl.tolist(),
+            self.win_rate.tolist(),
+            self.trade_count.tolist(),
+            self.rank_volume.tolist(),
+            self.rank_pnl.tolist(),
+            self.rank_win_rate.tolist(),
+            strict=True,
         )
-        pnl_rows = (await session.execute(pnl_q)).all()
-
-        # Aggregate PnL and win rate per wallet
-        wallet_pnl: dict[str, float] = {}
-        wallet_wins: dict[str, int] = {}
-        wallet_markets: dict[str, int] = {}
-        for r in pnl_rows:
-            wallet_pnl[r.wallet] = wallet_pnl.get(r.wallet, 0.0) + (r.market_pnl or 0.0)
-            wallet_markets[r.wallet] = wallet_markets.get(r.wallet, 0) + 1
-            if (r.market_pnl or 0.0) > 0:
-                wallet_wins[r.wallet] = wallet_wins.get(r.wallet, 0) + 1
-
-        # Build score dicts
-        wallet_list = list(vol_rows.keys())
-
-        # Precompute win rates
-        wallet_wr: dict[str, float] = {}
-        for w in wallet_list:
-            mc = wallet_markets.get(w, 0)
-            wallet_wr[w] = wallet_wins.get(w, 0) / mc if mc > 0 else 0.0
-
-        # Sort for rankings
-        by_volume = sorted(wallet_list, key=lambda w: vol_rows[w].volume or 0, reverse=True)
-        by_pnl = sorted(wallet_list, key=lambda w: wallet_pnl.get(w, 0.0), reverse=True)
-        by_wr = sorted(wallet_list, key=lambda w: wallet_wr[w], reverse=True)
-
-        rank_vol = {w: i for i, w in enumerate(by_volume, 1)}
-        rank_pnl = {w: i for i, w in enumerate(by_pnl, 1)}
-        rank_wr = {w: i for i, w in enumerate(by_wr, 1)}
-
-        scores = []
-        for w in wallet_list:
-            scores.append(
-                {
-                    "wallet": w,
-                    "category": "all",
-                    "timeframe": tf_name,
-                    "volume": vol_rows[w].volume or 0,
-                    "pnl": wallet_pnl.get(w, 0.0),
-                    "win_rate": wallet_wr[w],
-                    "trade_count": vol_rows[w].trade_count,
-                    "rank_volume": rank_vol[w],
-                    "rank_pnl": rank_pnl[w],
-                    "rank_win_rate": rank_wr[w],
-                }
-            )
 
-        # Upsert scores in batches (asyncpg has a 32767 param limit)
-        if scores:
-            # Clear old scores for this timeframe
-            await session.execute(
-                delete(WalletScore).where(
-                    WalletScore.timeframe == tf_name,
-                    WalletScore.category == "all",
-                )
-            )
 
-            batch_size = 3000  # 10 cols per row → 30k params per batch
-            for i in range(0, len(scores), batch_size):
-                batch = scores[i : i + batch_size]
-                stmt = pg_insert(WalletScore).values(batch)
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=["wallet", "category", "timeframe"],
-                    set_={
-                        "volume": stmt.excluded.volume,
-                        "pnl": stmt.excluded.pnl,
-                        "win_rate": stmt.excluded.win_rate,
-                        "trade_count": stmt.excluded.trade_count,
-                        "rank_volume": stmt.excluded.rank_volume,
-                        "rank_pnl": stmt.excluded.rank_pnl,
-                        "rank_win_rate": stmt.excluded.rank_win_rate,
-                    },
-                )
-                await session.execute(stmt)
-            total += len(scores)
-
-    # ── Second pass: category="mentions" (only trades on mentions markets) ──
-    mentions_cids_q = select(TrackedMarket.condition_id).where(TrackedMarket.category == "mentions")
-    mentions_cids_result = await session.execute(mentions_cids_q)
-    mentions_cids = {r[0] for r in mentions_cids_result.all()}
-
-    if mentions_cids:
-        for tf_name, delta in TIMEFRAMES.items():
-            now = datetime.now(UTC)
-
-            time_filter: list = [Trade.condition_id.in_(mentions_cids)]
-            if delta:
-                cutoff = now - delta
-                cutoff_ts = int(cutoff.timestamp())
-                time_filter.append(Trade.timestamp >= cutoff_ts)
-
-            vol_q = (
-                select(
-                    Trade.wallet,
-                    func.count().label("trade_count"),
-                    func.sum(Trade.size * Trade.price).label("volume"),
-                )
-                .where(*time_filter)
-                .group_by(Trade.wallet)
-            )
-            vol_rows = {r.wallet: r for r in (await session.execute(vol_q)).all()}
-            if not vol_rows:
-                continue
-
-            pnl_q = (
-                select(
-                    Trade.wallet,
-                    Trade.condition_id,
-                    func.sum(
-                        case(
-                            (Trade.side == "SELL", Trade.size * Trade.price),
-                            else_=-Trade.size * Trade.price,
-                        )
-                    ).label("market_pnl"),
-                )
-                .where(*time_filter)
-                .group_by(Trade.wallet, Trade.condition_id)
-            )
-            pnl_rows = (await session.execute(pnl_q)).all()
-
-            wallet_pnl: dict[str, float] = {}
-            wallet_wins: dict[str, int] = {}
-            wallet_markets: dict[str, int] = {}
-            for r in pnl_rows:
-                wallet_pnl[r.wallet] = wallet_pnl.get(r.wallet, 0.0) + (r.market_pnl or 0.0)
-                wallet_markets[r.wallet] = wallet_markets.get(r.wallet, 0) + 1
-                if (r.market_pnl or 0.0) > 0:
-                    wallet_wins[r.wallet] = wallet_wins.get(r.wallet, 0) + 1
-
-            wallet_list = list(vol_rows.keys())
-
-            wallet_wr: dict[str, float] = {}
-            for w in wallet_list:
-                mc = wallet_markets.get(w, 0)
-                wallet_wr[w] = wallet_wins.get(w, 0) / mc if mc > 0 else 0.0
-
-            by_volume = sorted(wallet_list, key=lambda w: vol_rows[w].volume or 0, reverse=True)
-            by_pnl = sorted(wallet_list, key=lambda w: wallet_pnl.get(w, 0.0), reverse=True)
-            by_wr = sorted(wallet_list, key=lambda w: wallet_wr[w], reverse=True)
-
-            rank_vol = {w: i for i, w in enumerate(by_volume, 1)}
-            rank_pnl = {w: i for i, w in enumerate(by_pnl, 1)}
-            rank_wr = {w: i for i, w in enumerate(by_wr, 1)}
-
-            scores = []
-            for w in wallet_list:
-                scores.append(
-                    {
-                        "wallet": w,
-                        "category": "mentions",
-                        "timeframe": tf_name,
-                        "volume": vol_rows[w].volume or 0,
-                        "pnl": wallet_pnl.get(w, 0.0),
-                        "win_rate": wallet_wr[w],
-                        "trade_count": vol_rows[w].trade_count,
-                        "rank_volume": rank_vol[w],
-                        "rank_pnl": rank_pnl[w],
-                        "rank_win_rate": rank_wr[w],
-                    }
-                )
-
-            if scores:
-                await session.execute(
-                    delete(WalletScore).where(
-                        WalletScore.timeframe == tf_name,
-                        WalletScore.category == "mentions",
-                    )
-                )
-
-                batch_size = 3000
-                for i in range(0, len(scores), batch_size):
-                    batch = scores[i : i + batch_size]
-                    stmt = pg_insert(WalletScore).values(batch)
-                    stmt = stmt.on_conflict_do_update(
-                        index_elements=["wallet", "category", "timeframe"],
-                        set_={
-                            "volume": stmt.excluded.volume,
-                            "pnl": stmt.excluded.pnl,
-                            "win_rate": stmt.excluded.win_rate,
-                            "trade_count": stmt.excluded.trade_count,
-                            "rank_volume": stmt.excluded.rank_volume,
-                            "rank_pnl": stmt.excluded.rank_pnl,
-                            "rank_win_rate": stmt.excluded.rank_win_rate,
-                        },
-                    )
-                    await session.execute(stmt)
-                total += len(scores)
+SCORE_COLUMNS = [
+    "wallet",
+    "category",
+    "timeframe",
+    "generation",
+    "volume",
+    "pnl",
+    "win_rate",
+    "trade_count",
+    "rank_volume",
+    "rank_pnl",
+    "rank_win_rate",
+]
+
+
+def _descending_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based rank of each value, highest first; ties keep wallet order."""
+    order = np.argsort(-values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(1, len(values) + 1)
+    return ranks
+
+
+def _rank(totals: MarketTotals, rows: np.ndarray, category: str, timeframe: str) -> ScoreColumns:
+    """Fold the selected per-market rows into ranked per-wallet volume, PnL and win rate.
+
+    PnL is realized PnL; a market counts as a win when it realized a profit.
+    ``rows`` is a boolean mask or an index array over ``totals``.
+    """
+    idx = totals.wallet_idx[rows]
+    market_volume = totals.volume[timeframe][rows]
+    market_pnl = totals.pnl[timeframe][rows]
+    size = len(totals.wallets)
+
+    markets = np.bincount(idx, minlength=size)
+    present = markets > 0
+    markets = markets[present]
+    volume = np.bincount(idx, weights=market_volume, minlength=size)[present]
+    pnl = np.bincount(idx, weights=market_pnl, minlength=size)[present]
+    trades = np.bincount(idx, weights=totals.trades[timeframe][rows], minlength=size)[present]
+    wins = np.bincount(idx[market_pnl > 0], minlength=size)[present]
+    win_rate = wins / markets
+
+    return ScoreColumns(
+        category=category,
+        timeframe=timeframe,
+        wallets=totals.wallets[present],
+        volume=volume,
+        pnl=pnl,
+        win_rate=win_rate,
+        trade_count=trades.astype(np.int64),
+        rank_volume=_descending_ranks(volume),
+        rank_pnl=_descending_ranks(pnl),
+        rank_win_rate=_descending_ranks(win_rate),
+    )
+
+
+async def _write_scores(session: AsyncSession, generation: int, scores: ScoreColumns) -> None:
+    """COPY one (category, timeframe) slice into an unpublished generation."""
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+        WalletScore.__tablename__, records=scores.records(generation), columns=SCORE_COLUMNS
+    )
+
+
+def published_generation():
+    """Scalar subquery for the generation readers should see (None before the first run)."""
+    return (
+        select(func.max(ScoreGeneration.id))
+        .where(ScoreGeneration.published_at.is_not(None))
+        .scalar_subquery()
+    )
+
+
+async def current_generation(session: AsyncSession) -> int | None:
+    """Resolve the published generation once, so a request's queries agree with each other."""
+    return (await session.execute(select(published_generation()))).scalar()
 
+
+async def copy_out(session: AsyncSession, query, *, format: str = "text") -> bytes:
+    """Run ``query`` as ``COPY ... TO STDOUT`` and return its output in ``format``.
+
+    The event loop only collects bytes; rows are decoded wherever they get scored.
+    """
+    conn = await session.connection()
+    compiled = query.compile(dialect=conn.dialect)
+    args = [compiled.params[name] for name in compiled.positiontup or ()]
+    chunks: list[bytes] = []
+
+    async def sink(chunk: bytes) -> None:
+        chunks.append(chunk)
+
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_from_query(  # type: ignore[union-attr]
+        str(compiled), *args, output=sink, format=format
+    )
+    return b"".join(chunks)
+
+
+def score_slices(scan: bytes) -> list[ScoreColumns]:
+    """Parse the scan's COPY output and rank every non-empty (category, timeframe) slice.
+
+    Trades without a wallet address are left out, as they are from the rollups the
+    whole days come from. Pure CPU with picklable arguments and result, so it can
+    run in a worker process.
+    """
+    totals = MarketTotals.from_copy(scan)
+    blank = np.flatnonzero(totals.wallets == "")
+
+    slices = []
+    for category, category_rows in totals.category_rows().items():
+        if len(blank):
+            category_rows = category_rows[totals.wallet_idx[category_rows] != blank[0]]
+        for tf_name in TIMEFRAMES:
+            selected = category_rows[totals.trades[tf_name][category_rows] > 0]
+            if len(selected):
+                slices.append(_rank(totals, selected, category, tf_name))
+    return slices
+
+
+async def compute_scores(session: AsyncSession, executor: Executor | None = None) -> int:
+    """Score every (category, timeframe) slice into a new generation, then publish it.
+
+    Categories are "all" plus every ``tracked_markets.category`` with trades.
+
+    Only database I/O runs on the event loop; parsing and ranking run in ``executor``
+    (inline when None). Each slice is committed on its own, so no transaction spans
+    the whole run, and readers keep seeing the previous generation until the final
+    pointer swap. Returns number of scores written.
+    """
+    now_ts = int(datetime.now(UTC).timestamp())
+    scan = await copy_out(session, scoring_scan_query(now_ts))
+    if executor is None:
+        slices = score_slices(scan)
+    else:
+        loop = asyncio.get_running_loop()
+        slices = await loop.run_in_executor(executor, score_slices, scan)
+    del scan
+
+    generation = ScoreGeneration()
+    session.add(generation)
+    await session.commit()
+
+    total = 0
+    for scores in slices:
+        await _write_scores(session, generation.id, scores)
+        await session.commit()
+        total += len(scores)
+
+    await session.execute(
+        update(ScoreGeneration)
+        .where(ScoreGeneration.id == generation.id)
+        .values(published_at=func.now(), scores=total)
+    )
     await session.commit()
-    logger.info("computed %d wallet scores", total)
+    logger.info("published wallet score generation %d (%d scores)", generation.id, total)
     return total
 
 
-async def upsert_wallet(session: AsyncSession, address: str, trade_volume: float) -> None:
-    """Create or update a wallet record when a trade is ingested."""
-    stmt = pg_insert(Wallet).values(
-        address=address,
-        total_trades=1,
-        total_volume=trade_volume,
+async def prune_generations(session: AsyncSession) -> int:
+    """Delete superseded and abandoned generations. Returns the number of score rows removed."""
+    keep_q = (
+        select(ScoreGeneration.id)
+        .where(ScoreGeneration.published_at.is_not(None))
+        .order_by(ScoreGeneration.id.desc())
+        .limit(KEEP_GENERATIONS)
     )
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["address"],
-        set_={
-            "last_seen": func.now(),
-            "total_trades": Wallet.total_trades + 1,
-            "total_volume": Wallet.total_volume + trade_volume,
-        },
+    keep = [r[0] for r in (await session.execute(keep_q)).all()]
+    doomed_q = select(ScoreGeneration.id).where(
+        ScoreGeneration.id.not_in(keep) if keep else true(),
+        or_(
+            ScoreGeneration.published_at.is_not(None),
+            ScoreGeneration.created_at < func.now() - STALE_GENERATION,
+        ),
     )
-    await session.execute(stmt)
+    doomed = [r[0] for r in (await session.execute(doomed_q)).all()]
+    if not doomed:
+        return 0
+
+    result = await session.execute(delete(WalletScore).where(WalletScore.generation.in_(doomed)))
+    await session.execute(delete(ScoreGeneration).where(ScoreGeneration.id.in_(doomed)))
+    await session.commit()
+    logger.info("pruned %d wallet score generation(s)", len(doomed))
+    return result.rowcount  # type: ignore[attr-defined]
+
+
+async def upsert_wallet(session: AsyncSession, address: str, trade_volume: float) -> None:
+    """Create or update a wallet record when a trade is ingested."""
+    await upsert_wallets(session, {address: (1, trade_volume)})
+
+
+async def upsert_wallets(session: AsyncSession, totals: dict[str, tuple[int, float]]) -> None:
+    """Apply aggregated ``{address: (trade_count, volume)}`` deltas in one statement.
+
+    Rows are sorted by address so concurrent writers (poller, listener) always lock
+    ``wallets`` rows in the same order and can't deadlock each other.
+    """
+    rows = [
+        {"address": addr, "total_trades": count, "total_volume": volume}
+        for addr, (count, volume) in sorted(totals.items())
+        if addr
+    ]
+    for i in range(0, len(rows), WALLET_BATCH_SIZE):
+        stmt = pg_insert(Wallet).values(rows[i : i + WALLET_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["address"],
+            set_={
+                "last_seen": func.now(),
+                "total_trades": Wallet.total_trades + stmt.excluded.total_trades,
+                "total_volume": Wallet.total_volume + stmt.excluded.total_volume,
+            },
+        )
+        await session.execute(stmt)
+
+
+def aggregate_daily_rollups(
+    trades: list[dict],
+) -> dict[tuple[str, str, date], tuple[float, float, int, float]]:
+    """Sum buy/sell notional, count and realized PnL per (wallet, market, UTC day)."""
+    totals: dict[tuple[str, str, date], tuple[float, float, int, float]] = {}
+    for t in trades:
+        key = (t["wallet"], t["condition_id"], datetime.fromtimestamp(t["timestamp"], UTC).date())
+        buy, sell, count, realized = totals.get(key, (0.0, 0.0, 0, 0.0))
+        notional = t["size"] * t["price"]
+        if t["side"] == "SELL":
+            sell += notional
+        else:
+            buy += notional
+        totals[key] = (buy, sell, count + 1, realized + t["realized_pnl"])
+    return totals
+
+
+async def upsert_daily_rollups(
+    session: AsyncSession, totals: dict[tuple[str, str, date], tuple[float, float, int, float]]
+) -> None:
+    """Add aggregated deltas to ``wallet_daily_rollups``, in key order (see upsert_wallets)."""
+    rows = [
+        {
+            "wallet": wallet,
+            "condition_id": cid,
+            "day": day,
+            "buy_notional": buy,
+            "sell_notional": sell,
+            "trade_count": count,
+            "realized_pnl": realized,
+        }
+        for (wallet, cid, day), (buy, sell, count, realized) in sorted(totals.items())
+        if wallet
+    ]
+    r = WalletDailyRollup
+    for i in range(0, len(rows), ROLLUP_BATCH_SIZE):
+        stmt = pg_insert(r).values(rows[i : i + ROLLUP_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["wallet", "condition_id", "day"],
+            set_={
+                "buy_notional": r.buy_notional + stmt.excluded.buy_notional,
+                "sell_notional": r.sell_notional + stmt.excluded.sell_notional,
+                "trade_count": r.trade_count + stmt.excluded.trade_count,
+                "realized_pnl": r.realized_pnl + stmt.excluded.realized_pnl,
+            },
+        )
+        await session.execute(stmt)
+
+
+async def record_trade_aggregates(session: AsyncSession, inserted: list[dict]) -> None:
+    """Update every ingest-time aggregate for trades that were newly inserted."""
+    await upsert_wallets(session, aggregate_wallet_totals(inserted))
+    await upsert_daily_rollups(session, aggregate_daily_rollups(inserted))
+
+
+def aggregate_wallet_totals(trades: list[dict]) -> dict[str, tuple[int, float]]:
+    """Sum trade count and notional volume per wallet for :func:`upsert_wallets`."""
+    totals: dict[str, tuple[int, float]] = {}
+    for t in trades:
+        count, volume = totals.get(t["wallet"], (0, 0.0))
+        totals[t["wallet"]] = (count + 1, volume + t["size"] * t["price"])
+    return totals
@@ -0,0 +1,61 @@
+"""Standalone worker process: ``python -m app.workers``.
+
+Runs market discovery, polling, scoring and the CLOB listener without FastAPI, so
+ingestion and scoring can be sized separately from API replicas (which then run
+with ``RUN_WORKERS=false``). Leader election still applies, so several worker
+processes act as hot standbys for each other.
+"""
+
+import asyncio
+import logging
+import signal
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+
+logger = logging.getLogger("app.workers")
+
+
+async def main() -> None:
+    setup_logging()
+    logger.info("polyscoop worker process starting up")
+
+    from app.db.engine import engine
+    from app.db.migrate import upgrade_schema
+
+    await upgrade_schema()
+    logger.info("database tables ready")
+
+    redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        await redis.ping()  # type: ignore[reportGeneralTypeIssues]
+        logger.info("redis connected")
+    except Exception:
+        logger.warning("redis not available — live trade publishing disabled")
+        redis = None
+
+    from app.services.polymarket import close_client, get_client
+    from app.workers.manager import start_workers, stop_workers
+
+    get_client()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await start_workers(redis=redis)
+    await stop.wait()
+
+    logger.info("polyscoop worker process shutting down")
+    await stop_workers()
+    await close_client()
+    if redis:
+        await redis.aclose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
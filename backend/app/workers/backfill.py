@@ -0,0 +1,340 @@
+"""Historical trade backfill — pages Data API ``/trades`` for a set of markets.
+
+Markets run in parallel under the shared Polymarket rate limiter. Each page is
+written (COPY path) together with the market's checkpoint in one transaction, so
+a crashed or cancelled run resumes exactly where it stopped.
+
+A fresh run first seeks to the newest page that reaches ``to_ts`` instead of paging
+down from the newest trade, and stops once a page is older than ``from_ts``.
+
+Pages are booked into ``wallet_positions`` as they land, after any newer trades the
+ledger has already seen, so once every market is done the run rebuilds the
+positions of the wallets it wrote trades for in timestamp order.
+
+CLI usage (from backend/):
+
+    python -m app.workers.backfill 0xabc... 0xdef... --from 2026-01-01 --to 2026-02-01
+    python -m app.workers.backfill --all-tracked --from 2026-01-01
+
+The same job can be started from the API via ``POST /api/v1/admin/backfill``.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db.engine import async_session
+from app.db.models import BackfillCheckpoint, TrackedMarket, Trade
+from app.services.ingest import copy_trades, parse_data_api_trade
+from app.services.ledger import book_trades
+from app.services.polymarket import data_api_get
+from app.services.scoring import record_trade_aggregates
+from app.workers.rebuild_positions import rebuild_positions
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 500
+CONCURRENCY = 4  # markets backfilled in parallel
+REPORT_INTERVAL = 10  # seconds between throughput log lines
+
+
+@dataclass
+class BackfillProgress:
+    """Live counters for a backfill run."""
+
+    markets_total: int = 0
+    markets_done: int = 0
+    markets_failed: int = 0
+    requests: int = 0
+    trades: int = 0  # rows fetched inside the time range
+    inserted: int = 0  # rows that were new to the trades table
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+    wallets: set[str] = field(default_factory=set)  # positions to rebuild at the end
+
+    def as_dict(self) -> dict:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "markets_total": self.markets_total,
+            "markets_done": self.markets_done,
+            "markets_failed": self.markets_failed,
+            "requests": self.requests,
+            "trades": self.trades,
+            "inserted": self.inserted,
+            "elapsed_s": elapsed,
+            "trades_per_s": self.trades / elapsed if elapsed > 0 else 0.0,
+            "requests_per_s": self.requests / elapsed if elapsed > 0 else 0.0,
+            "running": self.finished is None,
+        }
+
+
+async def _load_checkpoint(condition_id: str, from_ts: int, to_ts: int) -> BackfillCheckpoint:
+    """Fetch the market's checkpoint, starting over if it was for a different range."""
+    async with async_session() as session:
+        cp = await session.get(BackfillCheckpoint, condition_id)
+        if cp is None or cp.from_ts != from_ts or cp.to_ts != to_ts:
+            cp = BackfillCheckpoint(
+                condition_id=condition_id,
+                from_ts=from_ts,
+                to_ts=to_ts,
+                page_offset=0,
+                oldest_ts=None,
+                trades=0,
+                done=False,
+            )
+            await session.merge(cp)
+            await session.commit()
+        return cp
+
+
+async def _newer_than(
+    condition_id: str, offset: int, to_ts: int, progress: BackfillProgress
+) -> bool:
+    """Whether the trade at ``offset`` (newest first) is newer than ``to_ts``."""
+    data = await data_api_get(
+        "/trades", params={"market": condition_id, "limit": 1, "offset": offset}
+    )
+    progress.requests += 1
+    return bool(data) and isinstance(data, list) and int(data[0].get("timestamp", 0)) > to_ts
+
+
+async def _seek(condition_id: str, to_ts: int, progress: BackfillProgress) -> int:
+    """Offset of a page that starts at most ``PAGE_SIZE`` trades above ``to_ts``.
+
+    Gallops down from the newest trade with one-row probes, then bisects, so a range
+    far in the past costs O(log n) requests instead of paging through everything
+    newer than it.
+    """
+    if not await _newer_than(condition_id, 0, to_ts, progress):
+        return 0
+    lo, hi = 0, PAGE_SIZE  # trade at lo is newer than to_ts
+    while await _newer_than(condition_id, hi, to_ts, progress):
+        lo, hi = hi, hi * 2
+    while hi - lo > PAGE_SIZE:
+        mid = (lo + hi) // 2
+        if await _newer_than(condition_id, mid, to_ts, progress):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+async def _resumed_wallets(condition_id: str, from_ts: int, to_ts: int) -> set[str]:
+    """Wallets with trades in the range, for a market an earlier run already started."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Trade.wallet)
+            .where(Trade.condition_id == condition_id)
+            .where(Trade.timestamp.between(from_ts, to_ts))
+            .distinct()
+        )
+        return set(result.scalars())
+
+
+async def _backfill_market(
+    condition_id: str, from_ts: int, to_ts: int, progress: BackfillProgress
+) -> None:
+    cp = await _load_checkpoint(condition_id, from_ts, to_ts)
+    offset, inserted_total, oldest = cp.page_offset, cp.trades, cp.oldest_ts
+    if offset:
+        # Trades an interrupted run booked never got their rebuild
+        progress.wallets |= await _resumed_wallets(condition_id, from_ts, to_ts)
+    elif not cp.done:
+        offset = await _seek(condition_id, to_ts, progress)
+
+    # Data API returns newest first, so page backwards until we pass from_ts
+    while not cp.done:
+        data = await data_api_get(
+            "/trades", params={"market": condition_id, "limit": PAGE_SIZE, "offset": offset}
+        )
+        progress.requests += 1
+        page = data if isinstance(data, list) else []
+
+        rows = []
+        for t in page:
+            row = parse_data_api_trade(t, condition_id)
+            if row is not None and from_ts <= row["timestamp"] <= to_ts:
+                rows.append(row)
+        if page:
+            page_oldest = min(int(t.get("timestamp", 0)) for t in page)
+            oldest = page_oldest if oldest is None else min(oldest, page_oldest)
+        offset += len(page)
+        done = len(page) < PAGE_SIZE or (oldest is not None and oldest < from_ts)
+
+        async with async_session() as session:
+            inserted = await book_trades(session, rows, write=copy_trades)
+            await record_trade_aggregates(session, inserted)
+            inserted_total += len(inserted)
+            stmt = pg_insert(BackfillCheckpoint).values(
+                condition_id=condition_id,
+                from_ts=from_ts,
+                to_ts=to_ts,
+                page_offset=offset,
+                oldest_ts=oldest,
+                trades=inserted_total,
+                done=done,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["condition_id"],
+                set_={
+                    "page_offset": stmt.excluded.page_offset,
+                    "oldest_ts": stmt.excluded.oldest_ts,
+                    "trades": stmt.excluded.trades,
+                    "done": stmt.excluded.done,
+                },
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+        progress.trades += len(rows)
+        progress.inserted += len(inserted)
+        progress.wallets.update(r["wallet"] for r in inserted)
+        cp.done = done
+
+
+async def _report(progress: BackfillProgress) -> None:
+    while True:
+        await asyncio.sleep(REPORT_INTERVAL)
+        p = progress.as_dict()
+        logger.info(
+            "backfill: %d/%d markets, %d trades (%d new), %.1f trades/s, %.2f req/s",
+            p["markets_done"],
+            p["markets_total"],
+            p["trades"],
+            p["inserted"],
+            p["trades_per_s"],
+            p["requests_per_s"],
+        )
+
+
+async def run_backfill(
+    condition_ids: list[str],
+    from_ts: int,
+    to_ts: int,
+    *,
+    concurrency: int = CONCURRENCY,
+    progress: BackfillProgress | None = None,
+) -> BackfillProgress:
+    """Backfill ``[from_ts, to_ts]`` for each market, resuming from checkpoints."""
+    progress = progress or BackfillProgress()
+    progress.markets_total = len(condition_ids)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one(condition_id: str) -> None:
+        async with sem:
+            try:
+                await _backfill_market(condition_id, from_ts, to_ts, progress)
+                progress.markets_done += 1
+            except Exception:
+                progress.markets_failed += 1
+                logger.exception("backfill failed for %s; rerun to resume", condition_id)
+
+    reporter = asyncio.create_task(_report(progress))
+    try:
+        await asyncio.gather(*(_one(cid) for cid in condition_ids))
+        if progress.wallets:
+            logger.info("backfill: rebuilding positions of %d wallets", len(progress.wallets))
+            await rebuild_positions(progress.wallets)
+    finally:
+        reporter.cancel()
+        progress.finished = time.monotonic()
+
+    p = progress.as_dict()
+    logger.info(
+        "backfill finished: %d markets (%d failed), %d trades (%d new) in %.1fs, %.1f trades/s",
+        p["markets_done"],
+        p["markets_failed"],
+        p["trades"],
+        p["inserted"],
+        p["elapsed_s"],
+        p["trades_per_s"],
+    )
+    return progress
+
+
+# ── Admin-triggered job (one at a time per process) ──────
+
+_job: asyncio.Task | None = None  # type: ignore[type-arg]
+_job_progress: BackfillProgress | None = None
+
+
+def start_job(condition_ids: list[str], from_ts: int, to_ts: int) -> BackfillProgress:
+    """Start a background backfill. Raises RuntimeError if one is already running."""
+    global _job, _job_progress
+    if _job is not None and not _job.done():
+        raise RuntimeError("a backfill is already running")
+    _job_progress = BackfillProgress()
+    _job = asyncio.create_task(
+        run_backfill(condition_ids, from_ts, to_ts, progress=_job_progress), name="backfill"
+    )
+    return _job_progress
+
+
+def job_status() -> dict | None:
+    """Progress of the current or last admin-triggered backfill."""
+    return _job_progress.as_dict() if _job_progress else None
+
+
+async def stop_job() -> None:
+    """Cancel a running admin-triggered backfill (checkpoints keep its progress)."""
+    if _job is not None and not _job.done():
+        _job.cancel()
+        await asyncio.gather(_job, return_exceptions=True)
+
+
+# ── CLI ──────────────────────────────────────────────────
+
+
+def parse_date(value: str) -> int:
+    """Accept a unix timestamp or an ISO date/datetime (UTC if no zone given)."""
+    if value.isdigit():
+        return int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return int(dt.timestamp())
+
+
+async def _main() -> None:
+    from app.core.logging import setup_logging
+    from app.db.engine import engine
+    from app.db.migrate import upgrade_schema
+    from app.services.polymarket import close_client
+
+    parser = argparse.ArgumentParser(description="Backfill historical trades from the Data API.")
+    parser.add_argument("condition_ids", nargs="*", help="markets to backfill")
+    parser.add_argument("--all-tracked", action="store_true", help="every active tracked market")
+    parser.add_argument("--from", dest="from_ts", type=parse_date, default=0)
+    parser.add_argument("--to", dest="to_ts", type=parse_date, default=None)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+
+    setup_logging()
+    await upgrade_schema()
+
+    condition_ids = list(args.condition_ids)
+    if args.all_tracked:
+        async with async_session() as session:
+            result = await session.execute(
+                select(TrackedMarket.condition_id).where(TrackedMarket.active.is_(True))
+            )
+            condition_ids += [r[0] for r in result.all() if r[0] not in condition_ids]
+    if not condition_ids:
+        parser.error("pass condition IDs or --all-tracked")
+
+    to_ts = args.to_ts if args.to_ts is not None else int(time.time())
+    try:
+        await run_backfill(condition_ids, args.from_ts, to_ts, concurrency=args.concurrency)
+    finally:
+        await close_client()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
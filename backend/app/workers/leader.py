@@ -0,0 +1,125 @@
+"""Leader election for background workers via Postgres advisory locks.
+
+Every API process starts the workers, but each worker only runs in the process
+holding its session-level advisory lock. The lock lives on a dedicated connection:
+if the leader process dies its connection closes, Postgres releases the lock, and
+a standby process takes over on its next attempt.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.engine import engine
+
+logger = logging.getLogger(__name__)
+
+RETRY_INTERVAL = 5  # seconds between standby attempts to take the lock
+RENEW_INTERVAL = 5  # seconds between leader liveness checks on the lock connection
+
+# worker name -> whether this process currently leads it
+_leading: dict[str, bool] = {}
+
+
+def _lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a worker name."""
+    digest = hashlib.blake2b(f"polyscoop:worker:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class AdvisoryLease:
+    """A session-level ``pg_advisory_lock`` held on its own autocommit connection."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.key = _lock_key(name)
+        self._conn: AsyncConnection | None = None
+
+    async def try_acquire(self) -> bool:
+        conn = await engine.connect()
+        try:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            got = (
+                await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+            ).scalar()
+        except Exception:
+            await conn.close()
+            raise
+        if not got:
+            await conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    async def still_held(self) -> bool:
+        """The lock is held for as long as its connection is alive."""
+        if self._conn is None:
+            return False
+        try:
+            await self._conn.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+
+    async def release(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+        except Exception:
+            # Closing would return the session to the pool with the lock still held;
+            # invalidating ends the session, and Postgres releases its locks with it
+            logger.debug("advisory unlock failed for %s; discarding its connection", self.name)
+            await conn.invalidate()
+        finally:
+            await conn.close()
+
+
+async def run_as_leader(name: str, run: Callable[[], Awaitable[None]]) -> None:
+    """Run ``run()`` only while this process holds the worker's lock, forever.
+
+    Standbys retry every ``RETRY_INTERVAL``; a leader that loses its lock connection
+    cancels the worker and goes back to standby.
+    """
+    lease = AdvisoryLease(name)
+    _leading[name] = False
+
+    while True:
+        try:
+            acquired = await lease.try_acquire()
+        except Exception:
+            logger.warning("%s: leader election failed, retrying in %ds", name, RETRY_INTERVAL)
+            acquired = False
+        if not acquired:
+            await asyncio.sleep(RETRY_INTERVAL)
+            continue
+
+        logger.info("%s: acquired leadership", name)
+        _leading[name] = True
+        task = asyncio.create_task(run(), name=name)
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=RENEW_INTERVAL)
+                if not task.done() and not await lease.still_held():
+                    logger.warning("%s: lost leadership, stopping worker", name)
+                    break
+            if task.done() and not task.cancelled() and task.exception():
+                logger.error("%s: worker crashed", name, exc_info=task.exception())
+        finally:
+            _leading[name] = False
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            await lease.release()
+
+        await asyncio.sleep(RETRY_INTERVAL)
+
+
+def leadership() -> dict[str, bool]:
+    """Which workers this process is currently running."""
+    return dict(_leading)
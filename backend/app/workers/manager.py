@@ -1,22 +1,49 @@
-"""Worker lifecycle manager — starts/stops background tasks in FastAPI lifespan."""
+"""Worker lifecycle manager — starts/stops background tasks in FastAPI lifespan.
+
+With leader election enabled (the default), every process starts the same tasks
+but each worker only runs in the one process holding its advisory lock, so
+``uvicorn --workers N`` scales the API without multiplying ingestion load.
+"""
 
 import asyncio
 import logging
-
-from app.workers import market_discovery, trade_listener, trade_poller, wallet_scorer
+from collections.abc import Awaitable, Callable
+
+from app.core.config import settings
+from app.services.pipeline import pipeline
+from app.workers import (
+    backfill,
+    leader,
+    market_discovery,
+    trade_listener,
+    trade_poller,
+    wallet_scorer,
+)
 
 logger = logging.getLogger(__name__)
 
 _tasks: list[asyncio.Task] = []  # type: ignore[type-arg]
 
-
-async def start_workers() -> None:
-    """Start all background worker tasks."""
-    logger.info("starting background workers")
-    _tasks.append(asyncio.create_task(market_discovery.run_forever(), name="market_discovery"))
-    _tasks.append(asyncio.create_task(trade_poller.run_forever(), name="trade_poller"))
-    _tasks.append(asyncio.create_task(wallet_scorer.run_forever(), name="wallet_scorer"))
-    _tasks.append(asyncio.create_task(trade_listener.run_forever(), name="trade_listener"))
+WORKERS: dict[str, Callable[[], Awaitable[None]]] = {
+    "market_discovery": market_discovery.run_forever,
+    "trade_poller": trade_poller.run_forever,
+    "wallet_scorer": wallet_scorer.run_forever,
+    "trade_listener": trade_listener.run_forever,
+}
+
+
+async def start_workers(redis=None) -> None:
+    """Start all background worker tasks; ``redis`` is used to publish live trades."""
+    trade_listener.set_redis(redis)
+    pipeline.add_publisher(trade_listener.publish_trades)
+    pipeline.start()
+    logger.info(
+        "starting background workers (leader election %s)",
+        "on" if settings.WORKER_LEADER_ELECTION else "off",
+    )
+    for name, run in WORKERS.items():
+        coro = leader.run_as_leader(name, run) if settings.WORKER_LEADER_ELECTION else run()
+        _tasks.append(asyncio.create_task(coro, name=name))
     logger.info("started %d workers", len(_tasks))
 
 
@@ -27,4 +54,7 @@ async def stop_workers() -> None:
         task.cancel()
     await asyncio.gather(*_tasks, return_exceptions=True)
     _tasks.clear()
+    await backfill.stop_job()
+    # Producers are stopped; flush whatever they already handed to the pipeline
+    await pipeline.stop()
     logger.info("all workers stopped")
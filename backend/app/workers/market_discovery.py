@@ -1,13 +1,14 @@
-"""Discovers active markets from Gamma API and inserts into tracked_markets.
+"""Discovers active markets from Gamma API and syncs them into tracked_markets.
 
 If MENTIONS_TAG_SLUG is set, only fetches markets with that tag slug.
-Otherwise, fetches top active events by volume.
+Otherwise, fetches all active events (up to MAX_EVENTS).
 """
 
 import asyncio
 import json
 import logging
 
+from sqlalchemy import func, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.core.config import settings
@@ -18,35 +19,88 @@ from app.services.polymarket import gamma_get
 logger = logging.getLogger(__name__)
 
 INTERVAL = 600  # 10 minutes
-MAX_EVENTS = 50  # how many top events to track
+PAGE_SIZE = 100  # events per Gamma request
+PAGE_CONCURRENCY = 5  # pages fetched per wave
+PAGE_OVERLAP = 10  # events repeated at the start of each page to detect shifts
+MAX_EVENTS = 5000  # safety cap on events per run
+MARKET_BATCH_SIZE = 4000  # 7 cols per row → stays under asyncpg's 32767 param limit
 
+# Columns compared to decide whether a tracked market needs writing
+_DIFF_FIELDS = ("question", "category", "image", "token_ids", "event_id")
 
-async def discover_markets() -> int:
-    """Fetch active events and upsert their markets. Returns count of markets upserted."""
-    params: dict = {
-        "limit": MAX_EVENTS,
-        "active": "true",
-        "closed": "false",
-        "order": "volume",
-        "ascending": "false",
-    }
-
-    # If a specific tag slug is configured, filter by it
-    if settings.MENTIONS_TAG_SLUG:
-        params["tag_slug"] = settings.MENTIONS_TAG_SLUG
 
+def _event_id(event: dict) -> int:
     try:
-        data = await gamma_get("/events", params=params)
-    except Exception:
-        logger.exception("failed to fetch events from gamma")
-        return 0
+        return int(event.get("id", -1))
+    except (TypeError, ValueError):
+        return -1
+
+
+async def _fetch_events(params: dict) -> tuple[list[dict], bool]:
+    """Page through all events matching ``params``, a wave of pages at a time.
+
+    Events are listed by ascending id, a key that trading activity can't reorder, and
+    consecutive pages overlap by ``PAGE_OVERLAP`` events. If events close while we page,
+    later ones shift towards the front; a page starting past the previous page's last
+    id means the shift outran the overlap and events may have been skipped.
+
+    Returns (events, complete); ``complete`` is False if any page failed, pages may
+    have skipped events, or paging stopped at ``MAX_EVENTS``. In those cases the
+    result must not be used to deactivate markets.
+    """
+    events: list[dict] = []
+    complete = True
+    offset = 0
+    stride = PAGE_SIZE - PAGE_OVERLAP
+    last_id: int | None = None  # last event id of the previous page
+
+    while offset < MAX_EVENTS:
+        offsets = [offset + i * stride for i in range(PAGE_CONCURRENCY)]
+        requests = [
+            gamma_get("/events", params={**params, "limit": PAGE_SIZE, "offset": o})
+            for o in offsets
+        ]
+        pages = await asyncio.gather(*requests, return_exceptions=True)
+
+        last_page = False
+        for page in pages:
+            if not isinstance(page, list):
+                # An error object is not an empty listing: it must not deactivate anything
+                logger.warning("market_discovery: failed to fetch events page: %r", page)
+                complete = False
+                last_page = True
+                break
+            batch = page
+            if batch and last_id is not None and _event_id(batch[0]) > last_id:
+                logger.warning("market_discovery: events shifted while paging, results partial")
+                complete = False
+            if batch:
+                last_id = _event_id(batch[-1])
+            events.extend(batch)
+            if len(batch) < PAGE_SIZE:
+                last_page = True
+                break
+        if last_page:
+            break
+        offset += stride * PAGE_CONCURRENCY
+    else:
+        logger.warning("market_discovery: stopped at MAX_EVENTS=%d", MAX_EVENTS)
+        complete = False
+
+    # Overlapping (or shifted) pages repeat events; keep the first copy of each
+    seen: set[str] = set()
+    unique = []
+    for event in events:
+        event_id = str(event.get("id", ""))
+        if event_id not in seen:
+            seen.add(event_id)
+            unique.append(event)
+    return unique, complete
 
-    events = data if isinstance(data, list) else []
-    if not events:
-        logger.warning("market_discovery: gamma returned 0 events")
-        return 0
 
-    markets_to_upsert = []
+def _extract_markets(events: list[dict]) -> dict[str, dict]:
+    """Build tracked_markets rows, keyed by condition_id, for open markets in ``events``."""
+    markets: dict[str, dict] = {}
 
     for event in events:
         event_id = str(event.get("id", ""))
@@ -81,42 +135,109 @@ async def discover_markets() -> int:
             if not token_ids:
                 continue
 
-            markets_to_upsert.append(
-                {
-                    "condition_id": condition_id,
-                    "question": m.get("question", ""),
-                    "category": category,
-                    "image": m.get("image", ""),
-                    "token_ids": [str(t) for t in token_ids],
-                    "active": True,
-                    "event_id": event_id,
-                }
-            )
+            markets[condition_id] = {
+                "condition_id": condition_id,
+                "question": m.get("question", ""),
+                "category": category,
+                "image": m.get("image", "") or "",
+                "token_ids": [str(t) for t in token_ids],
+                "active": True,
+                "event_id": event_id,
+            }
+
+    return markets
+
+
+async def discover_markets() -> int:
+    """Fetch all matching events and sync tracked_markets. Returns count of rows written.
 
-    if not markets_to_upsert:
-        logger.info("market_discovery: no markets extracted from %d events", len(events))
-        return 0
+    Only new or changed markets are upserted; active markets that no longer appear
+    (closed, or dropped out of the listing) are deactivated so the poller and the
+    listener stop spending budget on them.
+    """
+    params: dict = {
+        "active": "true",
+        "closed": "false",
+        "order": "id",
+        "ascending": "true",
+    }
+
+    # If a specific tag slug is configured, filter by it
+    if settings.MENTIONS_TAG_SLUG:
+        params["tag_slug"] = settings.MENTIONS_TAG_SLUG
+
+    events, complete = await _fetch_events(params)
+    if not events:
+        logger.warning("market_discovery: gamma returned 0 events")
+        if not complete:
+            return 0
+        # A complete empty listing still deactivates every market that stopped matching
+
+    discovered = _extract_markets(events)
 
     async with async_session() as session:
-        stmt = pg_insert(TrackedMarket).values(markets_to_upsert)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["condition_id"],
-            set_={
-                "question": stmt.excluded.question,
-                "active": stmt.excluded.active,
-                "token_ids": stmt.excluded.token_ids,
-                "category": stmt.excluded.category,
-            },
+        result = await session.execute(
+            select(
+                TrackedMarket.condition_id,
+                TrackedMarket.active,
+                *(getattr(TrackedMarket, f) for f in _DIFF_FIELDS),
+            )
         )
-        await session.execute(stmt)
+        current = {r.condition_id: r for r in result.all()}
+
+        new = [row for cid, row in discovered.items() if cid not in current]
+        changed = [
+            row
+            for cid, row in discovered.items()
+            if cid in current
+            and (
+                not current[cid].active
+                or any(getattr(current[cid], f) != row[f] for f in _DIFF_FIELDS)
+            )
+        ]
+        gone = sorted(cid for cid, r in current.items() if r.active and cid not in discovered)
+        if not complete:
+            # A missing or skipped page would look like every market on it disappeared
+            gone = []
+
+        to_write = sorted(new + changed, key=lambda r: r["condition_id"])
+        for i in range(0, len(to_write), MARKET_BATCH_SIZE):
+            stmt = pg_insert(TrackedMarket).values(to_write[i : i + MARKET_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["condition_id"],
+                set_={
+                    "question": stmt.excluded.question,
+                    "active": stmt.excluded.active,
+                    "token_ids": stmt.excluded.token_ids,
+                    "category": stmt.excluded.category,
+                    "image": stmt.excluded.image,
+                    "event_id": stmt.excluded.event_id,
+                    "updated_at": func.now(),
+                },
+            )
+            await session.execute(stmt)
+
+        for i in range(0, len(gone), MARKET_BATCH_SIZE):
+            await session.execute(
+                update(TrackedMarket)
+                .where(TrackedMarket.condition_id.in_(gone[i : i + MARKET_BATCH_SIZE]))
+                .values(active=False, updated_at=func.now())
+            )
+
         await session.commit()
 
     logger.info(
-        "market_discovery: upserted %d markets from %d events",
-        len(markets_to_upsert),
+        "market_discovery: %d events, %d open markets: +%d new, ~%d changed, -%d deactivated, "
+        "%d unchanged%s",
         len(events),
+        len(discovered),
+        len(new),
+        len(changed),
+        len(gone),
+        len(discovered) - len(new) - len(changed),
+        "" if complete else " (incomplete fetch, deactivation skipped)",
     )
-    return len(markets_to_upsert)
+    return len(to_write) + len(gone)
 
 
 async def run_forever() -> None:
@@ -125,7 +246,7 @@ async def run_forever() -> None:
     while True:
         try:
             count = await discover_markets()
-            logger.info("market_discovery tick: %d markets", count)
+            logger.info("market_discovery tick: %d markets written", count)
         except Exception:
             logger.exception("market_discovery error")
         await asyncio.sleep(INTERVAL)
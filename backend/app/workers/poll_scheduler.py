@@ -0,0 +1,125 @@
+"""Activity-adaptive poll scheduling for tracked markets.
+
+Each market keeps an EWMA of its trade arrival rate (trades/s, from what each poll
+found past the market's watermark). The desired poll interval is the time it takes
+to accumulate ``target_per_poll`` trades at that rate, clamped to
+``[min_interval, max_interval]``. If the desired polls add up to more than the
+request budget, every interval is stretched by the same factor so the total stays
+within budget — hot markets keep their relative priority, idle ones back off.
+"""
+
+import math
+from dataclasses import dataclass
+
+
+@dataclass
+class _MarketState:
+    rate: float  # EWMA trades/s
+    interval: float  # desired seconds between polls, before budget scaling
+    next_due: float  # monotonic time; inf while a poll is in flight
+    last_polled: float | None = None
+
+
+class PollScheduler:
+    """Decides which markets to poll next. Pure bookkeeping — times are passed in."""
+
+    def __init__(
+        self,
+        *,
+        budget: float,
+        min_interval: float = 3.0,
+        max_interval: float = 300.0,
+        target_per_poll: float = 10.0,
+        half_life: float = 300.0,
+        initial_rate: float = 1 / 6,
+        failure_retry: float = 30.0,
+    ) -> None:
+        self.budget = budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_per_poll = target_per_poll
+        self.tau = half_life / math.log(2)
+        self.initial_rate = initial_rate
+        self.failure_retry = failure_retry
+        self._markets: dict[str, _MarketState] = {}
+        self._demand = 0.0  # sum of 1/interval over all markets (polls/s wanted)
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def __contains__(self, condition_id: str) -> bool:
+        return condition_id in self._markets
+
+    @property
+    def scale(self) -> float:
+        """Factor applied to every desired interval to stay within the budget."""
+        return max(1.0, self._demand / self.budget)
+
+    def _interval_for(self, rate: float) -> float:
+        if rate <= 0:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, self.target_per_poll / rate))
+
+    def _set_interval(self, state: _MarketState, interval: float) -> None:
+        self._demand += 1 / interval - 1 / state.interval
+        state.interval = interval
+
+    def sync(self, market_ids: list[str], now: float) -> None:
+        """Track exactly ``market_ids``; new markets are due immediately."""
+        wanted = set(market_ids)
+        for cid in [c for c in self._markets if c not in wanted]:
+            self._demand -= 1 / self._markets.pop(cid).interval
+        for cid in wanted:
+            if cid not in self._markets:
+                interval = self._interval_for(self.initial_rate)
+                self._markets[cid] = _MarketState(self.initial_rate, interval, now)
+                self._demand += 1 / interval
+
+    def due(self, now: float, limit: int | None = None) -> list[str]:
+        """Claim markets whose poll is due, most overdue first.
+
+        Claimed markets aren't returned again until :meth:`record` or
+        :meth:`record_failure` reschedules them.
+        """
+        ready = sorted((s.next_due, cid) for cid, s in self._markets.items() if s.next_due <= now)
+        if limit is not None:
+            ready = ready[:limit]
+        for _, cid in ready:
+            self._markets[cid].next_due = math.inf
+        return [cid for _, cid in ready]
+
+    def record(self, condition_id: str, new_trades: int, now: float) -> None:
+        """Fold a completed poll's new-trade count into the rate and reschedule."""
+        state = self._markets.get(condition_id)
+        if state is None:
+            return
+        if state.last_polled is not None and now > state.last_polled:
+            dt = now - state.last_polled
+            alpha = 1 - math.exp(-dt / self.tau)
+            state.rate = alpha * (new_trades / dt) + (1 - alpha) * state.rate
+        state.last_polled = now
+        self._set_interval(state, self._interval_for(state.rate))
+        state.next_due = now + state.interval * self.scale
+
+    def record_failure(self, condition_id: str, now: float) -> None:
+        """Reschedule a market whose poll failed, without touching its rate."""
+        state = self._markets.get(condition_id)
+        if state is not None:
+            state.next_due = now + min(state.interval * self.scale, self.failure_retry)
+
+    def next_due(self) -> float:
+        """Earliest scheduled poll time (inf if nothing is scheduled)."""
+        return min((s.next_due for s in self._markets.values()), default=math.inf)
+
+    def stats(self, top: int = 5) -> dict:
+        hottest = sorted(self._markets.items(), key=lambda kv: kv[1].rate, reverse=True)[:top]
+        return {
+            "markets": len(self._markets),
+            "demand_polls_per_s": self._demand,
+            "budget_polls_per_s": self.budget,
+            "scale": self.scale,
+            "hottest": [
+                {"condition_id": cid, "rate": s.rate, "interval": s.interval * self.scale}
+                for cid, s in hottest
+            ],
+        }
@@ -0,0 +1,179 @@
+"""Rebuild ``wallet_positions`` by replaying every trade in timestamp order.
+
+Ingestion books trades into the ledger in arrival order, so backfilled history or a
+ledger that predates the ``trades.realized_pnl`` column needs a replay to get exact
+cost basis. The rebuild recomputes every trade's realized PnL, rewrites the trades
+and daily rollups whose value changed, and replaces the ledger, all in one
+transaction. It holds an EXCLUSIVE lock on ``wallet_positions`` throughout: ingest
+writers lock their positions before writing trades, so they wait for the rebuild
+instead of booking against a half-built ledger.
+
+Passing ``wallets`` replays only those wallets' trades and replaces only their
+positions; the backfill does this for every wallet it wrote trades for.
+
+CLI usage (from backend/):
+
+    python -m app.workers.rebuild_positions
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from sqlalchemy import column, delete, select, table, text
+
+from app.db.engine import async_session
+from app.db.models import Trade, WalletPosition
+from app.services.ledger import Position, PositionKey
+
+logger = logging.getLogger(__name__)
+
+REPLAY_BATCH = 50_000  # trades per fetch from the server-side cursor
+
+_POSITION_COLUMNS = ["wallet", "asset_id", "condition_id", "shares", "avg_cost", "realized_pnl"]
+
+_APPLY_FIXES = text(
+    """
+    UPDATE trades SET realized_pnl = f.pnl
+    FROM realized_fixes f
+    WHERE trades.id = f.id
+    """
+)
+
+# Re-sum realized PnL per rollup row; only rows whose total moved are rewritten
+_RESUM_ROLLUPS = """
+    UPDATE wallet_daily_rollups r SET realized_pnl = s.pnl
+    FROM (
+        SELECT wallet,
+               condition_id,
+               (to_timestamp(timestamp) AT TIME ZONE 'UTC')::date AS day,
+               sum(realized_pnl) AS pnl
+        FROM trades
+        {where}
+        GROUP BY 1, 2, 3
+    ) s
+    WHERE r.wallet = s.wallet
+      AND r.condition_id = s.condition_id
+      AND r.day = s.day
+      AND r.realized_pnl IS DISTINCT FROM s.pnl
+    """
+
+# Wallets a scoped rebuild covers, COPYed into a temp table to join against
+_rebuild_wallets = table("rebuild_wallets", column("wallet"))
+
+
+@dataclass
+class RebuildStats:
+    trades: int = 0
+    changed: int = 0
+    positions: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+
+    def as_dict(self) -> dict:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "trades": self.trades,
+            "changed": self.changed,
+            "positions": self.positions,
+            "elapsed_s": elapsed,
+            "trades_per_s": self.trades / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+async def rebuild_positions(wallets: Iterable[str] | None = None) -> RebuildStats:
+    """Replay ``trades`` into a fresh ledger and realized PnL columns.
+
+    With ``wallets``, only those wallets' trades and positions are rebuilt.
+    """
+    stats = RebuildStats()
+    positions: dict[PositionKey, Position] = {}
+    fixes: list[tuple[int, float]] = []  # (trade id, realized PnL) where it changed
+    t, wp = Trade, WalletPosition
+    q = select(
+        t.id, t.wallet, t.asset_id, t.condition_id, t.side, t.size, t.price, t.realized_pnl
+    ).order_by(t.timestamp, t.id)
+    scope = sorted(set(wallets)) if wallets is not None else None
+
+    async with async_session() as session:
+        await session.execute(text(f"LOCK TABLE {wp.__tablename__} IN EXCLUSIVE MODE"))
+        conn = await session.connection()
+        raw = (await conn.get_raw_connection()).driver_connection
+        if scope is not None:
+            if not scope:
+                await session.commit()
+                return stats
+            await session.execute(
+                text("CREATE TEMP TABLE rebuild_wallets (wallet text PRIMARY KEY) ON COMMIT DROP")
+            )
+            await raw.copy_records_to_table(  # type: ignore[union-attr]
+                "rebuild_wallets", records=((w,) for w in scope), columns=["wallet"]
+            )
+            q = q.where(t.wallet.in_(select(_rebuild_wallets.c.wallet)))
+
+        result = await session.stream(q.execution_options(yield_per=REPLAY_BATCH))
+        async for partition in result.partitions():
+            for trade_id, wallet, asset_id, condition_id, side, size, price, old in partition:
+                position = positions.get((wallet, asset_id))
+                if position is None:
+                    position = positions[wallet, asset_id] = Position(condition_id)
+                realized = position.book(side, size, price)
+                if realized != old:
+                    fixes.append((trade_id, realized))
+            stats.trades += len(partition)
+            logger.info("rebuild_positions: replayed %d trades", stats.trades)
+
+        if fixes:
+            await session.execute(
+                text(
+                    "CREATE TEMP TABLE realized_fixes "
+                    "(id bigint PRIMARY KEY, pnl double precision) ON COMMIT DROP"
+                )
+            )
+            await raw.copy_records_to_table(  # type: ignore[union-attr]
+                "realized_fixes", records=fixes, columns=["id", "pnl"]
+            )
+            await session.execute(_APPLY_FIXES)
+            where = "WHERE wallet IN (SELECT wallet FROM rebuild_wallets)" if scope else ""
+            await session.execute(text(_RESUM_ROLLUPS.format(where=where)))
+
+        if scope is None:
+            await session.execute(text(f"TRUNCATE {wp.__tablename__}"))
+        else:
+            await session.execute(
+                delete(wp).where(wp.wallet.in_(select(_rebuild_wallets.c.wallet)))
+            )
+        await raw.copy_records_to_table(  # type: ignore[union-attr]
+            wp.__tablename__,
+            records=(
+                (wallet, asset_id, p.condition_id, p.shares, p.avg_cost, p.realized_pnl)
+                for (wallet, asset_id), p in positions.items()
+            ),
+            columns=_POSITION_COLUMNS,
+        )
+        await session.commit()
+
+    stats.changed = len(fixes)
+    stats.positions = len(positions)
+    stats.finished = time.monotonic()
+    logger.info("rebuild_positions finished: %s", stats.as_dict())
+    return stats
+
+
+async def _main() -> None:
+    from app.core.logging import setup_logging
+    from app.db.engine import engine
+    from app.db.migrate import upgrade_schema
+
+    setup_logging()
+    await upgrade_schema()
+    try:
+        await rebuild_positions()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,16 +1,17 @@
 """CLOB WebSocket trade listener — connects to Polymarket WS and ingests live trades."""
 
 import asyncio
-import json
 import logging
 
 import websockets
 from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.core import json_codec
 from app.db.engine import async_session
-from app.db.models import TrackedMarket, Trade
-from app.services.scoring import upsert_wallet
+from app.db.models import TrackedMarket
+from app.services import journal
+from app.services.ingest import normalize_trade
+from app.services.pipeline import pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +19,12 @@ WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
 PING_INTERVAL = 10
 RECONNECT_BASE = 1
 RECONNECT_MAX = 60
+MAX_ASSETS_PER_SOCKET = 500  # shard the subscription so no single socket carries everything
+RESYNC_INTERVAL = 15  # seconds between diffs of the tracked asset set
 
 # Reference to app.state.redis, set by manager
 _redis = None
+_skipped_unhashed = 0  # trades dropped for lacking an on-chain hash (the poller stores them)
 
 
 def set_redis(redis):
@@ -42,90 +46,259 @@ async def _get_asset_ids() -> list[str]:
     return asset_ids
 
 
-async def _ingest_trade(trade_data: dict) -> None:
-    """Process a trade message from the CLOB WebSocket."""
-    tx_hash = trade_data.get("id", "")
-    asset_id = trade_data.get("asset_id", "")
-    if not tx_hash or not asset_id:
+async def publish_trades(rows: list[dict]) -> None:
+    """Publish newly inserted trades to Redis for WebSocket broadcast."""
+    if not _redis:
         return
-
-    wallet = trade_data.get("maker_address", "") or trade_data.get("owner", "")
-    size = float(trade_data.get("size", 0))
-    price = float(trade_data.get("price", 0))
-    side = trade_data.get("side", "")
-    timestamp = int(trade_data.get("timestamp", 0))
-
-    trade_row = {
-        "transaction_hash": tx_hash,
-        "asset_id": asset_id,
-        "condition_id": trade_data.get("market", ""),
-        "wallet": wallet,
-        "side": side,
-        "size": size,
-        "price": price,
-        "outcome": trade_data.get("outcome", ""),
-        "title": "",
-        "timestamp": timestamp,
-    }
-
-    async with async_session() as session:
-        stmt = pg_insert(Trade).values(trade_row)
-        stmt = stmt.on_conflict_do_nothing(constraint="uq_trade_tx_asset")
-        result = await session.execute(stmt)
-        if result.rowcount:  # type: ignore[union-attr]
-            await upsert_wallet(session, wallet, size * price)
-        await session.commit()
-
-    # Publish to Redis for WebSocket broadcast
-    if _redis:
+    for row in rows:
         try:
-            broadcast = json.dumps({"type": "trade", "data": trade_row})
+            broadcast = json_codec.dumps({"type": "trade", "data": row})
             await _redis.publish("trades:live", broadcast)
         except Exception:
             logger.debug("redis publish failed")
 
 
-async def run_forever() -> None:
-    """Connect to CLOB WebSocket and listen for trades with auto-reconnect."""
-    backoff = RECONNECT_BASE
-
-    while True:
-        asset_ids = await _get_asset_ids()
-        if not asset_ids:
-            logger.debug("trade_listener: no asset IDs to subscribe, waiting...")
-            await asyncio.sleep(30)
+def _parse_trade(trade_data: dict) -> dict | None:
+    """Convert a CLOB trade payload into a ``trades`` row, or None if it lacks ids.
+
+    Only the on-chain hash matches the key the Data API poller stores, so trades
+    without one are skipped (and counted) rather than keyed by the CLOB trade ``id``,
+    which would store them twice once the poller sees them.
+    """
+    global _skipped_unhashed
+    tx_hash = trade_data.get("transaction_hash", "")
+    asset_id = trade_data.get("asset_id", "")
+    if not tx_hash:
+        _skipped_unhashed += 1
+        return None
+    if not asset_id:
+        return None
+
+    return normalize_trade(
+        {
+            "transaction_hash": tx_hash,
+            "asset_id": asset_id,
+            "condition_id": trade_data.get("market", ""),
+            "wallet": trade_data.get("maker_address", "") or trade_data.get("owner", ""),
+            "side": trade_data.get("side", ""),
+            "size": float(trade_data.get("size", 0)),
+            "price": float(trade_data.get("price", 0)),
+            "outcome": trade_data.get("outcome", ""),
+            "title": "",
+            "timestamp": int(trade_data.get("timestamp", 0)),
+        }
+    )
+
+
+def parse_message(message: str | bytes) -> list[dict]:
+    """Extract trade rows from one WebSocket frame (a single event or a list of events).
+
+    Runs in the pipeline's normalize stage, off the socket read loop.
+    """
+    try:
+        data = json_codec.loads(message)
+    except json_codec.DecodeError:
+        return []
+
+    trades: list[dict] = []
+    for event in data if isinstance(data, list) else [data]:
+        if not isinstance(event, dict):
             continue
+        event_type = event.get("event_type", "")
+        if event_type == "last_trade_price":
+            # This event means a trade happened
+            trades.extend(event.get("data", [event]))
+        elif event_type == "trade":
+            trades.append(event.get("data", event))
 
+    rows = []
+    for trade in trades:
+        row = _parse_trade(trade) if isinstance(trade, dict) else None
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+async def _handle_message(message: str | bytes) -> None:
+    """Hand a frame to the ingest pipeline; blocks while the pipeline is backed up."""
+    await pipeline.submit(message, source="trade_listener", parse=parse_message)
+
+
+class _Shard:
+    """One CLOB WebSocket carrying a bounded subset of the tracked asset IDs.
+
+    Subscription changes are sent on the live socket; after a reconnect the full
+    current asset set is re-subscribed.
+    """
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.assets: set[str] = set()
+        self.messages = 0
+        self.reconnects = 0
+        self._ws: websockets.ClientConnection | None = None
+        self._task: asyncio.Task | None = None  # type: ignore[type-arg]
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"trade_listener_shard_{self.index}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _send(self, operation: str, asset_ids: set[str]) -> None:
+        if self._ws is None or not asset_ids:
+            return
         try:
-            async with websockets.connect(WS_URL, ping_interval=PING_INTERVAL) as ws:
-                # Subscribe to all tracked assets
-                sub_msg = json.dumps(
-                    {
-                        "type": "market",
-                        "assets_ids": asset_ids,  # Polymarket uses assets_ids (plural)
-                    }
+            msg = {"assets_ids": sorted(asset_ids), "operation": operation}
+            await self._ws.send(json_codec.dumps_str(msg))
+        except Exception:
+            # The reader loop notices the dead socket and resubscribes on reconnect
+            logger.debug("trade_listener shard %d: %s send failed", self.index, operation)
+
+    async def subscribe(self, asset_ids: set[str]) -> None:
+        self.assets |= asset_ids
+        await self._send("subscribe", asset_ids)
+
+    async def unsubscribe(self, asset_ids: set[str]) -> None:
+        self.assets -= asset_ids
+        await self._send("unsubscribe", asset_ids)
+
+    async def _run(self) -> None:
+        """Connect and read trades with auto-reconnect."""
+        backoff = RECONNECT_BASE
+
+        while True:
+            try:
+                async with websockets.connect(WS_URL, ping_interval=PING_INTERVAL) as ws:
+                    # Polymarket uses assets_ids (plural)
+                    initial = set(self.assets)
+                    await ws.send(
+                        json_codec.dumps_str({"type": "market", "assets_ids": sorted(initial)})
+                    )
+                    self._ws = ws
+                    # (Un)subscribes during that send found no socket; apply them now
+                    await self._send("subscribe", self.assets - initial)
+                    await self._send("unsubscribe", initial - self.assets)
+                    logger.info(
+                        "trade_listener shard %d connected, subscribed to %d assets",
+                        self.index,
+                        len(self.assets),
+                    )
+                    backoff = RECONNECT_BASE
+
+                    async for message in ws:
+                        self.messages += 1
+                        journal.record("trade_listener", message)
+                        try:
+                            await _handle_message(message)
+                        except Exception:
+                            logger.exception("trade_listener message processing error")
+
+            except Exception:
+                logger.warning(
+                    "trade_listener shard %d disconnected, reconnecting in %ds",
+                    self.index,
+                    backoff,
                 )
-                await ws.send(sub_msg)
-                logger.info("trade_listener connected, subscribed to %d assets", len(asset_ids))
-                backoff = RECONNECT_BASE
-
-                async for message in ws:
-                    try:
-                        data = json.loads(message)
-                        event_type = data.get("event_type", "")
-
-                        if event_type == "last_trade_price":
-                            # This event means a trade happened
-                            for trade in data.get("data", [data]):
-                                await _ingest_trade(trade)
-                        elif event_type == "trade":
-                            await _ingest_trade(data.get("data", data))
-                    except json.JSONDecodeError:
-                        pass
-                    except Exception:
-                        logger.exception("trade_listener message processing error")
+            finally:
+                self._ws = None
 
-        except Exception:
-            logger.warning("trade_listener disconnected, reconnecting in %ds", backoff)
+            self.reconnects += 1
             await asyncio.sleep(backoff)
             backoff = min(backoff * 2, RECONNECT_MAX)
+
+
+class _ShardPool:
+    """Spreads asset IDs across sockets holding at most ``MAX_ASSETS_PER_SOCKET`` each."""
+
+    def __init__(self) -> None:
+        self.shards: list[_Shard] = []
+        self._next_index = 0
+
+    async def sync(self, wanted: set[str]) -> None:
+        """Diff ``wanted`` against current subscriptions and apply the changes in place."""
+        current: set[str] = set().union(*(s.assets for s in self.shards))
+        gone = current - wanted
+        new = wanted - current
+
+        if gone:
+            for shard in self.shards:
+                await shard.unsubscribe(shard.assets & gone)
+            for shard in [s for s in self.shards if not s.assets]:
+                await shard.stop()
+                self.shards.remove(shard)
+
+        pending = sorted(new)
+        # Top up the least-loaded sockets first, then open new ones for the remainder
+        for shard in sorted(self.shards, key=lambda s: len(s.assets)):
+            room = MAX_ASSETS_PER_SOCKET - len(shard.assets)
+            if room > 0 and pending:
+                await shard.subscribe(set(pending[:room]))
+                pending = pending[room:]
+        while pending:
+            shard = _Shard(self._next_index)
+            self._next_index += 1
+            shard.assets = set(pending[:MAX_ASSETS_PER_SOCKET])
+            pending = pending[MAX_ASSETS_PER_SOCKET:]
+            self.shards.append(shard)
+            shard.start()
+
+        if new or gone:
+            logger.info(
+                "trade_listener resync: +%d -%d assets across %d sockets",
+                len(new),
+                len(gone),
+                len(self.shards),
+            )
+
+    async def close(self) -> None:
+        await asyncio.gather(*(s.stop() for s in self.shards))
+        self.shards.clear()
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "shard": s.index,
+                "assets": len(s.assets),
+                "connected": s.connected,
+                "messages": s.messages,
+                "reconnects": s.reconnects,
+            }
+            for s in self.shards
+        ]
+
+
+_pool = _ShardPool()
+
+
+def pool_stats() -> list[dict]:
+    """Per-socket subscription and traffic counters."""
+    return _pool.stats()
+
+
+def parse_stats() -> dict:
+    """Trades the listener left to the poller."""
+    return {"skipped_without_tx_hash": _skipped_unhashed}
+
+
+async def run_forever() -> None:
+    """Keep the socket pool subscribed to exactly the tracked asset set."""
+    journal.open_journal()
+    try:
+        while True:
+            try:
+                await _pool.sync(set(await _get_asset_ids()))
+            except Exception:
+                logger.exception("trade_listener resync error")
+            await asyncio.sleep(RESYNC_INTERVAL)
+    finally:
+        await _pool.close()
+        journal.close_journal()
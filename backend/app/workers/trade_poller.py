@@ -1,118 +1,277 @@
-"""Polls Data API for trades on tracked markets and ingests them."""
+"""Polls Data API for trades on tracked markets and ingests them.
+
+Markets are polled on individual schedules from :class:`PollScheduler`: busy markets
+every few seconds, idle ones backing off to minutes, all within a fixed poll budget.
+A market that falls more than ``MAX_PAGES`` pages behind its watermark has the
+trades in between backfilled in the background.
+"""
 
 import asyncio
 import logging
+import math
+import time
 
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import func, select
 
+from app.core import json_codec
 from app.db.engine import async_session
 from app.db.models import TrackedMarket, Trade
+from app.services import journal
+from app.services.ingest import parse_data_api_trade
+from app.services.pipeline import pipeline
 from app.services.polymarket import data_api_get
-from app.services.scoring import upsert_wallet
+from app.workers.backfill import run_backfill
+from app.workers.poll_scheduler import PollScheduler
 
 logger = logging.getLogger(__name__)
 
-INTERVAL = 30  # seconds between full poll cycles
-BATCH_SIZE = 20  # trades per market per poll
-MAX_MARKETS_PER_CYCLE = 100  # cap to avoid rate limits
-REQUEST_DELAY = 0.15  # 150ms between requests (~6.6 req/s, well under 20 req/s limit)
+MARKET_REFRESH = 30  # seconds between reloads of the active market list
+TICK = 1.0  # max seconds between scheduling passes
+# Polls/s across all markets; leaves headroom in the shared 18 req/s limiter for
+# follow-up pages, market discovery and the API's own proxied requests.
+POLL_BUDGET = 12.0
+BATCH_SIZE = 20  # first page per market — enough to cover a quiet market in one request
+PAGE_SIZE = 500  # follow-up pages when a market had more activity than the first page
+MAX_PAGES = 10  # stop paging after this many follow-ups and backfill the rest
+CONCURRENCY = 10  # markets fetched in parallel; request rate is capped by the shared limiter
+
+_scheduler = PollScheduler(budget=POLL_BUDGET)
+_in_flight: set[asyncio.Task] = set()  # type: ignore[type-arg]
+_ingested_since_log = 0
+
+# condition_id -> (newest ingested timestamp, "tx_hash:asset_id" keys at that timestamp).
+# Trades at or below the watermark are already stored; paging stops once we reach it.
+_watermarks: dict[str, tuple[int, frozenset[str]]] = {}
+
+# condition_id -> (old watermark, oldest fetched timestamp) still to be backfilled
+_gaps: dict[str, tuple[int, int]] = {}
+_gap_task: asyncio.Task | None = None  # type: ignore[type-arg]
+
+
+def _is_new(row: dict, watermark: tuple[int, frozenset[str]] | None) -> bool:
+    if watermark is None:
+        return True
+    wm_ts, wm_keys = watermark
+    if row["timestamp"] != wm_ts:
+        return row["timestamp"] > wm_ts
+    return f"{row['transaction_hash']}:{row['asset_id']}" not in wm_keys
 
 
-async def poll_trades() -> int:
-    """Poll trades for tracked markets. Returns count of new trades inserted."""
+def _advance_watermark(condition_id: str, rows: list[dict]) -> None:
+    """Move the market's watermark to the newest of ``rows`` (never backwards)."""
+    newest = max(r["timestamp"] for r in rows)
+    keys = {f"{r['transaction_hash']}:{r['asset_id']}" for r in rows if r["timestamp"] == newest}
+    current = _watermarks.get(condition_id)
+    if current is not None:
+        if current[0] > newest:
+            return
+        if current[0] == newest:
+            keys |= current[1]
+    _watermarks[condition_id] = (newest, frozenset(keys))
+
+
+async def _seed_watermarks(market_ids: list[str]) -> None:
+    """Initialise watermarks for markets we haven't polled yet from stored trades."""
+    missing = [cid for cid in market_ids if cid not in _watermarks]
+    if not missing:
+        return
     async with async_session() as session:
-        # Fetch active markets, ordered by most recently updated so we prioritize fresh ones
         result = await session.execute(
-            select(TrackedMarket.condition_id)
-            .where(TrackedMarket.active.is_(True))
-            .order_by(TrackedMarket.updated_at.desc())
-            .limit(MAX_MARKETS_PER_CYCLE)
+            select(Trade.condition_id, func.max(Trade.timestamp))
+            .where(Trade.condition_id.in_(missing))
+            .group_by(Trade.condition_id)
         )
-        market_ids = [row[0] for row in result.all()]
+        for cid, max_ts in result.all():
+            # Keys at the boundary are unknown; re-fetched boundary trades just conflict
+            _watermarks[cid] = (int(max_ts), frozenset())
 
-    if not market_ids:
-        return 0
 
-    total_new = 0
+async def _fetch_new_trades(condition_id: str) -> tuple[list[dict], bool]:
+    """Page backwards through a market's trades until the watermark is reached.
+
+    A market with no watermark (nothing stored yet) only gets its first page —
+    loading older history is the backfill's job, not the poller's. Returns the new
+    rows and whether paging reached the watermark.
+    """
+    watermark = _watermarks.get(condition_id)
+    new_rows: list[dict] = []
+    offset = 0
+    limit = BATCH_SIZE
 
-    for condition_id in market_ids:
-        try:
-            data = await data_api_get(
-                "/trades", params={"market": condition_id, "limit": BATCH_SIZE}
+    for _ in range(MAX_PAGES + 1):
+        data = await data_api_get(
+            "/trades", params={"market": condition_id, "limit": limit, "offset": offset}
+        )
+        page = data if isinstance(data, list) else []
+        if page and journal.enabled():
+            journal.record(
+                "trade_poller", json_codec.dumps({"market": condition_id, "trades": page})
             )
-        except Exception:
-            logger.debug("failed to fetch trades for %s", condition_id)
-            # Back off a bit more on failures (likely rate-limited)
-            await asyncio.sleep(1.0)
-            continue
-
-        # Rate-limit delay between successful requests
-        await asyncio.sleep(REQUEST_DELAY)
-
-        raw_trades = data if isinstance(data, list) else []
-        if not raw_trades:
-            continue
-
-        trades_to_insert = []
-        for t in raw_trades:
-            tx_hash = t.get("transactionHash", "")
-            asset_id = t.get("asset", "")
-            if not tx_hash or not asset_id:
+
+        reached = False
+        for t in page:
+            row = parse_data_api_trade(t, condition_id)
+            if row is None:
                 continue
+            if _is_new(row, watermark):
+                new_rows.append(row)
+            else:
+                reached = True
 
-            wallet = t.get("proxyWallet", "")
-            size = float(t.get("size", 0))
-            price = float(t.get("price", 0))
-
-            trades_to_insert.append(
-                {
-                    "transaction_hash": tx_hash,
-                    "asset_id": asset_id,
-                    "condition_id": condition_id,
-                    "wallet": wallet,
-                    "side": t.get("side", ""),
-                    "size": size,
-                    "price": price,
-                    "outcome": t.get("outcome", ""),
-                    "title": t.get("title", ""),
-                    "timestamp": int(t.get("timestamp", 0)),
-                }
-            )
+        if reached or watermark is None or len(page) < limit:
+            return new_rows, True
+        offset += len(page)
+        limit = PAGE_SIZE
+    return new_rows, False
+
+
+def _queue_gap(condition_id: str, from_ts: int, to_ts: int) -> None:
+    """Backfill ``[from_ts, to_ts]`` for a market the poller could not page back through."""
+    global _gap_task
+    logger.warning(
+        "trade_poller: %s still behind watermark after %d pages; backfilling %d..%d",
+        condition_id,
+        MAX_PAGES,
+        from_ts,
+        to_ts,
+    )
+    pending = _gaps.get(condition_id)
+    if pending is not None:
+        from_ts, to_ts = min(pending[0], from_ts), max(pending[1], to_ts)
+    _gaps[condition_id] = (from_ts, to_ts)
+    if _gap_task is None or _gap_task.done():
+        _gap_task = asyncio.create_task(_fill_gaps(), name="trade_poller:gaps")
 
-        if not trades_to_insert:
-            continue
 
-        async with async_session() as session:
-            stmt = pg_insert(Trade).values(trades_to_insert)
-            stmt = stmt.on_conflict_do_nothing(
-                constraint="uq_trade_tx_asset",
+async def _fill_gaps() -> None:
+    """Backfill queued gaps one market at a time (checkpointed, so a rerun resumes)."""
+    while _gaps:
+        condition_id, (from_ts, to_ts) = _gaps.popitem()
+        progress = await run_backfill([condition_id], from_ts, to_ts, concurrency=1)
+        if progress.markets_failed:
+            logger.error(
+                "trade_poller: gap backfill failed; rerun "
+                "`python -m app.workers.backfill %s --from %d --to %d`",
+                condition_id,
+                from_ts,
+                to_ts,
             )
-            result = await session.execute(stmt)
-            inserted = result.rowcount or 0  # type: ignore[union-attr]
-            total_new += inserted
 
-            # Upsert wallets for new trades
-            if inserted > 0:
-                seen_wallets: dict[str, float] = {}
-                for t in trades_to_insert:
-                    w = t["wallet"]
-                    seen_wallets[w] = seen_wallets.get(w, 0) + t["size"] * t["price"]
-                for addr, vol in seen_wallets.items():
-                    await upsert_wallet(session, addr, vol)
 
-            await session.commit()
+def parse_page(payload: bytes) -> list[dict]:
+    """Rows from a journaled ``{"market", "trades"}`` page, for replay."""
+    page = json_codec.loads(payload)
+    rows = (parse_data_api_trade(t, page["market"]) for t in page["trades"])
+    return [row for row in rows if row is not None]
+
+
+async def _poll_market(condition_id: str) -> int:
+    """Fetch and ingest trades newer than the market's watermark. Returns count inserted."""
+    watermark = _watermarks.get(condition_id)
+    try:
+        trades_to_insert, caught_up = await _fetch_new_trades(condition_id)
+    except Exception:
+        logger.debug("failed to fetch trades for %s", condition_id)
+        _scheduler.record_failure(condition_id, time.monotonic())
+        return 0
+
+    # Trades past the watermark are genuine arrivals, whichever path ends up storing them
+    _scheduler.record(condition_id, len(trades_to_insert), time.monotonic())
+
+    if not trades_to_insert:
+        return 0
+
+    # Dedup against the listener happens in the pipeline; wait for the commit so the
+    # watermark only moves past trades that are durably stored
+    inserted = await pipeline.submit(trades_to_insert, source="trade_poller", wait=True)
+
+    _advance_watermark(condition_id, trades_to_insert)
+    if not caught_up and watermark is not None:
+        # The watermark moved past trades between it and the oldest page fetched
+        _queue_gap(condition_id, watermark[0], min(r["timestamp"] for r in trades_to_insert))
+    return inserted or 0
+
+
+async def _poll_task(condition_id: str) -> None:
+    global _ingested_since_log
+    try:
+        _ingested_since_log += await _poll_market(condition_id)
+    except Exception:
+        logger.exception("trade_poller failed to ingest %s", condition_id)
+        _scheduler.record_failure(condition_id, time.monotonic())
+
+
+async def refresh_markets() -> int:
+    """Sync the scheduler with the active market list. Returns number of markets tracked."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(TrackedMarket.condition_id).where(TrackedMarket.active.is_(True))
+        )
+        market_ids = [row[0] for row in result.all()]
 
-    return total_new
+    _scheduler.sync(market_ids, time.monotonic())
+    await _seed_watermarks(market_ids)
+
+    # Forget markets that are no longer tracked
+    for cid in [c for c in _watermarks if c not in _scheduler]:
+        del _watermarks[cid]
+
+    return len(market_ids)
+
+
+def poll_due_markets() -> int:
+    """Start polls for every due market that fits in the concurrency limit."""
+    free = CONCURRENCY - len(_in_flight)
+    if free <= 0:
+        return 0
+    due = _scheduler.due(time.monotonic(), limit=free)
+    for cid in due:
+        task = asyncio.create_task(_poll_task(cid), name=f"trade_poller:{cid[:10]}")
+        _in_flight.add(task)
+        task.add_done_callback(_in_flight.discard)
+    return len(due)
+
+
+def scheduler_stats() -> dict:
+    """Scheduling state: budget use and the hottest markets' poll intervals."""
+    return {"in_flight": len(_in_flight), "gaps_queued": len(_gaps), **_scheduler.stats()}
 
 
 async def run_forever() -> None:
-    """Run trade polling on a loop."""
-    while True:
-        try:
-            count = await poll_trades()
-            if count > 0:
-                logger.info("trade_poller ingested %d new trades", count)
-        except Exception:
-            logger.exception("trade_poller error")
-        await asyncio.sleep(INTERVAL)
+    """Run the poll scheduler loop."""
+    global _ingested_since_log
+    last_refresh = -math.inf
+    journal.open_journal()
+
+    try:
+        while True:
+            now = time.monotonic()
+            if now - last_refresh >= MARKET_REFRESH:
+                try:
+                    count = await refresh_markets()
+                    if _ingested_since_log:
+                        logger.info(
+                            "trade_poller ingested %d new trades across %d markets (scale=%.2f)",
+                            _ingested_since_log,
+                            count,
+                            _scheduler.scale,
+                        )
+                        _ingested_since_log = 0
+                except Exception:
+                    logger.exception("trade_poller error")
+                last_refresh = now
+
+            poll_due_markets()
+
+            wait = min(TICK, max(0.05, _scheduler.next_due() - time.monotonic()))
+            if _in_flight:
+                # Wake early when a slot frees up so due markets don't wait a full tick
+                await asyncio.wait(_in_flight, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(wait)
+    finally:
+        tasks = [*_in_flight, *([_gap_task] if _gap_task is not None else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        journal.close_journal()
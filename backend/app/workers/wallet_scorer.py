@@ -2,25 +2,60 @@
 
 import asyncio
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from app.db.engine import async_session
-from app.services.scoring import compute_scores
+from sqlalchemy import text
+
+from app.db.engine import async_session, engine
+from app.services.scoring import compute_scores, prune_generations
 
 logger = logging.getLogger(__name__)
 
 INTERVAL = 300  # 5 minutes
 
 
+def _new_pool() -> ProcessPoolExecutor:
+    # spawn: never fork a process with a running event loop and open sockets.
+    # One task per child hands each run's memory back to the OS when it finishes.
+    return ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=1
+    )
+
+
+async def _prune_scores() -> None:
+    """Drop superseded score generations and reclaim their space outside any reader's path."""
+    async with async_session() as session:
+        removed = await prune_generations(session)
+    if removed:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM (ANALYZE) wallet_scores"))
+
+
 async def run_forever() -> None:
     """Run wallet scoring on a loop."""
     # Wait a bit on startup for initial trades to be ingested
     await asyncio.sleep(30)
 
-    while True:
-        try:
-            async with async_session() as session:
-                count = await compute_scores(session)
-                logger.debug("wallet_scorer computed %d scores", count)
-        except Exception:
-            logger.exception("wallet_scorer error")
-        await asyncio.sleep(INTERVAL)
+    # Ranking math runs in a child process so it never stalls the API's event loop
+    pool = _new_pool()
+    try:
+        while True:
+            try:
+                async with async_session() as session:
+                    count = await compute_scores(session, executor=pool)
+                    logger.debug("wallet_scorer computed %d scores", count)
+            except BrokenProcessPool:
+                logger.exception("wallet_scorer process pool died, restarting it")
+                pool = _new_pool()
+            except Exception:
+                logger.exception("wallet_scorer error")
+            try:
+                await _prune_scores()
+            except Exception:
+                logger.exception("wallet_scorer prune error")
+            await asyncio.sleep(INTERVAL)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
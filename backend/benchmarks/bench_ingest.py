@@ -0,0 +1,79 @@
+"""Benchmark trade ingestion: multi-row INSERT vs COPY through the staging table.
+
+Usage (from backend/, against DATABASE_URL):
+
+    python -m benchmarks.bench_ingest --rows 50000
+
+Each run happens in a transaction that is rolled back, so the database is left
+unchanged. Both paths are run against the same synthetic rows, with a configurable
+fraction of duplicates to exercise the ON CONFLICT path.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.db.engine import async_session, engine
+from app.db.models import Base
+from app.services.ingest import copy_trades, insert_trades
+
+
+def _synthetic_trades(n: int, dup_ratio: float) -> list[dict]:
+    rng = random.Random(42)
+    unique = max(1, int(n * (1 - dup_ratio)))
+    rows = []
+    for i in range(n):
+        k = i if i < unique else rng.randrange(unique)
+        rows.append(
+            {
+                "transaction_hash": f"0xbench{k:060x}",
+                "asset_id": str(10**70 + k % 7),
+                "condition_id": f"0xcond{k % 200:058x}",
+                "wallet": f"0x{k % 5000:040x}",
+                "side": "BUY" if k % 3 else "SELL",
+                "size": rng.uniform(1, 500),
+                "price": rng.uniform(0.01, 0.99),
+                "outcome": "Yes" if k % 2 else "No",
+                "title": "Benchmark market",
+                "timestamp": 1_700_000_000 + k,
+                "realized_pnl": 0.0,
+            }
+        )
+    return rows
+
+
+async def _time_path(name: str, fn, rows: list[dict], repeat: int) -> None:
+    best = float("inf")
+    inserted = 0
+    for _ in range(repeat):
+        async with async_session() as session:
+            start = time.perf_counter()
+            inserted = len(await fn(session, rows))
+            await session.flush()
+            best = min(best, time.perf_counter() - start)
+            await session.rollback()
+    print(
+        f"{name:<8} rows={len(rows):>8} inserted={inserted:>8} "
+        f"best={best * 1000:9.1f}ms  {len(rows) / best:12,.0f} rows/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dup-ratio", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rows = _synthetic_trades(args.rows, args.dup_ratio)
+    await _time_path("insert", insert_trades, rows, args.repeat)
+    await _time_path("copy", copy_trades, rows, args.repeat)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Benchmark the JSON codecs on Gamma and CLOB payloads.
+
+Usage (from backend/):
+
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --gamma events.json --clob frames.jsonl
+
+``--gamma`` takes a saved Gamma ``/events`` response, ``--clob`` a file with one raw
+CLOB WebSocket frame per line (e.g. captured with ``websocat``). Without them,
+synthetic payloads with the same shape are generated. Every installed codec is
+timed on decode and encode of each payload set.
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from app.core import json_codec
+
+
+def _synthetic_gamma(n_events: int) -> bytes:
+    rng = random.Random(42)
+    events = []
+    for e in range(n_events):
+        markets = []
+        for m in range(rng.randint(1, 8)):
+            tokens = [str(rng.getrandbits(250)) for _ in range(2)]
+            markets.append(
+                {
+                    "id": str(500000 + e * 10 + m),
+                    "question": f"Will outcome {m} happen in event {e}?",
+                    "conditionId": f"0x{rng.getrandbits(256):064x}",
+                    "slug": f"event-{e}-market-{m}",
+                    "outcomes": '["Yes", "No"]',
+                    "outcomePrices": json.dumps([f"{p:.3f}" for p in (rng.random(),) * 2]),
+                    "clobTokenIds": json.dumps(tokens),
+                    "volume": f"{rng.uniform(0, 5e6):.4f}",
+                    "liquidity": f"{rng.uniform(0, 1e5):.4f}",
+                    "active": True,
+                    "closed": False,
+                    "endDate": "2026-12-31T00:00:00Z",
+                    "description": "Resolves Yes if the outcome happens. " * 6,
+                }
+            )
+        events.append(
+            {
+                "id": str(10000 + e),
+                "title": f"Benchmark event {e}",
+                "slug": f"benchmark-event-{e}",
+                "description": "Synthetic event used to benchmark JSON decoding. " * 4,
+                "image": f"https://example.com/images/{e}.png",
+                "active": True,
+                "closed": False,
+                "volume": rng.uniform(0, 1e7),
+                "liquidity": rng.uniform(0, 1e6),
+                "tags": [{"id": str(t), "label": f"Tag {t}", "slug": f"tag-{t}"} for t in range(3)],
+                "markets": markets,
+            }
+        )
+    return json.dumps(events).encode()
+
+
+def _synthetic_clob(n_frames: int) -> list[bytes]:
+    rng = random.Random(7)
+    frames = []
+    for i in range(n_frames):
+        events = [
+            {
+                "event_type": "last_trade_price",
+                "asset_id": str(rng.getrandbits(250)),
+                "market": f"0x{rng.getrandbits(256):064x}",
+                "price": f"{rng.random():.3f}",
+                "size": f"{rng.uniform(1, 1000):.2f}",
+                "side": rng.choice(["BUY", "SELL"]),
+                "fee_rate_bps": "0",
+                "timestamp": str(1_760_000_000_000 + i),
+                "transaction_hash": f"0x{rng.getrandbits(256):064x}",
+            }
+            for _ in range(rng.randint(1, 4))
+        ]
+        frames.append(json.dumps(events if len(events) > 1 else events[0]).encode())
+    return frames
+
+
+def _bench(name: str, codec: json_codec.Codec, payloads: list[bytes], seconds: float) -> None:
+    size = sum(len(p) for p in payloads)
+    decoded = [codec.loads(p) for p in payloads]
+
+    def _rate(fn, items) -> float:
+        rounds, start = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < seconds:
+            for item in items:
+                fn(item)
+            rounds += 1
+        return rounds / elapsed
+
+    loads = _rate(codec.loads, payloads)
+    dumps = _rate(codec.dumps, decoded)
+    print(
+        f"{name:<6} {codec.name:<8} "
+        f"loads {loads * len(payloads):11,.0f} msg/s {loads * size / 1e6:8.1f} MB/s   "
+        f"dumps {dumps * len(payloads):11,.0f} msg/s {dumps * size / 1e6:8.1f} MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare JSON codecs on Polymarket payloads.")
+    parser.add_argument("--gamma", type=Path, help="saved Gamma /events response")
+    parser.add_argument("--clob", type=Path, help="CLOB WebSocket frames, one per line")
+    parser.add_argument("--events", type=int, default=100, help="synthetic Gamma events")
+    parser.add_argument("--frames", type=int, default=5000, help="synthetic CLOB frames")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = parser.parse_args()
+
+    gamma = [args.gamma.read_bytes() if args.gamma else _synthetic_gamma(args.events)]
+    if args.clob:
+        clob = [line for line in args.clob.read_bytes().splitlines() if line.strip()]
+    else:
+        clob = _synthetic_clob(args.frames)
+
+    print(f"gamma: {len(gamma[0]) / 1e6:.2f} MB in 1 response")
+    print(f"clob:  {len(clob)} frames, {sum(map(len, clob)) / 1e3:.0f} KB total")
+    print(f"selected codec: {json_codec.codec.name}\n")
+    for codec in json_codec.available().values():
+        _bench("gamma", codec, gamma, args.seconds)
+    for codec in json_codec.available().values():
+        _bench("clob", codec, clob, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the on-the-fly leaderboard as the number of ranked wallets grows.
+
+Usage (from backend/, against DATABASE_URL):
+
+    python -m benchmarks.bench_leaderboard --rows 2000000 --wallets 10000 100000 400000
+
+For each wallet count, generates synthetic trades inside a transaction that is
+rolled back, then times :func:`app.services.leaderboard.compute_live_leaderboard`
+with a threshold filter and a ``--limit`` page, reporting the best time and the
+peak Python memory. Both should follow the page size, not the wallet count.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.db.engine import async_session, engine
+from app.db.models import Base
+from app.services.leaderboard import compute_live_leaderboard
+from benchmarks.bench_scoring import _GENERATE
+
+
+async def _measure(session, limit: int, repeat: int) -> tuple[float, int, int]:
+    kwargs = {"min_trades": 2, "sort_by": "pnl", "limit": limit, "offset": limit}
+    best = float("inf")
+    total = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, total = await compute_live_leaderboard(session, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    await compute_live_leaderboard(session, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, total
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--wallets", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--markets", type=int, default=4999)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    for wallets in args.wallets:
+        async with async_session() as session:
+            params = {
+                "rows": args.rows,
+                "markets": args.markets,
+                "wallets": wallets,
+                "days": 30,
+                "now": int(time.time()),
+            }
+            await session.execute(_GENERATE, params)
+            best, peak, total = await _measure(session, args.limit, args.repeat)
+            await session.rollback()
+        print(
+            f"wallets={wallets:>8,} ranked={total:>8,} best={best * 1000:9.1f}ms  "
+            f"peak={peak / 1e6:8.2f} MB"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
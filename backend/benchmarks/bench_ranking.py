@@ -0,0 +1,125 @@
+"""Micro-benchmark wallet ranking: per-wallet dicts + ``sorted`` vs NumPy columns.
+
+Usage (from backend/):
+
+    python -m benchmarks.bench_ranking --wallets 300000 --rows 1500000 --categories 4
+
+Runs on synthetic per-market totals (no database). Each side goes from scan rows to
+write-ready rows for every timeframe × category slice (plus "all"), as
+``compute_scores`` does. The dict side makes one pass over the rows per slice, as the
+original implementation did. Reports the best time and peak traced memory of each.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.services.scoring import TIMEFRAMES, MarketTotals, _rank
+
+
+def _synthetic_rows(wallets: int, rows: int, categories: int) -> list[tuple]:
+    rng = random.Random(42)
+    out = []
+    for i in range(rows):
+        wallet = f"0x{rng.randrange(wallets):040x}"
+        totals = []
+        for _ in TIMEFRAMES:
+            buy, sell = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            totals += [buy, sell, rng.randint(1, 20), rng.uniform(-buy, sell)]
+        market = i % 5000
+        out.append((wallet, f"0xmarket{market}", f"tag{market % categories}", *totals))
+    return out
+
+
+def _python_slice(rows: list[tuple], tf_name: str, category: str):
+    """The dict-and-sorted implementation this replaced, for one slice."""
+    volume: dict[str, float] = {}
+    pnl: dict[str, float] = {}
+    trades: dict[str, int] = {}
+    wins: dict[str, int] = {}
+    markets: dict[str, int] = {}
+    base = 3 + 4 * list(TIMEFRAMES).index(tf_name)
+    for row in rows:
+        wallet, buy, sell, count = row[0], row[base], row[base + 1], row[base + 2]
+        if not count or (category != "all" and row[2] != category):
+            continue
+        market_pnl = row[base + 3]
+        volume[wallet] = volume.get(wallet, 0.0) + buy + sell
+        pnl[wallet] = pnl.get(wallet, 0.0) + market_pnl
+        trades[wallet] = trades.get(wallet, 0) + count
+        markets[wallet] = markets.get(wallet, 0) + 1
+        if market_pnl > 0:
+            wins[wallet] = wins.get(wallet, 0) + 1
+
+    wallets = list(volume)
+    win_rate = {w: wins.get(w, 0) / markets[w] for w in wallets}
+    rank_vol = {w: i for i, w in enumerate(sorted(wallets, key=volume.get, reverse=True), 1)}
+    rank_pnl = {w: i for i, w in enumerate(sorted(wallets, key=pnl.get, reverse=True), 1)}
+    rank_wr = {w: i for i, w in enumerate(sorted(wallets, key=win_rate.get, reverse=True), 1)}
+    return [
+        {
+            "wallet": w,
+            "category": category,
+            "timeframe": tf_name,
+            "volume": volume[w],
+            "pnl": pnl[w],
+            "win_rate": win_rate[w],
+            "trade_count": trades[w],
+            "rank_volume": rank_vol[w],
+            "rank_pnl": rank_pnl[w],
+            "rank_win_rate": rank_wr[w],
+        }
+        for w in wallets
+    ]
+
+
+def _python_rank(rows: list[tuple]) -> int:
+    categories = ["all", *sorted({row[2] for row in rows})]
+    return sum(
+        len(_python_slice(rows, tf_name, category))
+        for category in categories
+        for tf_name in TIMEFRAMES
+    )
+
+
+def _numpy_rank(rows: list[tuple]) -> int:
+    totals = MarketTotals.from_rows(rows, len(rows))
+    written = 0
+    for category, category_rows in totals.category_rows().items():
+        for tf_name in TIMEFRAMES:
+            selected = category_rows[totals.trades[tf_name][category_rows] > 0]
+            written += len(list(_rank(totals, selected, category, tf_name).records(0)))
+    return written
+
+
+def _measure(name: str, fn, rows: list[tuple], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        written = fn(rows)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<7} scores={written:>10,} best={best * 1000:9.1f}ms  peak={peak / 1e6:8.1f} MB")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark wallet ranking implementations.")
+    parser.add_argument("--wallets", type=int, default=300_000)
+    parser.add_argument("--rows", type=int, default=1_500_000, help="(wallet, market) rows")
+    parser.add_argument("--categories", type=int, default=1, help="market categories")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = _synthetic_rows(args.wallets, args.rows, args.categories)
+    python = _measure("python", _python_rank, rows, args.repeat)
+    numpy = _measure("numpy", _numpy_rank, rows, args.repeat)
+    print(f"speedup {python / numpy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Benchmark the wallet scoring aggregation: per-timeframe queries vs one FILTER scan.
+
+Usage (from backend/, against DATABASE_URL):
+
+    python -m benchmarks.bench_scoring --rows 2000000
+
+Generates synthetic trades (and their daily rollups) inside a transaction that is
+rolled back, so the database is left unchanged. Times four ways of fetching what
+``compute_scores`` needs for every timeframe × {all, mentions}:
+
+- ``per-tf raw``: the original 16 GROUP BYs over ``trades`` (volume + PnL per slice)
+- ``scan raw``: one pass over ``trades`` with ``FILTER`` aggregates per timeframe
+- ``per-tf rollup``: one rollup + edge-day query per slice
+- ``scan rollup``: :func:`app.services.scoring.scoring_scan_query` (what runs now)
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime
+
+from sqlalchemy import and_, case, func, literal, select, text, union_all
+
+from app.db.engine import async_session, engine
+from app.db.models import Base, Trade, WalletDailyRollup
+from app.services.scoring import TIMEFRAMES, scoring_scan_query
+
+_GENERATE = text(
+    """
+    INSERT INTO trades
+        (transaction_hash, asset_id, condition_id, wallet, side, size, price, outcome, title,
+         timestamp)
+    SELECT 'bench' || g,
+           'asset',
+           'bench-market-' || (g % :markets),
+           'bench-wallet-' || ((g * 7919) % :wallets),
+           CASE WHEN g % 3 = 0 THEN 'SELL' ELSE 'BUY' END,
+           1 + (g % 500),
+           0.01 + (g % 98) / 100.0,
+           'Yes',
+           '',
+           :now - (g * 104729) % (:days * 86400)
+    FROM generate_series(1::bigint, :rows) AS g
+    """
+)
+
+_ROLLUP = text(
+    """
+    INSERT INTO wallet_daily_rollups
+        (wallet, condition_id, day, buy_notional, sell_notional, trade_count)
+    SELECT wallet, condition_id, (to_timestamp(timestamp) AT TIME ZONE 'UTC')::date,
+           coalesce(sum(size * price) FILTER (WHERE side <> 'SELL'), 0),
+           coalesce(sum(size * price) FILTER (WHERE side = 'SELL'), 0),
+           count(*)
+    FROM trades WHERE transaction_hash LIKE 'bench%'
+    GROUP BY 1, 2, 3
+    ON CONFLICT (wallet, condition_id, day) DO UPDATE SET
+        buy_notional = wallet_daily_rollups.buy_notional + excluded.buy_notional,
+        sell_notional = wallet_daily_rollups.sell_notional + excluded.sell_notional,
+        trade_count = wallet_daily_rollups.trade_count + excluded.trade_count
+    """
+)
+
+
+def _cutoffs(now_ts: int) -> dict[str, int | None]:
+    return {
+        tf: now_ts - int(delta.total_seconds()) if delta else None
+        for tf, delta in TIMEFRAMES.items()
+    }
+
+
+def _per_tf_raw(now_ts: int, mentions: list[str]) -> list:
+    """The pre-rollup scoring queries: volume and PnL GROUP BYs per slice."""
+    notional = Trade.size * Trade.price
+    signed = case((Trade.side == "SELL", notional), else_=-notional)
+    queries = []
+    for market_filter in ([], [Trade.condition_id.in_(mentions)]):
+        for cutoff in _cutoffs(now_ts).values():
+            where = [*market_filter] + ([Trade.timestamp >= cutoff] if cutoff else [])
+            queries.append(
+                select(Trade.wallet, func.count(), func.sum(notional))
+                .where(*where)
+                .group_by(Trade.wallet)
+            )
+            queries.append(
+                select(Trade.wallet, Trade.condition_id, func.sum(signed))
+                .where(*where)
+                .group_by(Trade.wallet, Trade.condition_id)
+            )
+    return queries
+
+
+def _scan_raw(now_ts: int) -> list:
+    """Single pass over raw trades, FILTER aggregates per timeframe."""
+    notional = Trade.size * Trade.price
+    columns = []
+    for tf, cutoff in _cutoffs(now_ts).items():
+        cond = Trade.timestamp >= cutoff if cutoff else literal(True)
+        columns += [
+            func.sum(case((Trade.side == "SELL", 0.0), else_=notional)).filter(cond),
+            func.sum(case((Trade.side == "SELL", notional), else_=0.0)).filter(cond),
+            func.count().filter(cond).label(f"trades_{tf}"),
+        ]
+    query = select(Trade.wallet, Trade.condition_id, *columns)
+    return [query.group_by(Trade.wallet, Trade.condition_id)]
+
+
+def _per_tf_rollup(now_ts: int, mentions: list[str]) -> list:
+    """One rollup + edge-day query per (category, timeframe) slice."""
+    r, t = WalletDailyRollup, Trade
+    notional = t.size * t.price
+    queries = []
+    for rf, tfilter in ([], []), ([r.condition_id.in_(mentions)], [t.condition_id.in_(mentions)]):
+        for cutoff in _cutoffs(now_ts).values():
+            rollups = select(r.wallet, r.condition_id, r.buy_notional, r.sell_notional)
+            if cutoff is None:
+                parts = [rollups.where(*rf)]
+            else:
+                edge_day = datetime.fromtimestamp(cutoff, UTC).date()
+                end = cutoff - cutoff % 86400 + 86400  # UTC days are aligned to the epoch
+                parts = [
+                    rollups.where(r.day > edge_day, *rf),
+                    select(
+                        t.wallet,
+                        t.condition_id,
+                        case((t.side == "SELL", 0.0), else_=notional),
+                        case((t.side == "SELL", notional), else_=0.0),
+                    ).where(and_(t.timestamp >= cutoff, t.timestamp < end), *tfilter),
+                ]
+            u = union_all(*parts).subquery()
+            cols = list(u.c)
+            queries.append(
+                select(cols[0], func.sum(cols[2]), func.sum(cols[3])).group_by(cols[0], cols[1])
+            )
+    return queries
+
+
+async def _time(name: str, session, queries: list, repeat: int) -> float:
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = 0
+        for q in queries:
+            rows += len((await session.execute(q)).all())
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<14} queries={len(queries):>3} rows={rows:>10,} best={best * 1000:10.1f}ms")
+    return best
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark scoring aggregation strategies.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--wallets", type=int, default=50_000)
+    parser.add_argument("--markets", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    now_ts = int(time.time())
+    mentions = [f"bench-market-{i}" for i in range(0, args.markets, 4)]
+    async with async_session() as session:
+        start = time.perf_counter()
+        await session.execute(
+            _GENERATE,
+            {
+                "rows": args.rows,
+                "markets": args.markets,
+                "wallets": args.wallets,
+                "days": args.days,
+                "now": now_ts,
+            },
+        )
+        await session.execute(_ROLLUP)
+        await session.execute(text("ANALYZE trades"))
+        await session.execute(text("ANALYZE wallet_daily_rollups"))
+        print(f"generated {args.rows:,} trades + rollups in {time.perf_counter() - start:.1f}s\n")
+
+        baseline = await _time("per-tf raw", session, _per_tf_raw(now_ts, mentions), args.repeat)
+        for name, queries in (
+            ("scan raw", _scan_raw(now_ts)),
+            ("per-tf rollup", _per_tf_rollup(now_ts, mentions)),
+            ("scan rollup", [scoring_scan_query(now_ts)]),
+        ):
+            best = await _time(name, session, queries, args.repeat)
+            print(f"{'':<14} {baseline / best:.1f}x vs per-tf raw")
+        await session.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
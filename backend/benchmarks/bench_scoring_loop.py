@@ -0,0 +1,113 @@
+"""Measure how long a scoring run blocks the event loop, inline vs in a process pool.
+
+Usage (from backend/, against a scratch DATABASE_URL):
+
+    python -m benchmarks.bench_scoring_loop --rows 1000000
+
+Seeds synthetic trades and rollups, runs ``compute_scores`` while a heartbeat task
+sleeps in 5 ms ticks, and reports the longest stall and the total time the loop
+was stalled for more than ``--threshold`` ms — what an HTTP or WebSocket handler
+would have waited. Everything it writes (trades, rollups, score generations) is
+deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import delete, func, select, text
+
+from app.db.engine import async_session, engine
+from app.db.models import Base, ScoreGeneration, WalletScore
+from app.services.scoring import compute_scores
+from benchmarks.bench_scoring import _GENERATE, _ROLLUP
+
+TICK = 0.005
+
+
+class LoopMonitor:
+    """Heartbeat task recording how late each tick wakes up."""
+
+    def __init__(self, threshold_ms: float) -> None:
+        self.threshold = threshold_ms / 1000
+        self.max_stall = 0.0
+        self.blocked = 0.0
+        self.stalls = 0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(TICK)
+            stall = loop.time() - start - TICK
+            self.max_stall = max(self.max_stall, stall)
+            if stall > self.threshold:
+                self.blocked += stall
+                self.stalls += 1
+
+
+async def _measure(name: str, executor, threshold_ms: float) -> None:
+    monitor = LoopMonitor(threshold_ms)
+    heartbeat = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    async with async_session() as session:
+        scores = await compute_scores(session, executor=executor)
+    elapsed = time.perf_counter() - start
+    heartbeat.cancel()
+    print(
+        f"{name:<8} scores={scores:>9,} wall={elapsed * 1000:9.1f}ms  "
+        f"max stall={monitor.max_stall * 1000:8.1f}ms  "
+        f"blocked={monitor.blocked * 1000:9.1f}ms over {monitor.stalls} stalls"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark event-loop blocking while scoring.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--wallets", type=int, default=50_000)
+    parser.add_argument("--markets", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--threshold", type=float, default=20.0, help="stall threshold, ms")
+    args = parser.parse_args()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as session:
+        first_generation = (await session.execute(select(func.max(ScoreGeneration.id)))).scalar()
+        params = {
+            "rows": args.rows,
+            "markets": args.markets,
+            "wallets": args.wallets,
+            "days": args.days,
+            "now": int(time.time()),
+        }
+        await session.execute(_GENERATE, params)
+        await session.execute(_ROLLUP)
+        await session.commit()
+    print(f"seeded {args.rows:,} trades\n")
+
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        await _measure("inline", None, args.threshold)
+        await _measure("process", pool, args.threshold)
+    finally:
+        pool.shutdown()
+        async with async_session() as session:
+            new = ScoreGeneration.id > (first_generation or 0)
+            bench_ids = select(ScoreGeneration.id).where(new)
+            await session.execute(delete(WalletScore).where(WalletScore.generation.in_(bench_ids)))
+            await session.execute(delete(ScoreGeneration).where(new))
+            await session.execute(text("DELETE FROM trades WHERE transaction_hash LIKE 'bench%'"))
+            await session.execute(
+                text("DELETE FROM wallet_daily_rollups WHERE wallet LIKE 'bench-wallet-%'")
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
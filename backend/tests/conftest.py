@@ -0,0 +1,82 @@
+"""Shared fixtures.
+
+Tests that need SQL take ``db``: it runs an async test body against a throwaway
+Postgres schema, and skips the test when no database is reachable. It connects to
+``TEST_DATABASE_URL``, by default ``DATABASE_URL`` with ``_test`` appended to the
+database name, so a development database is never touched.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.models import Base
+
+
+def _test_database_url() -> str:
+    if url := os.getenv("TEST_DATABASE_URL"):
+        return url
+    default = make_url(settings.DATABASE_URL)
+    return default.set(database=f"{default.database}_test").render_as_string(hide_password=False)
+
+
+async def _reachable(url: str) -> bool:
+    engine = create_async_engine(url, poolclass=NullPool)
+    try:
+        async with engine.connect():
+            return True
+    except Exception:
+        return False
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def database_url() -> str:
+    url = _test_database_url()
+    if not asyncio.run(_reachable(url)):
+        pytest.skip(f"no test database at {make_url(url).render_as_string()}")
+    return url
+
+
+@pytest.fixture
+def db(database_url):
+    """Call ``db(body)`` to run ``await body(sessions)`` against a throwaway schema.
+
+    ``sessions`` is a session factory whose connections see only a fresh schema with
+    every table created; it is dropped afterwards. Code under test commits for real.
+    """
+
+    def run(body):
+        async def main():
+            schema = f"test_{uuid.uuid4().hex[:12]}"
+            admin = create_async_engine(database_url, poolclass=NullPool)
+            engine = create_async_engine(
+                database_url,
+                poolclass=NullPool,
+                connect_args={"server_settings": {"search_path": schema}},
+            )
+            try:
+                async with admin.begin() as conn:
+                    await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                return await body(
+                    async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+                )
+            finally:
+                await engine.dispose()
+                async with admin.begin() as conn:
+                    await conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+                await admin.dispose()
+
+        return asyncio.run(main())
+
+    return run
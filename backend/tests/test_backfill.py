@@ -0,0 +1,106 @@
+"""Historical backfill: seeking to the range and resuming from checkpoints."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.models import BackfillCheckpoint, Trade, WalletPosition
+from app.workers import backfill, rebuild_positions
+from app.workers.backfill import PAGE_SIZE, BackfillProgress, _seek
+
+CID = "0xmarket"
+
+
+def _api_trade(ts: int) -> dict:
+    return {
+        "transactionHash": f"0x{ts:x}",
+        "asset": "1",
+        "proxyWallet": f"0x{ts % 3}",
+        "side": "BUY" if ts % 2 else "SELL",
+        "size": 1,
+        "price": 0.5,
+        "timestamp": ts,
+    }
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """A market with trades at timestamps ``count`` .. 1, served newest first."""
+    state = {"count": 0, "fail_at": None, "calls": 0}
+
+    async def data_api_get(path, params):
+        state["calls"] += 1
+        if state["calls"] == state["fail_at"]:
+            raise RuntimeError("data api down")
+        top = state["count"] - params["offset"]
+        return [_api_trade(ts) for ts in range(top, max(top - params["limit"], 0), -1)]
+
+    monkeypatch.setattr(backfill, "data_api_get", data_api_get)
+    return state
+
+
+def _seek_offset(count: int, to_ts: int) -> tuple[int, int]:
+    progress = BackfillProgress()
+    return asyncio.run(_seek(CID, to_ts, progress)), progress.requests
+
+
+@pytest.mark.parametrize("to_ts", [99_999, 50_000, 600, 1])
+def test_seek_lands_within_a_page_of_the_range_end(market, to_ts):
+    market["count"] = 100_000
+    offset, requests = _seek_offset(100_000, to_ts)
+    first_in_range = 100_000 - to_ts  # offset of the newest trade at or before to_ts
+    assert offset <= first_in_range <= offset + PAGE_SIZE
+    assert requests <= 2 * (100_000 // PAGE_SIZE).bit_length() + 1
+
+
+def test_seek_stays_at_the_top_when_the_range_reaches_the_newest_trade(market):
+    market["count"] = 5_000
+    assert _seek_offset(5_000, 5_000) == (0, 1)
+    assert _seek_offset(5_000, 10**9) == (0, 1)
+
+
+def test_seek_past_the_oldest_trade_and_on_an_empty_market(market):
+    market["count"] = 1_234
+    offset, _ = _seek_offset(1_234, 0)
+    assert 1_234 - PAGE_SIZE <= offset < 1_234
+
+    market["count"] = 0
+    assert _seek_offset(0, 100) == (0, 1)
+
+
+def test_an_interrupted_backfill_resumes_from_its_checkpoint(db, monkeypatch, market):
+    market["count"] = 3_000
+    from_ts, to_ts = 1_000, 2_400
+
+    async def body(sessions):
+        monkeypatch.setattr(backfill, "async_session", sessions)
+        monkeypatch.setattr(rebuild_positions, "async_session", sessions)
+
+        market["fail_at"] = 6  # a seek probe or two, then fail partway through the pages
+        first = await backfill.run_backfill([CID], from_ts, to_ts)
+        async with sessions() as session:
+            cp = await session.get(BackfillCheckpoint, CID)
+            stopped_at, stopped_done = cp.page_offset, cp.done
+
+        market["fail_at"] = None
+        second = await backfill.run_backfill([CID], from_ts, to_ts)
+        async with sessions() as session:
+            stored = (
+                await session.execute(
+                    select(func.count(), func.min(Trade.timestamp), func.max(Trade.timestamp))
+                )
+            ).one()
+            positions = (await session.execute(select(func.count(WalletPosition.wallet)))).scalar()
+            cp = await session.get(BackfillCheckpoint, CID)
+        return first, stopped_at, stopped_done, second, tuple(stored), positions, cp
+
+    first, stopped_at, stopped_done, second, stored, positions, cp = db(body)
+    assert first.markets_failed == 1 and first.inserted > 0
+    assert stopped_at > 0 and not stopped_done
+    assert second.markets_done == 1
+    assert second.wallets == {"0x0", "0x1", "0x2"}  # resumed: rebuilt with the first run's
+    assert stored == (to_ts - from_ts + 1, from_ts, to_ts)
+    assert first.inserted + second.inserted == to_ts - from_ts + 1
+    assert positions == 3
+    assert cp.done and cp.trades == to_ts - from_ts + 1
@@ -0,0 +1,58 @@
+"""Trade dedup cache shared by the poller and listener."""
+
+from app.core import json_codec
+from app.services.dedup import TradeDeduper
+from app.services.ingest import normalize_trade
+from app.workers import trade_listener
+
+
+def _row(tx: str, asset: str = "1") -> dict:
+    return {"transaction_hash": tx, "asset_id": asset}
+
+
+def test_claim_drops_seen_and_in_batch_duplicates():
+    dedup = TradeDeduper()
+    assert dedup.claim([_row("0xa"), _row("0xA"), _row("0xa", "2")]) == [
+        _row("0xa"),
+        _row("0xa", "2"),
+    ]
+    assert dedup.claim([_row("0xa"), _row("0xb")]) == [_row("0xb")]
+    assert dedup.stats()["hits"] == 2
+
+
+def test_release_allows_retry_after_failed_write():
+    dedup = TradeDeduper()
+    rows = dedup.claim([_row("0xa")])
+    dedup.release(rows)
+    assert dedup.claim([_row("0xa")]) == [_row("0xa")]
+
+
+def test_entries_expire_by_age_and_capacity():
+    dedup = TradeDeduper(max_entries=2, ttl=10)
+    dedup.claim([_row("0x1"), _row("0x2"), _row("0x3")], now=0)
+    assert len(dedup) == 2
+    dedup.claim([_row("0x4")], now=20)
+    assert len(dedup) == 1
+    assert dedup.claim([_row("0x2")], now=21) == [_row("0x2")]
+
+
+def test_normalize_trade_matches_poller_and_listener_rows():
+    listener = normalize_trade(
+        {"transaction_hash": "0xABC", "wallet": "0xDEF", "timestamp": 1_700_000_000_123}
+    )
+    poller = normalize_trade(
+        {"transaction_hash": "0xabc", "wallet": "0xdef", "timestamp": 1_700_000_000}
+    )
+    assert listener == poller
+
+
+def test_listener_skips_trades_without_an_onchain_hash():
+    frame = json_codec.dumps(
+        [
+            {"event_type": "trade", "id": "clob-1", "asset_id": "1", "market": "m1"},
+            {"event_type": "trade", "transaction_hash": "0xA", "asset_id": "1", "market": "m1"},
+        ]
+    )
+    skipped = trade_listener.parse_stats()["skipped_without_tx_hash"]
+    assert [r["transaction_hash"] for r in trade_listener.parse_message(frame)] == ["0xa"]
+    assert trade_listener.parse_stats()["skipped_without_tx_hash"] == skipped + 1
@@ -0,0 +1,40 @@
+"""JSON codec backends and the default response class."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from app.core import json_codec
+
+CODECS = list(json_codec.available().values())
+
+
+@pytest.mark.parametrize("codec", CODECS, ids=[c.name for c in CODECS])
+def test_codecs_agree_on_roundtrip(codec):
+    payload = {"type": "trade", "data": {"price": 0.42, "size": 10, "title": "Ünïcode", "ok": True}}
+    encoded = codec.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == payload
+    assert codec.loads(encoded.decode()) == payload
+
+
+@pytest.mark.parametrize("codec", CODECS, ids=[c.name for c in CODECS])
+def test_codecs_raise_decode_error(codec):
+    with pytest.raises(json_codec.DecodeError):
+        codec.loads(b"{not json")
+
+
+def test_response_renders_compact_utf8():
+    body = json_codec.FastJSONResponse({"a": "é", "t": datetime(2026, 1, 1, tzinfo=UTC)}).body
+    assert json_codec.loads(body) == {"a": "é", "t": "2026-01-01T00:00:00+00:00"}
+    assert b" " not in body
+
+
+@pytest.mark.parametrize("codec", CODECS, ids=[c.name for c in CODECS])
+def test_codecs_reject_unknown_types(codec):
+    with pytest.raises(TypeError):
+        codec.dumps({"value": object()})
+
+
+def test_orjson_is_installed():
+    assert "orjson" in json_codec.available()
@@ -0,0 +1,97 @@
+"""On-the-fly leaderboard: one statement ranks, counts and pages the filtered wallets."""
+
+from app.db.models import Trade
+from app.services.leaderboard import compute_live_leaderboard
+from app.services.live_window import SlidingWindow
+
+NOW = 1_700_000_000
+
+# wallet -> [(notional, realized PnL)], one trade each, all in market m1
+TRADES = {
+    "0xa": [(10.0, 5.0), (10.0, 0.0), (10.0, 0.0)],
+    "0xb": [(50.0, -1.0)],
+    "0xc": [(20.0, 2.0), (10.0, 0.0)],
+    "0xd": [(5.0, 0.0), (5.0, 0.0)],
+}
+
+
+def _leaderboards(db, *requests: dict) -> list[tuple[list[dict], int]]:
+    async def body(sessions):
+        async with sessions() as session:
+            session.add_all(
+                Trade(
+                    transaction_hash=f"0x{wallet}{i}",
+                    asset_id="1",
+                    condition_id="m1",
+                    wallet=wallet,
+                    side="BUY",
+                    size=notional,
+                    price=1.0,
+                    timestamp=NOW + i,
+                    realized_pnl=pnl,
+                )
+                for wallet, trades in TRADES.items()
+                for i, (notional, pnl) in enumerate(trades)
+            )
+            await session.commit()
+            return [await compute_live_leaderboard(session, **kw) for kw in requests]
+
+    return db(body)
+
+
+def _ranks(rows: list[dict]) -> list[tuple[str, int, int]]:
+    return [(r["address"], r["rank_volume"], r["rank_pnl"]) for r in rows]
+
+
+def test_ranks_and_total_cover_only_the_filtered_wallets(db):
+    unfiltered, filtered, by_pnl, positive = _leaderboards(
+        db,
+        {},
+        {"min_trades": 2},
+        {"min_trades": 2, "sort_by": "pnl", "sort_dir": "asc", "limit": 2},
+        {"pnl_positive": True},
+    )
+    assert unfiltered[1] == 4 and unfiltered[0][0]["address"] == "0xb"
+
+    rows, total = filtered
+    assert total == 3
+    # 0xa and 0xc tie on volume: the lower address ranks first
+    assert _ranks(rows) == [("0xa", 1, 1), ("0xc", 2, 2), ("0xd", 3, 3)]
+    assert rows[0]["trade_count"] == 3 and rows[0]["win_rate"] == 1.0
+
+    rows, total = by_pnl
+    assert total == 3 and _ranks(rows) == [("0xd", 3, 3), ("0xc", 2, 2)]
+
+    rows, total = positive
+    assert total == 2 and _ranks(rows) == [("0xa", 1, 1), ("0xc", 2, 2)]
+
+
+def test_paging_past_the_end_still_counts_the_filtered_wallets(db):
+    (rows, total), (empty, none) = _leaderboards(
+        db, {"min_trades": 2, "offset": 10}, {"min_trades": 10, "offset": 10}
+    )
+    assert rows == [] and total == 3
+    assert empty == [] and none == 0
+
+
+def test_the_live_window_ranks_by_the_same_rule(db):
+    window = SlidingWindow(minutes=60)
+    for wallet, trades in TRADES.items():
+        for i, (notional, pnl) in enumerate(trades):
+            row = {
+                "transaction_hash": f"0x{wallet}{i}",
+                "asset_id": "1",
+                "condition_id": "m1",
+                "wallet": wallet,
+                "side": "BUY",
+                "size": notional,
+                "price": 1.0,
+                "timestamp": NOW + i,
+                "realized_pnl": pnl,
+            }
+            window.add(row, now=NOW + 60)
+
+    requests = [{}, {"min_trades": 2}, {"pnl_positive": True, "sort_by": "pnl"}]
+    for kw, (rows, total) in zip(requests, _leaderboards(db, *requests), strict=True):
+        live_rows, live_total = window.leaderboard(60, now=NOW + 60, **kw)
+        assert live_total == total and _ranks(live_rows) == _ranks(rows)
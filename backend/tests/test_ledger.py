@@ -0,0 +1,42 @@
+"""Average-cost booking behind the wallet_positions ledger."""
+
+import pytest
+
+from app.services.ledger import Position, book_rows
+
+
+def _trade(ts: int, side: str, size: float, price: float, asset: str = "1") -> dict:
+    return {
+        "wallet": "0xa",
+        "asset_id": asset,
+        "condition_id": "m1",
+        "side": side,
+        "size": size,
+        "price": price,
+        "timestamp": ts,
+    }
+
+
+def test_sells_realize_against_average_cost():
+    position = Position("m1")
+    assert position.book("BUY", 100, 0.40) == 0
+    assert position.book("BUY", 100, 0.60) == 0
+    assert position.avg_cost == pytest.approx(0.50)
+
+    assert position.book("SELL", 50, 0.80) == pytest.approx(15.0)
+    assert position.shares == 150 and position.avg_cost == pytest.approx(0.50)
+
+    # Selling more than the ledger saw bought only realizes the known shares
+    assert position.book("SELL", 400, 0.30) == pytest.approx(-30.0)
+    assert position.shares == 0 and position.avg_cost == 0
+    assert position.realized_pnl == pytest.approx(-15.0)
+
+
+def test_book_rows_applies_trades_in_timestamp_order():
+    rows = [_trade(3, "SELL", 10, 0.9), _trade(1, "BUY", 10, 0.5), _trade(2, "BUY", 5, 0.2, "2")]
+    positions: dict = {}
+    book_rows(positions, rows)
+
+    assert [r["realized_pnl"] for r in rows] == pytest.approx([4.0, 0.0, 0.0])
+    assert positions["0xa", "1"].shares == 0
+    assert positions["0xa", "2"].shares == 5 and positions["0xa", "2"].avg_cost == 0.2
@@ -0,0 +1,101 @@
+"""Sliding minute-bucket window behind the short-timeframe leaderboards."""
+
+from app.services.live_window import SlidingWindow
+
+NOW = 1_700_000_000
+
+
+def _trade(
+    wallet: str,
+    ts: int,
+    side: str = "BUY",
+    notional: float = 10.0,
+    cid: str = "m1",
+    realized: float = 0.0,
+):
+    return {
+        "transaction_hash": f"0x{wallet}{ts}{side}{cid}",
+        "asset_id": "1",
+        "condition_id": cid,
+        "wallet": wallet,
+        "side": side,
+        "size": notional,
+        "price": 1.0,
+        "timestamp": ts,
+        "realized_pnl": realized,
+    }
+
+
+def test_totals_rank_wallets_within_the_window():
+    window = SlidingWindow(minutes=60)
+    window.add(_trade("a", NOW - 30, "BUY", 10), now=NOW)
+    window.add(_trade("a", NOW - 10, "SELL", 25, realized=15), now=NOW)
+    window.add(_trade("b", NOW - 600, "BUY", 50, cid="m2"), now=NOW)
+    window.add(_trade("b", NOW - 7200), now=NOW)  # already outside the hour
+
+    rows = {r["address"]: r for r in window.totals(60, now=NOW)}
+    assert rows["a"]["volume"] == 35 and rows["a"]["pnl"] == 15
+    assert rows["a"]["win_rate"] == 1.0 and rows["a"]["trade_count"] == 2
+    assert rows["b"]["rank_volume"] == 1 and rows["a"]["rank_pnl"] == 1
+    assert window.dropped == 1
+
+    # A 5-minute window only sees wallet a; a market filter only sees wallet b
+    assert [r["address"] for r in window.totals(5, now=NOW)] == ["a"]
+    assert [r["address"] for r in window.totals(60, markets={"m2"}, now=NOW)] == ["b"]
+
+
+def test_late_trades_land_in_their_own_minute_and_evict_in_order():
+    window = SlidingWindow(minutes=10)
+    window.add(_trade("a", NOW), now=NOW)
+    window.add(_trade("a", NOW - 300), now=NOW)  # arrives after a newer trade
+    window.add(_trade("a", NOW - 120), now=NOW)
+    assert window.buckets == 3
+
+    assert window.evict(now=NOW + 360) == 1
+    assert window.totals(10, now=NOW + 360)[0]["trade_count"] == 2
+    assert window.evict(now=NOW + 3600) == 2
+    assert len(window) == 0 and window.entries == 0
+
+
+def test_leaderboard_filters_sorts_and_pages():
+    window = SlidingWindow(minutes=60)
+    for i, wallet in enumerate("abcd"):
+        window.add(_trade(wallet, NOW - 60, notional=10 * (i + 1)), now=NOW)
+    window.add(_trade("d", NOW - 30, "SELL", 100, realized=60), now=NOW)
+
+    page, total = window.leaderboard(60, min_volume=20, limit=2, offset=1, now=NOW)
+    assert total == 3
+    assert [r["address"] for r in page] == ["c", "b"]
+    assert window.leaderboard(60, pnl_positive=True, now=NOW)[0][0]["address"] == "d"
+
+
+def test_leaderboard_ranks_the_wallets_left_after_filters():
+    window = SlidingWindow(minutes=60)
+    for wallet, notional in (("c", 30), ("d", 20), ("b", 20), ("a", 10)):
+        window.add(_trade(wallet, NOW - 60, notional=notional), now=NOW)
+    window.add(_trade("a", NOW - 30, "SELL", 1, realized=5), now=NOW)
+
+    page, total = window.leaderboard(60, min_volume=15, now=NOW)
+    assert total == 3
+    assert [(r["address"], r["rank_volume"]) for r in page] == [("c", 1), ("b", 2), ("d", 3)]
+
+    page, total = window.leaderboard(60, pnl_positive=True, now=NOW)
+    assert total == 1 and page[0]["rank_volume"] == 1 and page[0]["rank_pnl"] == 1
+
+
+def test_running_totals_follow_the_window_as_it_slides():
+    window = SlidingWindow(minutes=60, spans=[10])
+    for ts in (NOW - 30, NOW - 300, NOW - 900):
+        window.add(_trade("a", ts), now=NOW)
+    assert window.totals(10, now=NOW)[0]["trade_count"] == 2
+
+    later = NOW + 360
+    assert window.totals(10, now=later)[0]["trade_count"] == 1
+    window.add(_trade("a", NOW - 700, notional=5), now=later)  # late, only in the hour
+    assert window.totals(10, now=later)[0]["volume"] == 10
+    assert window.totals(60, now=later)[0]["volume"] == 35
+    assert window.totals(20, now=later)[0]["trade_count"] == 3  # summed from buckets
+
+    window.evict(now=NOW + 7200)
+    assert window.totals(60, now=NOW + 7200) == []
+    assert len(window) == 0 and window.running_entries == 0 and window.entries == 0
@@ -0,0 +1,51 @@
+"""Tracked-market sync: deactivation only after a complete Gamma listing."""
+
+import json
+
+from sqlalchemy import select
+
+from app.db.models import TrackedMarket
+from app.workers import market_discovery
+
+
+def _event(i: int) -> dict:
+    market = {"conditionId": f"m{i}", "question": f"q{i}", "clobTokenIds": json.dumps([f"t{i}"])}
+    return {"id": i, "markets": [market]}
+
+
+def _sync(db, monkeypatch, listing) -> dict[str, bool]:
+    """Run discovery over ``listing`` (a list of events, or an exception to raise)."""
+
+    async def gamma_get(path, params):
+        if isinstance(listing, Exception):
+            raise listing
+        return listing[params["offset"] : params["offset"] + params["limit"]]
+
+    async def body(sessions):
+        monkeypatch.setattr(market_discovery, "async_session", sessions)
+        monkeypatch.setattr(market_discovery, "gamma_get", gamma_get)
+        async with sessions() as session:
+            session.add_all(
+                TrackedMarket(condition_id=f"m{i}", question=f"q{i}", token_ids=[f"t{i}"])
+                for i in (1, 2)
+            )
+            await session.commit()
+        await market_discovery.discover_markets()
+        async with sessions() as session:
+            rows = await session.execute(select(TrackedMarket.condition_id, TrackedMarket.active))
+            return dict(rows.all())
+
+    return db(body)
+
+
+def test_markets_missing_from_a_complete_listing_are_deactivated(db, monkeypatch):
+    assert _sync(db, monkeypatch, [_event(2), _event(3)]) == {"m1": False, "m2": True, "m3": True}
+
+
+def test_a_complete_empty_listing_deactivates_everything(db, monkeypatch):
+    assert _sync(db, monkeypatch, []) == {"m1": False, "m2": False}
+
+
+def test_a_failed_fetch_deactivates_nothing(db, monkeypatch):
+    assert _sync(db, monkeypatch, RuntimeError("gamma down")) == {"m1": True, "m2": True}
+    assert _sync(db, monkeypatch, {"error": "rate limited"}) == {"m1": True, "m2": True}
@@ -0,0 +1,65 @@
+"""Waiting submitters vs rows another submission has claimed but not yet committed."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import pipeline as pipeline_module
+from app.services.dedup import TradeDeduper
+from app.services.pipeline import IngestPipeline
+
+
+def _row(tx: str) -> dict:
+    return {"transaction_hash": tx, "asset_id": "1"}
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Each batch write waits for the next outcome put on the returned queue."""
+    outcomes: asyncio.Queue = asyncio.Queue()
+
+    class Session:
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def session():
+        yield Session()
+
+    async def book_trades(_session, rows):
+        if not await outcomes.get():
+            raise RuntimeError("write failed")
+        return rows
+
+    async def record_trade_aggregates(_session, _inserted):
+        pass
+
+    monkeypatch.setattr(pipeline_module, "async_session", session)
+    monkeypatch.setattr(pipeline_module, "book_trades", book_trades)
+    monkeypatch.setattr(pipeline_module, "record_trade_aggregates", record_trade_aggregates)
+    return outcomes
+
+
+async def _race(outcomes: asyncio.Queue, first_write_ok: bool):
+    pipe = IngestPipeline(batch_max_delay=0.01, dedup=TradeDeduper())
+    pipe.start()
+    await pipe.submit([_row("0xa")], source="trade_listener")  # claims 0xa, not yet written
+    await asyncio.sleep(0.05)
+    poll = asyncio.ensure_future(pipe.submit([_row("0xa")], source="trade_poller", wait=True))
+    await asyncio.sleep(0.05)
+    assert not poll.done()  # 0xa is a duplicate, but not committed yet
+    await outcomes.put(first_write_ok)
+    try:
+        return await asyncio.wait_for(poll, 1)
+    finally:
+        await pipe.stop()
+
+
+def test_waiter_resolves_after_the_owner_commits(writes):
+    assert asyncio.run(_race(writes, True)) == 0
+
+
+def test_waiter_fails_when_the_owner_write_fails(writes):
+    with pytest.raises(RuntimeError):
+        asyncio.run(_race(writes, False))
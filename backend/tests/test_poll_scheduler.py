@@ -0,0 +1,53 @@
+"""Adaptive poll scheduling: hot markets poll often, idle ones back off, budget holds."""
+
+import math
+
+from app.workers.poll_scheduler import PollScheduler
+
+
+def _settle(sched: PollScheduler, rates: dict[str, float], seconds: float) -> float:
+    """Simulate polling at ``rates`` trades/s; returns the simulated clock."""
+    now = 0.0
+    while now < seconds:
+        for cid in sched.due(now):
+            sched.record(cid, round(rates[cid] * 5), now)
+        now += 5.0
+    return now
+
+
+def test_new_markets_are_due_immediately_and_claimed_once():
+    sched = PollScheduler(budget=10)
+    sched.sync(["a", "b"], now=100.0)
+    assert sorted(sched.due(100.0)) == ["a", "b"]
+    assert sched.due(100.0) == []
+    assert sched.next_due() == math.inf
+
+
+def test_hot_markets_poll_faster_than_idle_ones():
+    sched = PollScheduler(budget=100, half_life=30)
+    sched.sync(["hot", "idle"], now=0.0)
+    _settle(sched, {"hot": 5.0, "idle": 0.0}, seconds=600)
+
+    intervals = {m["condition_id"]: m["interval"] for m in sched.stats()["hottest"]}
+    assert intervals["hot"] == sched.min_interval
+    assert intervals["idle"] > 60
+
+
+def test_intervals_stretch_to_fit_budget():
+    sched = PollScheduler(budget=1.0, min_interval=1.0, target_per_poll=1.0)
+    sched.sync([str(i) for i in range(10)], now=0.0)
+    _settle(sched, {str(i): 10.0 for i in range(10)}, seconds=300)
+
+    # Ten markets each wanting one poll/s against a budget of one poll/s
+    assert math.isclose(sched.scale, 10.0)
+    assert math.isclose(sched.stats()["demand_polls_per_s"] / sched.scale, sched.budget)
+
+
+def test_removed_markets_release_their_demand():
+    sched = PollScheduler(budget=10)
+    sched.sync(["a", "b", "c"], now=0.0)
+    sched.sync(["a"], now=1.0)
+    assert len(sched) == 1
+    assert math.isclose(
+        sched.stats()["demand_polls_per_s"], 1 / sched._interval_for(sched.initial_rate)
+    )
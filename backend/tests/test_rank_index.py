@@ -0,0 +1,60 @@
+"""Sorted per-slice rank index over a published score generation."""
+
+import numpy as np
+
+from app.services.rank_index import RankIndex
+
+
+def _slice(rows: list[tuple]):
+    """Parsed slice for (wallet, volume, pnl, win_rate, trades, rank_vol, rank_pnl, rank_wr)."""
+    addresses = np.array([r[0].encode() for r in rows], dtype="S42")
+    return addresses, np.array([r[1:] for r in rows], dtype=np.float64)
+
+
+def _address(n: int) -> str:
+    return f"0x{n:040x}"
+
+
+def _index() -> RankIndex:
+    all_7d = [
+        (_address(3), 300.0, -5.0, 0.5, 4, 1, 3, 2),
+        (_address(1), 100.0, 20.0, 1.0, 1, 3, 1, 1),
+        (_address(2), 200.0, 10.0, 0.0, 2, 2, 2, 3),
+    ]
+    mentions_7d = [(_address(2), 50.0, 1.0, 1.0, 1, 1, 1, 1)]
+    return RankIndex.build(
+        7,
+        {
+            ("all", "7d"): _slice(all_7d),
+            ("mentions", "7d"): _slice(mentions_7d),
+        },
+    )
+
+
+def test_lookup_returns_ranks_and_percentiles_for_any_wallet():
+    index = _index()
+    found = index.lookup([_address(1), _address(9), _address(2).upper()], "all", "7d")
+
+    assert found[0]["rank_volume"] == 3 and found[0]["rank_pnl"] == 1
+    assert np.isclose(found[0]["percentile_volume"], 100 / 3)
+    assert found[0]["percentile_pnl"] == 100.0 and found[0]["trade_count"] == 1
+    assert found[1] is None
+    assert found[2]["volume"] == 200.0
+    assert index.lookup([_address(1)], "mentions", "7d") == [None]
+
+
+def test_page_follows_rank_order_both_ways():
+    index = _index()
+    rows, total = index.page("all", "7d", "volume", limit=2)
+    assert total == 3
+    assert [r["address"] for r in rows] == [_address(3), _address(2)]
+
+    rows, _ = index.page("all", "7d", "pnl", descending=False, limit=1, offset=1)
+    assert [r["address"] for r in rows] == [_address(2)]
+
+
+def test_profile_covers_every_timeframe_in_the_category():
+    index = _index()
+    assert set(index.profile(_address(2), "mentions")) == {"7d"}
+    assert index.profile(_address(2), "mentions")["7d"]["percentile_volume"] == 100.0
+    assert index.profile(_address(5), "all") == {}
@@ -0,0 +1,33 @@
+"""Token bucket pacing for the shared Polymarket client."""
+
+import asyncio
+import time
+
+from app.services.polymarket import TokenBucket
+
+
+def test_token_bucket_allows_burst_then_paces():
+    async def run() -> float:
+        bucket = TokenBucket(rate=50.0, capacity=5)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(15)))
+        return time.monotonic() - start
+
+    # 5 tokens available immediately, the other 10 arrive at 50/s
+    elapsed = asyncio.run(run())
+    assert 0.15 <= elapsed < 0.5
+
+
+def test_token_bucket_refills_up_to_capacity():
+    async def run() -> float:
+        bucket = TokenBucket(rate=100.0, capacity=3)
+        for _ in range(3):
+            await bucket.acquire()
+        await asyncio.sleep(0.1)  # would refill 10 tokens, but capped at 3
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert 0.005 <= elapsed < 0.1
@@ -0,0 +1,298 @@
+"""Scoring scan, columnar ranking and score generations."""
+
+from datetime import UTC, date, datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.db.models import ScoreGeneration, TrackedMarket, Trade, WalletDailyRollup, WalletScore
+from app.services import scoring
+from app.services.scoring import (
+    KEEP_GENERATIONS,
+    SCORE_COLUMNS,
+    TIMEFRAMES,
+    MarketTotals,
+    _descending_ranks,
+    _rank,
+    compute_scores,
+    current_generation,
+    prune_generations,
+    score_slices,
+    scoring_scan_query,
+)
+
+
+def _row(wallet: str, cid: str, category: str, totals: dict) -> list:
+    """Scan row; ``totals`` maps timeframe -> (buy, sell, trades, pnl), zero when absent."""
+    row: list = [wallet, cid, category]
+    for tf_name in TIMEFRAMES:
+        row += totals.get(tf_name, (0.0, 0.0, 0, 0.0))
+    return row
+
+
+def _copy(rows: list[list]) -> bytes:
+    return b"".join("\t".join(str(v) for v in r).encode() + b"\n" for r in rows)
+
+
+def _by_slice(slices) -> dict:
+    return {(s.category, s.timeframe): s for s in slices}
+
+
+def test_descending_ranks_break_ties_in_wallet_order():
+    assert _descending_ranks(np.array([1.0, 3.0, 3.0, 2.0])).tolist() == [4, 1, 2, 3]
+    assert len(_descending_ranks(np.array([]))) == 0
+
+
+def test_from_rows_fills_typed_columns_across_chunks(monkeypatch):
+    monkeypatch.setattr(scoring, "SCAN_CHUNK", 2)
+    rows = [
+        _row("0xa", "m1", "sports", {"all": (10.0, 5.0, 2, 1.5)}),
+        _row("0xb", "m1", "sports", {"all": (1.0, 0.0, 1, 0.0)}),
+        _row("0xa", "m2", "", dict.fromkeys(TIMEFRAMES, (1.0, 1.0, 1, 1.0))),
+    ]
+    totals = MarketTotals.from_rows(rows, len(rows))
+
+    assert totals.wallets.tolist() == ["0xa", "0xb"]
+    assert totals.wallet_idx.tolist() == [0, 1, 0]
+    assert totals.categories.tolist() == ["sports", ""]
+    assert totals.category_idx.tolist() == [0, 0, 1]
+    assert totals.volume["all"].tolist() == [15.0, 1.0, 2.0]
+    assert totals.trades["all"].dtype == np.int32 and totals.trades["all"].tolist() == [2, 1, 1]
+    assert totals.pnl["all"].tolist() == [1.5, 0.0, 1.0]
+    assert totals.volume["24h"].tolist() == [0.0, 0.0, 2.0]
+
+    with pytest.raises(ValueError):
+        MarketTotals.from_rows(rows, len(rows) + 1)
+
+
+def test_from_copy_matches_from_rows():
+    rows = [
+        _row("0xa", "m1", "sports", {"7d": (3.0, 1.0, 2, -0.5)}),
+        _row("0xb", "m2", "", {"all": (2.0, 0.0, 1, 0.0)}),
+    ]
+    parsed, expected = MarketTotals.from_copy(_copy(rows)), MarketTotals.from_rows(rows, 2)
+    assert parsed.wallets.tolist() == expected.wallets.tolist()
+    assert parsed.categories.tolist() == expected.categories.tolist()
+    for tf_name in TIMEFRAMES:
+        assert parsed.volume[tf_name].tolist() == expected.volume[tf_name].tolist()
+        assert parsed.trades[tf_name].tolist() == expected.trades[tf_name].tolist()
+        assert parsed.pnl[tf_name].tolist() == expected.pnl[tf_name].tolist()
+
+
+def test_category_rows_group_tagged_markets_under_all_too():
+    rows = [
+        _row("0xa", "m1", "sports", {}),
+        _row("0xa", "m2", "", {}),
+        _row("0xb", "m3", "all", {}),
+        _row("0xb", "m4", "sports", {}),
+    ]
+    groups = MarketTotals.from_rows(rows, len(rows)).category_rows()
+    assert set(groups) == {"all", "sports"}
+    assert groups["all"].tolist() == [0, 1, 2, 3]
+    assert groups["sports"].tolist() == [0, 3]
+
+
+def test_rank_folds_markets_into_wallets():
+    rows = [
+        _row("0xa", "m1", "", {"all": (10.0, 0.0, 2, 5.0)}),
+        _row("0xa", "m2", "", {"all": (0.0, 4.0, 1, -1.0)}),
+        _row("0xb", "m1", "", {"all": (20.0, 0.0, 1, 0.0)}),
+    ]
+    totals = MarketTotals.from_rows(rows, len(rows))
+    scores = _rank(totals, np.arange(3), "all", "all")
+
+    assert scores.wallets.tolist() == ["0xa", "0xb"]
+    assert scores.volume.tolist() == [14.0, 20.0]
+    assert scores.pnl.tolist() == [4.0, 0.0]
+    assert scores.win_rate.tolist() == [0.5, 0.0]  # a break-even market is not a win
+    assert scores.trade_count.tolist() == [3, 1]
+    assert scores.rank_volume.tolist() == [2, 1]
+    assert scores.rank_pnl.tolist() == [1, 2]
+    assert scores.rank_win_rate.tolist() == [1, 2]
+
+
+def test_score_slices_split_categories_and_skip_empty_slices():
+    scan = _copy(
+        [
+            _row("0xa", "m1", "sports", {"all": (10.0, 5.0, 2, 3.0), "24h": (1.0, 0.0, 1, 0.5)}),
+            _row("0xa", "m2", "", {"all": (20.0, 0.0, 1, -1.0)}),
+            _row("0xb", "m1", "sports", {"all": (30.0, 5.0, 1, 2.0)}),
+            # No wallet address: never scored, so 7d has no slice at all
+            _row("", "m1", "sports", {"all": (99.0, 0.0, 9, 50.0), "7d": (1.0, 0.0, 1, 0.0)}),
+        ]
+    )
+    slices = _by_slice(score_slices(scan))
+    assert set(slices) == {("all", "all"), ("all", "24h"), ("sports", "all"), ("sports", "24h")}
+
+    overall = slices["all", "all"]
+    assert overall.wallets.tolist() == ["0xa", "0xb"]
+    assert overall.volume.tolist() == [35.0, 35.0]
+    assert overall.pnl.tolist() == [2.0, 2.0]
+    assert overall.rank_volume.tolist() == [1, 2]  # tied: first-seen wallet first
+    assert overall.rank_pnl.tolist() == [1, 2]
+    assert overall.win_rate.tolist() == [0.5, 1.0]
+    assert overall.rank_win_rate.tolist() == [2, 1]
+    assert overall.trade_count.tolist() == [3, 1]
+
+    sports = slices["sports", "all"]
+    assert sports.volume.tolist() == [15.0, 35.0]
+    assert sports.rank_volume.tolist() == [2, 1]
+    assert sports.rank_pnl.tolist() == [1, 2]
+
+    assert slices["sports", "24h"].wallets.tolist() == ["0xa"]
+    assert slices["all", "24h"].pnl.tolist() == [0.5]
+
+
+def test_score_slices_of_an_empty_scan():
+    assert score_slices(b"") == []
+
+
+def test_records_follow_score_columns():
+    scan = _copy([_row("0xa", "m1", "", {"all": (2.0, 1.0, 3, 0.5)})])
+    (scores,) = score_slices(scan)
+    (record,) = list(scores.records(7))
+    assert dict(zip(SCORE_COLUMNS, record, strict=True)) == {
+        "wallet": "0xa",
+        "category": "all",
+        "timeframe": "all",
+        "generation": 7,
+        "volume": 3.0,
+        "pnl": 0.5,
+        "win_rate": 1.0,
+        "trade_count": 3,
+        "rank_volume": 1,
+        "rank_pnl": 1,
+        "rank_win_rate": 1,
+    }
+
+
+# ── Against Postgres ─────────────────────────────────────
+
+
+def _ts(day: date, hour: int) -> int:
+    return int(datetime(day.year, day.month, day.day, hour, tzinfo=UTC).timestamp())
+
+
+def _trade(wallet: str, cid: str, ts: int, side: str, notional: float) -> Trade:
+    return Trade(
+        transaction_hash=f"0x{wallet}{ts}",
+        asset_id="1",
+        condition_id=cid,
+        wallet=wallet,
+        side=side,
+        size=notional,
+        price=1.0,
+        timestamp=ts,
+    )
+
+
+def _rollup(wallet: str, cid: str, day: date, buy=0.0, sell=0.0, count=1, pnl=0.0):
+    return WalletDailyRollup(
+        wallet=wallet,
+        condition_id=cid,
+        day=day,
+        buy_notional=buy,
+        sell_notional=sell,
+        trade_count=count,
+        realized_pnl=pnl,
+    )
+
+
+def test_scan_reads_whole_days_from_rollups_and_the_edge_day_from_trades(db):
+    today, yesterday, week_edge, old = (
+        date(2026, 3, 10),
+        date(2026, 3, 9),
+        date(2026, 3, 3),
+        date(2026, 2, 1),
+    )
+    now_ts = _ts(today, 12)  # 24h window starts yesterday 12:00, 7d on 3/3 12:00
+
+    async def body(sessions):
+        async with sessions() as session:
+            session.add(TrackedMarket(condition_id="m1", category="sports"))
+            session.add_all(
+                [
+                    _rollup("0xa", "m1", today, buy=4.0),
+                    _rollup("0xa", "m1", yesterday, buy=10.0, count=2),
+                    _trade("0xa", "m1", _ts(yesterday, 18), "BUY", 2.0),
+                    _trade("0xa", "m1", _ts(yesterday, 6), "BUY", 8.0),  # before the 24h cut
+                    _rollup("0xa", "m1", week_edge, buy=5.0, sell=5.0, count=2),
+                    _trade("0xa", "m1", _ts(week_edge, 18), "BUY", 5.0),
+                    _trade("0xa", "m1", _ts(week_edge, 6), "SELL", 5.0),  # before the 7d cut
+                    _rollup("0xa", "m1", old, buy=100.0, pnl=7.0),
+                    _rollup("0xb", "m2", today, sell=3.0, pnl=-1.0),
+                ]
+            )
+            await session.flush()
+            result = await session.execute(scoring_scan_query(now_ts))
+            return {r.wallet: r._asdict() for r in result}
+
+    rows = db(body)
+    a, b = rows["0xa"], rows["0xb"]
+    assert a["category"] == "sports" and b["category"] == ""
+    assert (a["buy_24h"], a["sell_24h"], a["trades_24h"]) == (6.0, 0.0, 2)
+    assert (a["buy_7d"], a["sell_7d"], a["trades_7d"]) == (19.0, 0.0, 4)
+    assert (a["buy_30d"], a["sell_30d"], a["trades_30d"]) == (19.0, 5.0, 5)
+    assert (a["buy_all"], a["sell_all"], a["trades_all"], a["pnl_all"]) == (119.0, 5.0, 6, 7.0)
+    assert a["pnl_30d"] == 0.0
+    assert (b["sell_24h"], b["trades_24h"], b["pnl_24h"]) == (3.0, 1, -1.0)
+
+
+def test_compute_scores_publishes_only_after_every_slice_is_written(db, monkeypatch):
+    write_scores = scoring._write_scores
+    seen: list = []
+
+    async def body(sessions):
+        async with sessions() as session:
+            previous = ScoreGeneration(published_at=datetime(2026, 1, 1))
+            session.add(previous)
+            session.add(_rollup("0xa", "m1", date(2026, 1, 1), buy=10.0, pnl=1.0))
+            await session.commit()
+
+            async def spy(session, generation, scores):
+                seen.append(await current_generation(session))
+                await write_scores(session, generation, scores)
+
+            monkeypatch.setattr(scoring, "_write_scores", spy)
+            written = await compute_scores(session)
+            published = await current_generation(session)
+            scores = (
+                await session.execute(
+                    select(WalletScore.timeframe, WalletScore.volume).where(
+                        WalletScore.generation == published
+                    )
+                )
+            ).all()
+            return previous.id, published, written, scores
+
+    previous, published, written, scores = db(body)
+    assert seen == [previous]  # readers kept the old generation while slices were written
+    assert published > previous
+    assert written == 1 and scores == [("all", 10.0)]
+
+
+def test_prune_keeps_the_latest_published_and_fresh_unpublished_generations(db):
+    async def body(sessions):
+        async with sessions() as session:
+            published = [ScoreGeneration(published_at=datetime(2026, 1, d)) for d in (1, 2, 3, 4)]
+            fresh = ScoreGeneration()
+            abandoned = ScoreGeneration(created_at=datetime(2020, 1, 1))
+            generations = [*published, fresh, abandoned]
+            session.add_all(generations)
+            await session.flush()
+            session.add_all(
+                WalletScore(wallet="0xa", timeframe="all", generation=g.id) for g in generations
+            )
+            await session.commit()
+
+            removed = await prune_generations(session)
+            left = (await session.execute(select(ScoreGeneration.id))).scalars().all()
+            current = await current_generation(session)
+            return removed, set(left), current, [g.id for g in generations]
+
+    removed, left, current, ids = db(body)
+    kept_published = ids[4 - KEEP_GENERATIONS : 4]
+    assert left == {*kept_published, ids[4]}
+    assert removed == len(ids) - len(left)
+    assert current == ids[3]
@@ -0,0 +1,63 @@
+"""Incremental market polling: watermark paging and backfilled gaps."""
+
+import asyncio
+
+import pytest
+
+from app.workers import trade_poller
+from app.workers.backfill import BackfillProgress
+
+CID = "0xmarket"
+
+
+def _api_trade(i: int) -> dict:
+    return {"transactionHash": f"0x{i:x}", "asset": "1", "proxyWallet": "0xa", "timestamp": i}
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """A market whose Data API trades are ``newest`` .. 1, newest first; returns the gaps."""
+    state = {"newest": 0}
+    gaps: list = []
+
+    async def data_api_get(path, params):
+        top = state["newest"] - params["offset"]
+        return [_api_trade(i) for i in range(top, max(top - params["limit"], 0), -1)]
+
+    async def submit(rows, *, source, wait=False):
+        return len(rows)
+
+    async def run_backfill(condition_ids, from_ts, to_ts, *, concurrency):
+        gaps.append((condition_ids, from_ts, to_ts))
+        return BackfillProgress()
+
+    monkeypatch.setattr(trade_poller, "data_api_get", data_api_get)
+    monkeypatch.setattr(trade_poller.pipeline, "submit", submit)
+    monkeypatch.setattr(trade_poller, "run_backfill", run_backfill)
+    monkeypatch.setattr(trade_poller, "_watermarks", {CID: (100, frozenset({"0x64:1"}))})
+    monkeypatch.setattr(trade_poller, "_gaps", {})
+    monkeypatch.setattr(trade_poller, "_gap_task", None)
+    return state, gaps
+
+
+async def _poll() -> int:
+    inserted = await trade_poller._poll_market(CID)
+    if trade_poller._gap_task is not None:
+        await trade_poller._gap_task
+    return inserted
+
+
+def test_polls_page_back_to_the_watermark(market):
+    state, gaps = market
+    state["newest"] = 900
+    assert asyncio.run(_poll()) == 800
+    assert trade_poller._watermarks[CID][0] == 900 and gaps == []
+
+
+def test_trades_past_the_last_page_are_backfilled(market):
+    state, gaps = market
+    fetched = trade_poller.BATCH_SIZE + trade_poller.MAX_PAGES * trade_poller.PAGE_SIZE
+    state["newest"] = 100 + fetched + 1000
+    assert asyncio.run(_poll()) == fetched
+    assert trade_poller._watermarks[CID][0] == state["newest"]
+    assert gaps == [([CID], 100, state["newest"] - fetched + 1)]